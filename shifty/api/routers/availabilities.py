@@ -1,22 +1,26 @@
 from uuid import UUID
 from datetime import date, time
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
-from shifty.application.dto.availability_dto import AvailabilityCreate, AvailabilityFull, AvailabilityResult, AvailabilityUpdate
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from shifty.application.dto.dto import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page
+from shifty.application.dto.availability_dto import AvailabilityCreate, AvailabilityFilter, AvailabilityFull, AvailabilityImportResult, AvailabilityResult, AvailabilityUpdate, RecurringAvailabilityCreate
+from shifty.application.use_cases.availability_import import ImportFormat, iter_lines
 from shifty.application.use_cases.availability_service import AvailabilityService
 from shifty.dependencies import get_availability_service
-from shifty.domain.entities import Availability  # Updated import
-from shifty.domain.exceptions import InvalidDateRangeException, NotExistsException, InvalidAvailabilityException
+from shifty.domain.entities import Availability, RecurringAvailability  # Updated import
+from shifty.infrastructure.async_services import AsyncService, iterate_blocking
+from shifty.domain.exceptions import InvalidCursorException, InvalidDateRangeException, NotExistsException, InvalidAvailabilityException
 
 router = APIRouter(prefix="/availabilities", tags=["availabilities"])
 
 @router.post("/", response_model=AvailabilityResult, status_code=201)
-def create_availability(
+async def create_availability(
     data: AvailabilityCreate,
     response: Response,
-    service: AvailabilityService = Depends(get_availability_service)
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
     try:
-        saved = service.create(data)
+        saved = await service.create(data)
         return AvailabilityResult(
             result="success",
             message="Availability created successfully.",
@@ -30,17 +34,85 @@ def create_availability(
         )
         
 
-@router.get("/", response_model=list[AvailabilityFull])
-def list_availabilities(
-    service: AvailabilityService = Depends(get_availability_service),
+@router.post("/recurring", response_model=RecurringAvailability, status_code=201)
+async def create_recurring_availability(
+    data: RecurringAvailabilityCreate,
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
-    return service.list_all()
+    try:
+        return await service.create_recurring(data)
+    except (InvalidDateRangeException, InvalidAvailabilityException) as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+
+@router.get("/recurring/user/{user_id}", response_model=list[RecurringAvailability])
+async def get_recurring_availabilities_by_user(
+    user_id: UUID,
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
+):
+    return await service.get_recurring_by_user_id(user_id)
+
+@router.delete("/recurring/{recurring_id}", status_code=204)
+async def delete_recurring_availability(
+    recurring_id: UUID,
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
+):
+    try:
+        await service.delete_recurring(recurring_id)
+    except NotExistsException:
+        raise HTTPException(status_code=404, detail="Recurring availability not found")
+
+@router.post("/import", response_model=AvailabilityImportResult)
+async def import_availabilities(
+    request: Request,
+    organization_id: UUID,
+    response: Response,
+    format: Optional[ImportFormat] = None,
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
+):
+    """
+    Imports availabilities from the request body, a CSV file (text/csv) or
+    newline delimited JSON (application/x-ndjson).
+    The body is streamed: the import pulls the body one chunk at a time, so it
+    is never held in memory as a whole.
+    """
+    format = format or ImportFormat.from_content_type(request.headers.get("content-type"))
+    lines = iter_lines(iterate_blocking(request.stream()))
+    try:
+        return await service.import_availabilities(organization_id, lines, format)
+    except InvalidAvailabilityException as ex:
+        response.status_code = status.HTTP_409_CONFLICT
+        return AvailabilityImportResult(result="error", message=str(ex))
+
+@router.get("/", response_model=Page[AvailabilityFull])
+async def list_availabilities(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    user_id: Optional[UUID] = None,
+    organization_id: Optional[UUID] = None,
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service),
+):
+    """
+    Lists the availabilities one page at a time, optionally restricted to a date
+    range (from/to, inclusive), a user and an organization.
+    """
+    filters = AvailabilityFilter(
+        date_from=date_from,
+        date_to=date_to,
+        user_id=user_id,
+        organization_id=organization_id
+    )
+    try:
+        return await service.list_page(limit, cursor, filters)
+    except (InvalidCursorException, InvalidDateRangeException) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{availability_id}", status_code=204)
-def delete_availability(
+async def delete_availability(
     availability_id: UUID,
     response: Response,
-    service: AvailabilityService = Depends(get_availability_service)
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
     """
     Deletes an availability with the given ID.
@@ -53,54 +125,54 @@ def delete_availability(
         404 Not Found if the availability does not exist
     """
     try:
-        service.delete(availability_id)
+        await service.delete(availability_id)
     except NotExistsException:
         response.status_code = status.HTTP_404_NOT_FOUND
 
 @router.get("/{availability_id}", response_model=AvailabilityFull|None)
-def get_availability(
+async def get_availability(
     availability_id: UUID,
     response: Response,
-    service: AvailabilityService = Depends(get_availability_service)
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
     try:
-        return service.get_by_id(availability_id)
+        return await service.get_by_id(availability_id)
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Availability not found")
 
 @router.put("/{availability_id}", response_model=AvailabilityFull)
-def update_availability(
+async def update_availability(
     availability_id: UUID,
     data: AvailabilityUpdate,
-    service: AvailabilityService = Depends(get_availability_service)
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
     try:
-        return service.update(availability_id, data)
+        return await service.update(availability_id, data)
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Availability not found")
     
 
 @router.get("/user/{user_id}", response_model=list[AvailabilityFull])
-def get_availabilities_by_user(
+async def get_availabilities_by_user(
     user_id: UUID,
     response: Response,
-    service: AvailabilityService = Depends(get_availability_service)
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
-    availabilities_by_user = service.get_by_user_id(user_id)
+    availabilities_by_user = await service.get_by_user_id(user_id)
     if not availabilities_by_user:
         response.status_code = status.HTTP_404_NOT_FOUND
         return []
     return availabilities_by_user
 
 @router.get("/user/{user_id}/date/{date}", response_model=list[AvailabilityFull])
-def get_availabilities_by_user_and_date(
+async def get_availabilities_by_user_and_date(
     user_id: UUID,
     date: date,  # Assuming date is passed as a string in 'YYYY-MM-DD' format
     response: Response,
-    service: AvailabilityService = Depends(get_availability_service)
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
     try:
-        availabilities = service.get_by_user_id_and_date(user_id, date)
+        availabilities = await service.get_by_user_id_and_date(user_id, date)
         if not availabilities:
             response.status_code = status.HTTP_404_NOT_FOUND
             return []
@@ -110,19 +182,19 @@ def get_availabilities_by_user_and_date(
         return {"result": "error", "message": str(ex)}
     
 @router.get("/date/{date}", response_model=list[AvailabilityFull])
-def get_availabilities_by_date(
+async def get_availabilities_by_date(
     date: date,  # Assuming date is passed as a string in 'YYYY-MM-DD' format
     response: Response,
-    service: AvailabilityService = Depends(get_availability_service)
+    service: AsyncService[AvailabilityService] = Depends(get_availability_service)
 ):
-    availabilities = service.get_by_date(date)
+    availabilities = await service.get_rows_by_date(date)
     if not availabilities:
         response.status_code = status.HTTP_404_NOT_FOUND
         return []
     return availabilities
 
 @router.options("/")
-def options_availabilities():
+async def options_availabilities():
     return Response(status_code=204, headers={
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
@@ -1,64 +1,136 @@
+import asyncio
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from typing import List
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 
-from shifty.application.dto.override_dto import OverrideCreate, OverrideRead, OverrideTake
+from shifty.application.dto.dto import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page
+from shifty.application.dto.override_dto import OverrideCreate, OverrideEvent, OverrideRead, OverrideTake, OverrideTakeRanges
 from shifty.domain.entities import Override, ShiftRead
-from shifty.infrastructure.db import get_session
+from shifty.dependencies import get_override_event_broker
+from shifty.infrastructure.async_services import AsyncService
+from shifty.infrastructure.db import async_user_session, get_session
+from shifty.infrastructure.notifications import OverrideEventBroker
 from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
 from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
 from shifty.application.use_cases.override_service import OverrideService
-from shifty.domain.exceptions import InvalidOverrideException
+from shifty.domain.exceptions import InvalidCursorException, InvalidOverrideException, OverlappingShiftException
+from shifty.security.dependencies import get_current_user_id
+
+# Seconds without events after which a keepalive comment is sent
+SSE_KEEPALIVE_SECONDS = 15
 
 router = APIRouter(prefix="/overrides", tags=["overrides"])
 
 def get_override_service(
-    session: Session = Depends(get_session)
+    session = Depends(get_session, scope="function")
 ):
-    return OverrideService(
+    return AsyncService(session, lambda session: OverrideService(
         OverrideRepository(session),
         ShiftRepository(session)
-    )
+    ))
 
 @router.post("/", response_model=OverrideRead, status_code=201)
-def create_override(
+async def create_override(
     data: OverrideCreate,
-    service: OverrideService = Depends(get_override_service)
+    service: AsyncService[OverrideService] = Depends(get_override_service)
 ):
     try:
-        return service.create(data)
+        return await service.create(data)
     except InvalidOverrideException as ex:
         raise HTTPException(status_code=400, detail=str(ex))
 
-@router.get("/", response_model=List[OverrideRead])
-def list_overrides(service: OverrideService = Depends(get_override_service)):
-    return service.list_all()
+@router.get("/", response_model=Page[OverrideRead])
+async def list_overrides(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: AsyncService[OverrideService] = Depends(get_override_service)
+):
+    try:
+        return await service.list_page(limit, cursor)
+    except InvalidCursorException as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
 
 @router.get("/open", response_model=List[OverrideRead])
-def list_open_overrides(service: OverrideService = Depends(get_override_service)):
-    return service.list_open()
+async def list_open_overrides(service: AsyncService[OverrideService] = Depends(get_override_service)):
+    return await service.list_open_rows()
+
+def format_sse(event: OverrideEvent) -> str:
+    return f"event: {event.event.value}\ndata: {event.model_dump_json()}\n\n"
+
+@router.get("/events")
+async def stream_override_events(
+    request: Request,
+    current_user_id: str = Depends(get_current_user_id),
+    broker: OverrideEventBroker = Depends(get_override_event_broker)
+):
+    """
+    Server-Sent Events stream of the overrides created and taken in the
+    organization of the current user, a push replacement for polling /open.
+    """
+    # The session is only needed for this lookup, not for the lifetime of the stream
+    async with async_user_session(current_user_id) as session:
+        user = await session.run_sync(lambda session: UserRepository(session).get_by_id(UUID(current_user_id)))
+    organization_id = user.organization_id if user else None
+    if organization_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    async def events():
+        queue = broker.subscribe(organization_id)
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comments keep proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            broker.unsubscribe(organization_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{override_id}", response_model=OverrideRead)
-def get_override(override_id: UUID, service: OverrideService = Depends(get_override_service)):
+async def get_override(override_id: UUID, service: AsyncService[OverrideService] = Depends(get_override_service)):
     try:
-        return service.get_by_id(override_id)
+        return await service.get_by_id(override_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Override not found")
 
 @router.post("/{override_id}/take", response_model=List[ShiftRead])
-def take_override(
+async def take_override(
     override_id: UUID,
     data: OverrideTake,
-    service: OverrideService = Depends(get_override_service)
+    service: AsyncService[OverrideService] = Depends(get_override_service)
+):
+    try:
+        return await service.take(override_id, data)
+    except (ValueError, InvalidOverrideException) as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    except OverlappingShiftException as ex:
+        raise HTTPException(status_code=409, detail=str(ex))
+
+@router.post("/{override_id}/take/ranges", response_model=List[ShiftRead])
+async def take_override_ranges(
+    override_id: UUID,
+    data: OverrideTakeRanges,
+    service: AsyncService[OverrideService] = Depends(get_override_service)
 ):
     try:
-        return service.take(override_id, data)
+        return await service.take_ranges(override_id, data.claims)
     except (ValueError, InvalidOverrideException) as ex:
         raise HTTPException(status_code=400, detail=str(ex))
+    except OverlappingShiftException as ex:
+        raise HTTPException(status_code=409, detail=str(ex))
 
 @router.options("/")
-def options_overrides():
+async def options_overrides():
     return Response(status_code=204, headers={
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
@@ -1,121 +1,167 @@
 from uuid import UUID
 from datetime import date
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Response
-from shifty.dependencies import get_shift_service
-from shifty.domain.entities import Shift, ShiftRead, ShiftSlot
-from shifty.application.dto.shift_dto import ShiftCreate, ShiftCalculationRequest, ShiftCalculationResult, ShiftBulkCreate, ShiftSlotCreate, ShiftSlotUpdate, ShiftSlotOut
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from shifty.dependencies import get_calculation_job_service, get_schedule_draft_service, get_shift_service
+from shifty.domain.entities import Rotation, Shift, ShiftRead, ShiftSlot, ShiftStatus
+from shifty.application.dto.dto import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page
+from shifty.application.dto.shift_dto import ShiftCreate, ShiftCalculationRequest, ShiftRangeCalculationRequest, ShiftCalculationResult, ShiftBulkCreate, ShiftBulkCreateResult, ShiftCompactionResult, ShiftFilter, ShiftLineageNode, DraftScheduleRead, RotationCreate, RotationMaterializeRequest, RotationMaterializeResult, RotationRead, ShiftSlotCreate, ShiftSlotUpdate, ShiftSlotOut
+from shifty.application.dto.calculation_job_dto import CalculationJobRead
+from shifty.application.use_cases.calculation_job_service import CalculationJobService
+from shifty.application.use_cases.schedule_draft_service import ScheduleDraftService
 from shifty.application.use_cases.shift_service import ShiftService
-from shifty.domain.exceptions import NotExistsException
+from shifty.infrastructure.async_services import AsyncService
+from shifty.domain.exceptions import InvalidCursorException, InvalidDateRangeException, InvalidShiftException, NotAllowedException, NotExistsException
 from shifty.security.dependencies import get_current_user_id
 
 router = APIRouter(prefix="/shifts", tags=["shifts"])
 
 
 @router.post("/", response_model=Shift, status_code=201)
-def create_shift(
+async def create_shift(
     data: ShiftCreate,
-    service: ShiftService = Depends(get_shift_service)
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
 ):
 
     try:
         # Create the shift using the service
-        shift = service.create(data)
+        shift = await service.create(data)
         return shift
     except Exception as e:
         # Handle exceptions, e.g., overlapping shifts
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[ShiftRead])
-def list_shifts(service: ShiftService = Depends(get_shift_service)):
-    shifts = service.list_all()
-    return shifts
+@router.get("/", response_model=Page[ShiftRead])
+async def list_shifts(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    user_id: Optional[UUID] = None,
+    organization_id: Optional[UUID] = None,
+    status: Optional[ShiftStatus] = None,
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
+):
+    """
+    Lists the shifts one page at a time, optionally restricted to a date range
+    (from/to, inclusive), a user, an organization and a status.
+    """
+    filters = ShiftFilter(
+        date_from=date_from,
+        date_to=date_to,
+        user_id=user_id,
+        organization_id=organization_id,
+        status=status
+    )
+    try:
+        return await service.list_page(limit, cursor, filters)
+    except (InvalidCursorException, InvalidDateRangeException) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{shift_id}", response_model=Optional[ShiftRead])
-def get_shift(shift_id: UUID, service: ShiftService = Depends(get_shift_service)):
+async def get_shift(shift_id: UUID, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    try:
+        return await service.get_by_id(shift_id)
+    except NotExistsException:
+        raise HTTPException(status_code=404, detail="Shift not found")
+
+@router.get("/{shift_id}/lineage", response_model=List[ShiftLineageNode])
+async def get_shift_lineage(shift_id: UUID, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    try:
+        return await service.get_lineage(shift_id)
+    except NotExistsException:
+        raise HTTPException(status_code=404, detail="Shift not found")
+
+@router.get("/{shift_id}/fragments", response_model=List[ShiftRead])
+async def get_active_shift_fragments(shift_id: UUID, service: AsyncService[ShiftService] = Depends(get_shift_service)):
     try:
-        return service.get_by_id(shift_id)
+        return await service.get_active_fragments(shift_id)
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Shift not found")
 
 @router.delete("/{shift_id}", status_code=204)
-def delete_shift(shift_id: UUID, response: Response, service: ShiftService = Depends(get_shift_service)):
+async def delete_shift(shift_id: UUID, response: Response, service: AsyncService[ShiftService] = Depends(get_shift_service)):
     try:
-        service.delete(shift_id)
+        await service.delete(shift_id)
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Shift not found")
 
 @router.get("/date/{date}", response_model=List[ShiftRead])
-def get_shifts_by_date(date: date, service: ShiftService = Depends(get_shift_service)):
-    shifts = service.get_by_date(date)
+async def get_shifts_by_date(date: date, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    shifts = await service.get_rows_by_date(date)
     if not shifts:
         raise HTTPException(status_code=404, detail="No shifts found for this date")
     return shifts
 
 @router.get("/user/{user_id}", response_model=List[ShiftRead])
-def get_shifts_by_user(user_id: UUID, service: ShiftService = Depends(get_shift_service)):
-    shifts = service.get_by_user(user_id)
+async def get_shifts_by_user(user_id: UUID, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    shifts = await service.get_by_user(user_id)
     if not shifts:
         raise HTTPException(status_code=404, detail="No shifts found for this user")
     return shifts
 
 @router.get("/user/{user_id}/date/{date}", response_model=List[ShiftRead])
-def get_shifts_by_user_and_date(user_id: UUID, date: date, service: ShiftService = Depends(get_shift_service)):
-    shifts = service.get_by_user_and_date(user_id, date)
+async def get_shifts_by_user_and_date(user_id: UUID, date: date, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    shifts = await service.get_by_user_and_date(user_id, date)
     if not shifts:
         raise HTTPException(status_code=404, detail="No shifts found for this user on this date")
     return shifts
 
 @router.put("/{shift_id}", response_model=ShiftRead)
-def update_shift(
+async def update_shift(
     shift_id: UUID,
     data: ShiftCreate,
-    service: ShiftService = Depends(get_shift_service)
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
 ):
     try:
-        updated = service.update(shift_id, data.dict(exclude_unset=True))
+        updated = await service.update(shift_id, data.dict(exclude_unset=True))
         return updated
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Shift not found")
 
-@router.get("/slots/all", response_model=List[ShiftSlot])
-def get_shift_slots(
-    service: ShiftService = Depends(get_shift_service),
+@router.get("/slots/all", response_model=Page[ShiftSlot])
+async def get_shift_slots(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: AsyncService[ShiftService] = Depends(get_shift_service),
     current_user_id: str = Depends(get_current_user_id)
 ):
-    return service.get_shift_slots()
+    try:
+        return await service.get_shift_slots_page(limit, cursor)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/slots/organization/{organization_id}", response_model=List[ShiftSlotOut])
-def get_shift_slots_by_organization(organization_id: UUID, service: ShiftService = Depends(get_shift_service)):
-    return service.get_shift_slots_by_organization(organization_id)
+async def get_shift_slots_by_organization(organization_id: UUID, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    return await service.get_shift_slots_by_organization(organization_id)
 
 @router.post("/slots", response_model=ShiftSlotOut, status_code=201)
-def create_shift_slot(
+async def create_shift_slot(
     data: ShiftSlotCreate,
-    service: ShiftService = Depends(get_shift_service)
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
 ):
     try:
-        shift_slot = service.create_shift_slot(data)
+        shift_slot = await service.create_shift_slot(data)
         return shift_slot
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/slots/{shift_slot_id}", response_model=ShiftSlotOut)
-def get_shift_slot(shift_slot_id: UUID, service: ShiftService = Depends(get_shift_service)):
+async def get_shift_slot(shift_slot_id: UUID, service: AsyncService[ShiftService] = Depends(get_shift_service)):
     try:
-        return service.get_shift_slot_by_id(shift_slot_id)
+        return await service.get_shift_slot_by_id(shift_slot_id)
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Shift slot not found")
 
 @router.put("/slots/{shift_slot_id}", response_model=ShiftSlotOut)
-def update_shift_slot(
+async def update_shift_slot(
     shift_slot_id: UUID,
     data: ShiftSlotUpdate,
-    service: ShiftService = Depends(get_shift_service)
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
 ):
     try:
-        updated_slot = service.update_shift_slot(shift_slot_id, data)
+        updated_slot = await service.update_shift_slot(shift_slot_id, data)
         return updated_slot
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Shift slot not found")
@@ -123,14 +169,14 @@ def update_shift_slot(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/slots/{shift_slot_id}", status_code=204)
-def delete_shift_slot(shift_slot_id: UUID, response: Response, service: ShiftService = Depends(get_shift_service)):
+async def delete_shift_slot(shift_slot_id: UUID, response: Response, service: AsyncService[ShiftService] = Depends(get_shift_service)):
     try:
-        service.delete_shift_slot(shift_slot_id)
+        await service.delete_shift_slot(shift_slot_id)
     except NotExistsException:
         raise HTTPException(status_code=404, detail="Shift slot not found")
 
 @router.options("/")
-def options_shifts():
+async def options_shifts():
     return Response(status_code=204, headers={
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
@@ -138,19 +184,102 @@ def options_shifts():
     })
 
 @router.post("/calculate", response_model=List[ShiftCalculationResult])
-def calculate_shifts(
+async def calculate_shifts(
     request: ShiftCalculationRequest,
-    service: ShiftService = Depends(get_shift_service)
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
+):
+    return await service.calculate_shifts(request)
+
+@router.post("/calculate/range", response_model=List[ShiftCalculationResult])
+async def calculate_shifts_range(
+    request: ShiftRangeCalculationRequest,
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
+):
+    try:
+        return await service.calculate_shifts_range(request)
+    except InvalidDateRangeException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/calculate/jobs", response_model=CalculationJobRead, status_code=202)
+async def submit_calculation_job(
+    request: ShiftRangeCalculationRequest,
+    service: AsyncService[CalculationJobService] = Depends(get_calculation_job_service),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    try:
+        job = await service.submit(request, UUID(current_user_id))
+        return await service.get_by_id(job.id)
+    except InvalidDateRangeException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/calculate/jobs/{job_id}", response_model=CalculationJobRead)
+async def get_calculation_job(job_id: UUID, service: AsyncService[CalculationJobService] = Depends(get_calculation_job_service)):
+    try:
+        return await service.get_by_id(job_id)
+    except NotExistsException:
+        raise HTTPException(status_code=404, detail="Calculation job not found")
+
+@router.get("/drafts/{date}", response_model=DraftScheduleRead)
+async def get_draft_schedule(
+    date: date,
+    organization_id: UUID,
+    service: AsyncService[ScheduleDraftService] = Depends(get_schedule_draft_service)
 ):
-    return service.calculate_shifts(request)
+    try:
+        return await service.get(organization_id, date)
+    except NotExistsException:
+        raise HTTPException(status_code=404, detail="Draft schedule not found")
+
+@router.post("/rotations", response_model=Rotation, status_code=201)
+async def create_rotation(data: RotationCreate, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    try:
+        return await service.create_rotation(data)
+    except InvalidShiftException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/rotations/{rotation_id}", response_model=RotationRead)
+async def get_rotation(rotation_id: UUID, service: AsyncService[ShiftService] = Depends(get_shift_service)):
+    try:
+        rotation = await service.get_rotation_by_id(rotation_id)
+        return RotationRead(**rotation.model_dump(), entries=await service.get_rotation_entries(rotation_id))
+    except NotExistsException:
+        raise HTTPException(status_code=404, detail="Rotation not found")
+
+@router.post("/rotations/{rotation_id}/materialize", response_model=RotationMaterializeResult)
+async def materialize_rotation(
+    rotation_id: UUID,
+    request: RotationMaterializeRequest,
+    service: AsyncService[ShiftService] = Depends(get_shift_service),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    try:
+        return await service.materialize_rotation(UUID(current_user_id), rotation_id, request)
+    except InvalidDateRangeException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotExistsException:
+        raise HTTPException(status_code=404, detail="Rotation not found")
+    except NotAllowedException as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+@router.post("/compact", response_model=ShiftCompactionResult)
+async def compact_shift_fragments(
+    organization_id: Optional[UUID] = None,
+    date: Optional[date] = None,
+    service: AsyncService[ShiftService] = Depends(get_shift_service),
+    current_user_id: str = Depends(get_current_user_id)
+):
+    try:
+        return await service.compact_fragments(UUID(current_user_id), organization_id, date)
+    except NotAllowedException as e:
+        raise HTTPException(status_code=403, detail=str(e))
 
-@router.post("/bulk", response_model=List[Shift], status_code=201)
-def create_shifts_bulk(
+@router.post("/bulk", response_model=ShiftBulkCreateResult, status_code=201)
+async def create_shifts_bulk(
     data: ShiftBulkCreate,
-    service: ShiftService = Depends(get_shift_service)
+    service: AsyncService[ShiftService] = Depends(get_shift_service)
 ):
     try:
-        shifts = service.create_bulk(data.shifts)
+        shifts = await service.create_bulk(data.shifts)
         return shifts
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
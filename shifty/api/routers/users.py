@@ -1,38 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from uuid import UUID
 from shifty.application.use_cases.user_service import UserService
+from shifty.application.dto.dto import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, Page
 from shifty.application.dto.user_dto import UserFull, UserCreate
 from shifty.domain.entities import User
+from shifty.domain.exceptions import InvalidCursorException
+from shifty.infrastructure.async_services import AsyncService
 from shifty.infrastructure.db import get_session
 from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-def get_user_service(session = Depends(get_session)):
-    return UserService(UserRepository(session))
+def get_user_service(session = Depends(get_session, scope="function")):
+    return AsyncService(session, lambda session: UserService(UserRepository(session)))
 
-@router.get("/", response_model=List[User])
-def list_users(service: UserService = Depends(get_user_service)):
-    return service.get_all()
+@router.get("/", response_model=Page[User])
+async def list_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: AsyncService[UserService] = Depends(get_user_service)
+):
+    try:
+        return await service.get_page(limit, cursor)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{user_id}", response_model=UserFull)
-def get_user(user_id: UUID, service: UserService = Depends(get_user_service)):
-    user = service.get_by_id(user_id)
+async def get_user(user_id: UUID, service: AsyncService[UserService] = Depends(get_user_service)):
+    user = await service.get_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.post("/", response_model=UserFull, status_code=201)
-def create_user(user: UserCreate, service: UserService = Depends(get_user_service)):
+async def create_user(user: UserCreate, service: AsyncService[UserService] = Depends(get_user_service)):
     user_obj = User(**user.model_dump())
-    return service.add(user_obj)
+    return await service.add(user_obj)
 
 @router.delete("/{user_id}", status_code=204)
-def delete_user(user_id: UUID, service: UserService = Depends(get_user_service)):
+async def delete_user(user_id: UUID, service: AsyncService[UserService] = Depends(get_user_service)):
     # service.delete(user_id)
     return Response(status_code=204)
 
 @router.get("/role/{role}", response_model=List[UserFull])
-def get_users_by_role(role: str, service: UserService = Depends(get_user_service)):
-    return service.get_by_role(role)
+async def get_users_by_role(role: str, service: AsyncService[UserService] = Depends(get_user_service)):
+    return await service.get_by_role(role)
@@ -1,11 +1,19 @@
 import uuid
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, time, datetime
 from typing import Optional
 from shifty.domain.entities import Availability, User
 from shifty.application.dto.dto import ApiResult
 
 
+class AvailabilityFilter(BaseModel):
+    """Criteria of an availability listing; the ones left to None are not applied."""
+    date_from: Optional[date] = None  # Inclusive
+    date_to: Optional[date] = None  # Inclusive
+    user_id: Optional[uuid.UUID] = None
+    organization_id: Optional[uuid.UUID] = None
+
+
 class AvailabilityCreate(BaseModel):
     user_id: uuid.UUID
     organization_id: uuid.UUID
@@ -16,6 +24,18 @@ class AvailabilityCreate(BaseModel):
     created_at: datetime = datetime.now()  # Assuming this is set automatically when creating an availability
 
 
+class RecurringAvailabilityCreate(BaseModel):
+    user_id: uuid.UUID
+    organization_id: uuid.UUID
+    weekday: int = Field(ge=0, le=6)  # 0 = Monday ... 6 = Sunday
+    start_time: time
+    end_time: time
+    valid_from: date
+    valid_until: Optional[date] = None  # Inclusive, None for no end
+    exceptions: list[date] = []  # Dates the availability does not apply to
+    note: Optional[str] = None
+
+
 class AvailabilityUpdate(BaseModel):
     date: date
     start_time: Optional[time] = None
@@ -32,8 +52,27 @@ class AvailabilityResult(ApiResult):
     availability: Availability | None = None  # The availability object if the operation was successful
 
 
+class AvailabilityImportError(BaseModel):
+    line: int  # Line of the import file
+    message: str
+
+
+class AvailabilityImportResult(ApiResult):
+    """
+    Represents the result of an availability import.
+    Only the first errors are listed, `rejected` counts all of them.
+    """
+    kind: str = "AvailabilityImport"
+    imported: int = 0
+    rejected: int = 0
+    errors: list[AvailabilityImportError] = []
+
+
 class AvailabilityFull(BaseModel):
-    id: uuid.UUID
+    # None for the occurrences of a recurring availability, which have no ID of their own:
+    # recurring_id is the template they are expanded from
+    id: Optional[uuid.UUID] = None
+    recurring_id: Optional[uuid.UUID] = None
     user_id: uuid.UUID
     organization_id: uuid.UUID
     date: date
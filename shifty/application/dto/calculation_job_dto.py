@@ -0,0 +1,23 @@
+from datetime import date, time, datetime
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+from shifty.domain.entities import CalculationJobStatus
+
+
+class CalculationJobAssignment(BaseModel):
+    date: date
+    shift_slot_id: Optional[UUID] = None
+    user_id: UUID
+    start_time: time
+    end_time: time
+
+
+class CalculationJobRead(BaseModel):
+    id: UUID
+    status: CalculationJobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    results: Optional[list[CalculationJobAssignment]] = None
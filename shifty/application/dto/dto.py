@@ -1,7 +1,20 @@
+from typing import Generic, List, Optional, TypeVar
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
 
 class ApiResult(BaseModel):
     result: str  # e.g., "success" or "error"
     message: str  # A message describing the result of the operation
-    kind: str # Type of response
\ No newline at end of file
+    kind: str # Type of response
+
+
+# Page size of the list endpoints, when none is requested, and the largest accepted
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # Pass it back as `cursor` to get the next page; None on the last page
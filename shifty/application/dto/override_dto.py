@@ -1,5 +1,6 @@
+import enum
 from datetime import date, time, datetime
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 from uuid import UUID
 from pydantic import BaseModel
 
@@ -30,6 +31,9 @@ class OverrideTake(BaseModel):
     start_time: time
     end_time: time
 
+class OverrideTakeRanges(BaseModel):
+    claims: List[OverrideTake]
+
 class OverrideUpdate(BaseModel):
     shift_id: Optional[UUID] = None
     requester_id: Optional[UUID] = None
@@ -38,4 +42,32 @@ class OverrideUpdate(BaseModel):
     end_time: time
     taken_by_id: Optional[UUID] = None
     taken_at: Optional[datetime] = None
-    is_taken: Optional[bool] = None
\ No newline at end of file
+    is_taken: Optional[bool] = None
+
+class OverrideEventType(str, enum.Enum):
+    CREATED = "created"
+    TAKEN = "taken"
+
+class OverrideEvent(BaseModel):
+    """A change to an override, pushed to the clients of its organization."""
+    event: OverrideEventType
+    override_id: UUID
+    organization_id: UUID
+    shift_id: UUID
+    date: date
+    start_time: time
+    end_time: time
+    taken_by_id: Optional[UUID] = None
+
+    @classmethod
+    def from_override(cls, event: OverrideEventType, override) -> "OverrideEvent":
+        return cls(
+            event=event,
+            override_id=override.id,
+            organization_id=override.organization_id,
+            shift_id=override.shift_id,
+            date=override.date,
+            start_time=override.start_time,
+            end_time=override.end_time,
+            taken_by_id=override.taken_by_id
+        )
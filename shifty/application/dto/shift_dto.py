@@ -1,8 +1,9 @@
 from datetime import date, time, datetime
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel
-from shifty.domain.entities import ShiftSlot, ShiftBase, User
+from pydantic import BaseModel, Field, model_validator
+from shifty.domain.entities import DraftAssignment, RotationEntry, Shift, ShiftSlot, ShiftBase, ShiftStatus, User
+from shifty.application.use_cases.solvers import CalculationMode
 
 
 class ShiftCreate(BaseModel):
@@ -18,6 +19,22 @@ class ShiftCreate(BaseModel):
 class ShiftCalculationRequest(BaseModel):
     date: date
     organization_id: UUID
+    mode: CalculationMode = CalculationMode.GREEDY
+
+
+class ShiftRangeCalculationRequest(BaseModel):
+    start_date: date
+    end_date: date
+    organization_id: UUID
+    mode: CalculationMode = CalculationMode.GREEDY
+    parallel: bool = False  # Spread the per-day work across a process pool (greedy mode only)
+
+    @model_validator(mode="after")
+    def check_parallel_mode(self):
+        # The optimal solver carries the fairness load from one day to the next
+        if self.parallel and self.mode != CalculationMode.GREEDY:
+            raise ValueError("parallel is only supported by the greedy mode")
+        return self
 
 
 class ShiftCalculationResult(ShiftBase):
@@ -25,6 +42,14 @@ class ShiftCalculationResult(ShiftBase):
     user: User | None = None
 
 
+class DraftScheduleRead(BaseModel):
+    organization_id: UUID
+    date: date
+    mode: CalculationMode
+    updated_at: datetime
+    assignments: list[DraftAssignment]
+
+
 class ShiftSlotOut(BaseModel):
     id: UUID
     organization_id: UUID
@@ -45,6 +70,46 @@ class ShiftBulkCreate(BaseModel):
     shifts: list[ShiftCreate]
 
 
+class ShiftBulkItemResult(BaseModel):
+    index: int  # Position of the item in the request
+    shift: Optional[Shift] = None
+    error: Optional[str] = None
+
+
+class ShiftBulkCreateResult(BaseModel):
+    created: int
+    failed: int
+    items: list[ShiftBulkItemResult]
+
+
+class ShiftFilter(BaseModel):
+    """Criteria of a shift listing; the ones left to None are not applied."""
+    date_from: Optional[date] = None  # Inclusive
+    date_to: Optional[date] = None  # Inclusive
+    user_id: Optional[UUID] = None
+    organization_id: Optional[UUID] = None
+    status: Optional[ShiftStatus] = None
+
+
+class ShiftLineageNode(BaseModel):
+    id: UUID
+    user_id: UUID
+    origin_user_id: UUID
+    organization_id: UUID
+    date: date
+    start_time: time
+    end_time: time
+    status: ShiftStatus
+    note: Optional[str] = None
+    parent_shift_id: Optional[UUID] = None
+    depth: int  # 0 for the originally planned shift
+
+
+class ShiftCompactionResult(BaseModel):
+    merged: int  # Fragments extended over their contiguous neighbours
+    reclaimed: int  # Fragments deleted
+
+
 class ShiftSlotCreate(BaseModel):
     organization_id: UUID
     name: str
@@ -62,3 +127,45 @@ class ShiftSlotUpdate(BaseModel):
     description: Optional[str] = None
     expected_workers: Optional[int] = None
     is_active: Optional[bool] = None
+
+
+class RotationEntryCreate(BaseModel):
+    user_id: UUID
+    shift_slot_id: UUID
+    week: int = Field(default=0, ge=0)  # Week of the cycle
+    weekday: int = Field(ge=0, le=6)  # 0 = Monday ... 6 = Sunday
+
+
+class RotationCreate(BaseModel):
+    organization_id: UUID
+    name: str
+    cycle_weeks: int = Field(default=1, ge=1)
+    starts_on: date
+    entries: list[RotationEntryCreate]
+
+
+class RotationRead(BaseModel):
+    id: UUID
+    organization_id: UUID
+    name: str
+    cycle_weeks: int
+    starts_on: date
+    created_at: datetime
+    entries: list[RotationEntry]
+
+
+class RotationMaterializeRequest(BaseModel):
+    start_date: date
+    end_date: date
+
+
+class RotationConflict(BaseModel):
+    user_id: UUID
+    date: date
+    shift_slot_id: UUID
+
+
+class RotationMaterializeResult(BaseModel):
+    created: int
+    skipped: int  # Shifts not created, one per conflict
+    conflicts: list[RotationConflict]  # Shifts overlapping other shifts of the user
@@ -0,0 +1,267 @@
+import heapq
+import multiprocessing
+import os
+import random
+import threading
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+from shifty.domain.entities import Availability, ShiftSlot
+
+
+# Process pool of the parallel calculations, shared by every request and created on
+# first use. Its processes are spawned: forking the server, whose threadpool runs the
+# calculations, would copy a multithreaded process.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool, sized to the CPU count.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+class SlotWindow(NamedTuple):
+    """Picklable stand-in for a ShiftSlot, used to ship work to pool processes."""
+    start_time: time
+    end_time: time
+    expected_workers: int
+
+
+class AvailabilityWindow(NamedTuple):
+    """Picklable stand-in for an Availability, used to ship work to pool processes."""
+    user_id: UUID
+    start_time: time
+    end_time: time
+
+
+class CoverageIndex:
+    """
+    Index of availabilities grouped by the interval they cover.
+
+    Availabilities are bucketed by their (start_time, end_time) pair and the
+    buckets are sorted once by start/end, so the candidates covering a slot
+    are found with a bisect on the start times instead of a scan of every
+    availability. Each bucket keeps the positions of its availabilities in the
+    original list order, which lets `take` return the same users, in the same
+    order, as a first-fit scan over the list.
+    """
+
+    def __init__(self, availabilities: Sequence[Availability]):
+        self._user_ids: List[UUID] = [a.user_id for a in availabilities]
+        buckets: dict[Tuple[time, time], deque] = {}
+        for position, a in enumerate(availabilities):
+            buckets.setdefault((a.start_time, a.end_time), deque()).append(position)
+        self._keys = sorted(buckets)
+        self._starts = [start for start, _ in self._keys]
+        self._buckets = [buckets[key] for key in self._keys]
+
+    def take(self, start: time, end: time, count: int, assigned: set) -> List[UUID]:
+        """
+        Pick up to `count` users whose availability fully covers [start, end]
+        and who are not in `assigned`, in original list order.
+        The chosen users are added to `assigned`.
+        :param start: Start time of the slot to cover.
+        :param end: End time of the slot to cover.
+        :param count: Maximum number of users to pick.
+        :param assigned: Set of already assigned user IDs, updated in place.
+        :return: List of chosen user IDs.
+        """
+        if count <= 0:
+            return []
+        heads = []
+        for i in range(bisect_right(self._starts, start)):
+            bucket = self._buckets[i]
+            if bucket and self._keys[i][1] >= end:
+                heapq.heappush(heads, (bucket[0], i))
+
+        chosen = []
+        while heads and len(chosen) < count:
+            position, i = heapq.heappop(heads)
+            bucket = self._buckets[i]
+            # Entries are consumed once: either the user gets assigned now or
+            # was assigned before, and in both cases they can never be picked again.
+            bucket.popleft()
+            user_id = self._user_ids[position]
+            if user_id not in assigned:
+                assigned.add(user_id)
+                chosen.append(user_id)
+            if bucket:
+                heapq.heappush(heads, (bucket[0], i))
+        return chosen
+
+
+class UnassignedUsers:
+    """
+    Ordered view of the users that are not assigned yet.
+
+    Backed by a Fenwick tree, so both `discard` and positional lookup cost
+    O(log n). It behaves like the list `[u for u in users if u not in assigned]`
+    and can be passed to `random.choice` directly.
+    """
+
+    def __init__(self, user_ids: Iterable[UUID]):
+        self._user_ids = list(user_ids)
+        self._positions = {user_id: i for i, user_id in enumerate(self._user_ids)}
+        self._size = len(self._user_ids)
+        self._tree = [0] * (self._size + 1)
+        for i in range(1, self._size + 1):
+            self._tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= self._size:
+                self._tree[parent] += self._tree[i]
+        self._alive = [True] * self._size
+        self._count = self._size
+        self._top_bit = 1 << (self._size.bit_length() - 1) if self._size else 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> UUID:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("index out of range")
+        # Descend the tree looking for the (index + 1)-th alive user
+        position = 0
+        remaining = index + 1
+        step = self._top_bit
+        while step:
+            next_position = position + step
+            if next_position <= self._size and self._tree[next_position] < remaining:
+                position = next_position
+                remaining -= self._tree[next_position]
+            step >>= 1
+        return self._user_ids[position]
+
+    def discard(self, user_id: UUID) -> None:
+        position = self._positions.get(user_id)
+        if position is None or not self._alive[position]:
+            return
+        self._alive[position] = False
+        self._count -= 1
+        i = position + 1
+        while i <= self._size:
+            self._tree[i] -= 1
+            i += i & -i
+
+
+def assign_greedy(
+    shift_slots: Sequence[ShiftSlot],
+    availabilities: Sequence[Availability],
+    worker_ids: Sequence[UUID],
+    rng: Optional[random.Random] = None
+) -> List[Tuple[ShiftSlot, UUID]]:
+    """
+    First-fit greedy assignment of users to shift slots.
+
+    Slots are filled in order. Each slot first takes the users whose availability
+    fully covers it, in availability order, then tops up with random workers
+    not assigned yet. No user gets more than one slot.
+    With the same random state it yields exactly the same assignment as scanning
+    every availability for every slot, in O((n + slots * buckets) log n).
+    :param shift_slots: Slots to fill, in priority order.
+    :param availabilities: Availabilities of the day.
+    :param worker_ids: IDs of the workers eligible for the random fallback.
+    :param rng: Random generator for the fallback, defaults to the `random` module.
+    :return: List of (shift slot, user ID) pairs.
+    """
+    choice = rng.choice if rng is not None else random.choice
+    index = CoverageIndex(availabilities)
+    unassigned = UnassignedUsers(worker_ids)
+    assigned: set = set()
+    assignments = []
+    for shift_slot in shift_slots:
+        needed = getattr(shift_slot, 'expected_workers', 1)
+        chosen = index.take(shift_slot.start_time, shift_slot.end_time, needed, assigned)
+        for user_id in chosen:
+            unassigned.discard(user_id)
+            assignments.append((shift_slot, user_id))
+        # If not enough, pick random users not already assigned
+        for _ in range(needed - len(chosen)):
+            if not unassigned:
+                break
+            user_id = choice(unassigned)
+            unassigned.discard(user_id)
+            assigned.add(user_id)
+            assignments.append((shift_slot, user_id))
+    return assignments
+
+
+def _assign_day(
+    slot_windows: List[SlotWindow],
+    availability_windows: List[AvailabilityWindow],
+    worker_ids: List[UUID],
+    seed: int
+) -> List[Tuple[int, UUID]]:
+    """
+    Pool entry point: assign one day and return (slot position, user ID) pairs.
+    """
+    positions = {id(window): i for i, window in enumerate(slot_windows)}
+    assignments = assign_greedy(slot_windows, availability_windows, worker_ids, random.Random(seed))
+    return [(positions[id(window)], user_id) for window, user_id in assignments]
+
+
+def assign_greedy_range(
+    shift_slots: Sequence[ShiftSlot],
+    availabilities: Iterable[Availability],
+    dates: Iterable[date],
+    worker_ids: Sequence[UUID],
+    rng: Optional[random.Random] = None,
+    parallel: bool = False
+) -> Dict[date, List[Tuple[ShiftSlot, UUID]]]:
+    """
+    Run `assign_greedy` for every date of a window in a single pass.
+
+    Availabilities for the whole window are grouped by date once; slots and workers
+    are shared by every day. Each day is independent, so when `parallel` is set
+    the days are spread across the shared process pool. In that case every day gets its own
+    generator, seeded from `rng`, so the outcome is still reproducible.
+    :param shift_slots: Slots to fill each day, in priority order.
+    :param availabilities: Availabilities of the whole window.
+    :param dates: Dates to compute.
+    :param worker_ids: IDs of the workers eligible for the random fallback.
+    :param rng: Random generator, defaults to the `random` module.
+    :param parallel: Whether to compute the days in the process pool rather than in-process.
+    :return: Assignments keyed by date.
+    """
+    dates = list(dates)
+    by_date: Dict[date, List[Availability]] = {day: [] for day in dates}
+    for a in availabilities:
+        if a.date in by_date:
+            by_date[a.date].append(a)
+
+    if not parallel:
+        return {day: assign_greedy(shift_slots, by_date[day], worker_ids, rng) for day in dates}
+
+    getrandbits = rng.getrandbits if rng is not None else random.getrandbits
+    slot_windows = [
+        SlotWindow(s.start_time, s.end_time, getattr(s, 'expected_workers', 1)) for s in shift_slots
+    ]
+    worker_ids = list(worker_ids)
+    pool = get_process_pool()
+    futures = {
+        day: pool.submit(
+            _assign_day,
+            slot_windows,
+            [AvailabilityWindow(a.user_id, a.start_time, a.end_time) for a in by_date[day]],
+            worker_ids,
+            getrandbits(64)
+        )
+        for day in dates
+    }
+    return {
+        day: [(shift_slots[position], user_id) for position, user_id in future.result()]
+        for day, future in futures.items()
+    }
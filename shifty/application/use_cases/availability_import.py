@@ -0,0 +1,123 @@
+import codecs
+import csv
+import enum
+import json
+from datetime import date, time
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+from uuid import UUID
+
+class ImportFormat(str, enum.Enum):
+    """
+    Enum representing the formats accepted by the availability import.
+    """
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+    @classmethod
+    def from_content_type(cls, content_type: Optional[str]) -> "ImportFormat":
+        if content_type and content_type.split(";")[0].strip() in ("application/x-ndjson", "application/ndjson"):
+            return cls.NDJSON
+        return cls.CSV
+
+
+class ImportRow(NamedTuple):
+    """A parsed row of an import file."""
+    line: int
+    user_id: UUID
+    date: date
+    start_time: time
+    end_time: time
+    note: Optional[str]
+
+
+class ImportFailure(NamedTuple):
+    """A row of an import file that could not be imported."""
+    line: int
+    message: str
+
+
+def iter_lines(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Splits a stream of byte chunks into text lines, keeping the line endings.
+    Only the current incomplete line is buffered.
+    :param chunks: Byte chunks, e.g. the body of a request.
+    :param encoding: Encoding of the stream.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        # The last piece is the beginning of the next line
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def parse_record(line: int, record: dict) -> ImportRow:
+    """
+    Converts a record of an import file into a row.
+    :param line: Line number of the record in the file.
+    :param record: Mapping of column names to raw values.
+    :raises ValueError: If a value is missing or malformed.
+    """
+    try:
+        note = record.get("note")
+        return ImportRow(
+            line=line,
+            user_id=UUID(str(record["user_id"])),
+            date=date.fromisoformat(str(record["date"])),
+            start_time=time.fromisoformat(str(record["start_time"])),
+            end_time=time.fromisoformat(str(record["end_time"])),
+            note=str(note) if note not in (None, "") else None
+        )
+    except KeyError as ex:
+        raise ValueError(f"Missing column {ex.args[0]}.") from ex
+    except (TypeError, ValueError) as ex:
+        raise ValueError(f"Invalid value: {ex}") from ex
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Union[ImportRow, ImportFailure]]:
+    """
+    Parses a CSV import file, one record at a time. The header row names the
+    columns: user_id, date, start_time, end_time and, optionally, note.
+    :param lines: Lines of the file.
+    """
+    reader = csv.DictReader(lines)
+    for record in reader:
+        try:
+            yield parse_record(reader.line_num, record)
+        except ValueError as ex:
+            yield ImportFailure(reader.line_num, str(ex))
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Union[ImportRow, ImportFailure]]:
+    """
+    Parses a newline delimited JSON import file, one record at a time. Each line is
+    an object with the same keys as the CSV columns.
+    :param lines: Lines of the file.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object.")
+            yield parse_record(line_number, record)
+        except ValueError as ex:
+            yield ImportFailure(line_number, str(ex))
+
+
+def parse_import(lines: Iterable[str], format: ImportFormat) -> Iterator[Union[ImportRow, ImportFailure]]:
+    """
+    Parses an import file in the given format.
+    :param lines: Lines of the file.
+    :param format: Format of the file.
+    """
+    if format == ImportFormat.NDJSON:
+        return parse_ndjson(lines)
+    return parse_csv(lines)
@@ -1,9 +1,23 @@
+import logging
 from datetime import date, datetime, time
+from typing import Iterable, Iterator, Optional
 from uuid import uuid4, UUID
-from shifty.domain.entities import Availability
+from shifty.domain.entities import Availability, RecurringAvailability
+from shifty.domain.intervals import IntervalSet
 from shifty.domain.repositories import AvailabilityRepositoryInterface
 from shifty.domain.exceptions import InvalidDateRangeException, NotExistsException, InvalidAvailabilityException
-from shifty.application.dto.availability_dto import AvailabilityCreate, AvailabilityUpdate
+from shifty.application.dto.dto import Page
+from shifty.application.dto.availability_dto import AvailabilityCreate, AvailabilityFilter, AvailabilityImportError, AvailabilityImportResult, AvailabilityUpdate, RecurringAvailabilityCreate
+from shifty.application.use_cases.availability_import import ImportFailure, ImportFormat, ImportRow, parse_import
+from shifty.application.use_cases.offload import Offload, run_inline
+from shifty.application.use_cases.schedule_draft_service import ScheduleDraftService
+
+logger = logging.getLogger(__name__)
+
+# Rows validated and loaded together by an import; bounds the memory used
+IMPORT_BATCH_SIZE = 5000
+# Errors listed in an import result, the others are only counted
+MAX_REPORTED_ERRORS = 1000
 
 
 def start_time_must_be_before_end_time(start_time: time, end_time: time) -> bool:
@@ -21,22 +35,47 @@ def availability_date_must_be_today_or_future(date: date) -> bool:
     """
     return date >= datetime.now().date()
 
-def availability_must_not_overlap(existing_availabilities: list[Availability], new_availability: Availability) -> bool:
-    """
-    Validates that the new availability does not overlap with existing availabilities.
-    :param existing_availabilities: List of existing availabilities.
-    :param new_availability: The new availability to check against existing ones.
-    """
-    for existing in existing_availabilities:
-        if (existing.date == new_availability.date and
-            existing.start_time < new_availability.end_time and
-            existing.end_time > new_availability.start_time):
-            return False
-    return True
-
 class AvailabilityService:
-    def __init__(self, repository: AvailabilityRepositoryInterface):
+    def __init__(
+        self,
+        repository: AvailabilityRepositoryInterface,
+        draft_service: Optional[ScheduleDraftService] = None,
+        offload: Offload = run_inline
+    ):
         self.repository = repository
+        # When set, draft schedules are repaired after every availability change
+        self.draft_service = draft_service
+        # Parses the imports, off the event loop when called from an async route
+        self.offload = offload
+
+    def _repair_draft(self, organization_id: UUID, date: date, changed: list[tuple[time, time]]) -> None:
+        if not self.draft_service or not changed:
+            return
+        try:
+            self.draft_service.repair(organization_id, date, changed)
+        except Exception as ex:
+            # The availability change is already saved; a stale draft must not undo it
+            logger.warning(f"Draft schedule repair failed for {organization_id} on {date}: {ex}")
+
+    def _repair_drafts_of_recurring(self, recurring: RecurringAvailability) -> None:
+        """
+        Repairs the draft schedules of the dates a created or deleted template occurs on,
+        from today on: their availabilities are the ones that changed.
+        :param recurring: The created or deleted template.
+        """
+        if not self.draft_service:
+            return
+        start_date = max(recurring.valid_from, datetime.now().date())
+        if recurring.valid_until is not None and recurring.valid_until < start_date:
+            return
+        try:
+            dates = self.draft_service.get_draft_dates(recurring.organization_id, start_date, recurring.valid_until)
+        except Exception as ex:
+            logger.warning(f"Draft schedule repair failed for {recurring.organization_id}: {ex}")
+            return
+        for day in dates:
+            if recurring.occurs_on(day):
+                self._repair_draft(recurring.organization_id, day, [(recurring.start_time, recurring.end_time)])
 
     def create(self, data: AvailabilityCreate) -> Availability:
         # Validate the start and end times
@@ -47,10 +86,9 @@ class AvailabilityService:
         if not availability_date_must_be_today_or_future(data.date):
             raise InvalidDateRangeException("Availability date must be today or in the future.")
         
-        # Retrieve existing availabilities for the user on the same date
-        existing_availabilities = self.repository.get_by_user_id_and_date(data.user_id, data.date)
-        # Validate that the new availability does not overlap with existing ones
-        new_availability = Availability(
+        # Overlaps with existing availabilities are rejected by the availabilities_no_overlap
+        # constraint: the repository raises InvalidAvailabilityException.
+        entity = Availability(
             id=uuid4(),  # Assuming the ID is generated elsewhere or by the database
             user_id=data.user_id,
             organization_id=data.organization_id,  # Assuming this is part of the DTO
@@ -60,28 +98,169 @@ class AvailabilityService:
             created_at=datetime.now(),
             note=data.note,  # Assuming note is optional and can be None
         )
+        saved = self.repository.add(entity)
+        self._repair_draft(saved.organization_id, saved.date, [(saved.start_time, saved.end_time)])
+        return saved
 
-        if not availability_must_not_overlap(existing_availabilities, new_availability):
-            raise InvalidAvailabilityException("New availability overlaps with existing availabilities.")
+    def create_recurring(self, data: RecurringAvailabilityCreate) -> RecurringAvailability:
+        """
+        Creates a weekly availability template.
+        :param data: The template to create.
+        :raises InvalidDateRangeException: If the times or the validity period are inverted.
+        :raises InvalidAvailabilityException: If it overlaps another template of the user.
+        """
+        if not start_time_must_be_before_end_time(data.start_time, data.end_time):
+            raise InvalidDateRangeException("Start time must be before end time.")
+        if data.valid_until is not None and data.valid_until < data.valid_from:
+            raise InvalidDateRangeException("Valid until must not be before valid from.")
 
-        entity = Availability(
-            id=uuid4(),  # Assuming the ID is generated elsewhere or by the database
+        # Templates of the same weekday whose validity periods intersect must not overlap
+        same_period = IntervalSet.from_intervals(
+            (t.start_time, t.end_time)
+            for t in self.repository.get_recurring_by_user_id(data.user_id)
+            if t.weekday == data.weekday
+            and (t.valid_until is None or t.valid_until >= data.valid_from)
+            and (data.valid_until is None or data.valid_until >= t.valid_from)
+        )
+        if same_period.overlaps(data.start_time, data.end_time):
+            raise InvalidAvailabilityException("New recurring availability overlaps with existing recurring availabilities.")
+
+        saved = self.repository.add_recurring(RecurringAvailability(
             user_id=data.user_id,
-            organization_id=data.organization_id,  # Assuming this is part of the DTO
-            date=data.date,
+            organization_id=data.organization_id,
+            weekday=data.weekday,
             start_time=data.start_time,
             end_time=data.end_time,
-            created_at=datetime.now(),
-            note=data.note,  # Assuming note is optional and can be None
-        )
-        saved = self.repository.add(entity)
+            valid_from=data.valid_from,
+            valid_until=data.valid_until,
+            exceptions=sorted({day.isoformat() for day in data.exceptions}),
+            note=data.note,
+            created_at=datetime.now()
+        ))
+        self._repair_drafts_of_recurring(saved)
         return saved
 
+    def get_recurring_by_user_id(self, user_id: UUID) -> list[RecurringAvailability]:
+        """
+        Retrieves the weekly availability templates of a user.
+        :param user_id: The ID of the user.
+        """
+        return self.repository.get_recurring_by_user_id(user_id)
+
+    def delete_recurring(self, recurring_id: UUID) -> None:
+        try:
+            deleted = self.repository.delete_recurring(recurring_id)
+        except ValueError as ex:
+            raise NotExistsException(f"Recurring availability with ID {recurring_id} does not exist") from ex
+        self._repair_drafts_of_recurring(deleted)
+
+    def import_availabilities(
+        self,
+        organization_id: UUID,
+        lines: Iterable[str],
+        format: ImportFormat = ImportFormat.CSV,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> AvailabilityImportResult:
+        """
+        Imports availabilities from a CSV or NDJSON file, read one line at a time.
+        Rows are validated in batches: ranges and dates like `create`, overlaps among
+        the rows of the batch in memory, overlaps with stored availabilities (earlier
+        batches included) by the repository when the batch is loaded. Only one batch
+        is held in memory, whatever the size of the file.
+        :param organization_id: Organization of the imported availabilities.
+        :param lines: Lines of the file.
+        :param format: Format of the file.
+        :param batch_size: Number of rows loaded at once.
+        :return: Counts of imported and rejected rows, with the first errors.
+        """
+        result = AvailabilityImportResult(result="success", message="Availabilities imported.")
+        changed: dict[date, IntervalSet] = {}
+
+        def reject(line: int, message: str) -> None:
+            result.rejected += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(AvailabilityImportError(line=line, message=message))
+
+        def load(batch: list[tuple[int, Availability]]) -> None:
+            skipped = set(self.repository.import_many([a for _, a in batch]))
+            for line, availability in batch:
+                if availability.id in skipped:
+                    reject(line, "New availability overlaps with existing availabilities.")
+                    continue
+                result.imported += 1
+                changed.setdefault(availability.date, IntervalSet()).merge(availability.start_time, availability.end_time)
+
+        def batches() -> Iterator[list[tuple[int, Availability]]]:
+            batch: list[tuple[int, Availability]] = []
+            windows: dict[tuple, IntervalSet] = {}
+            for row in parse_import(lines, format):
+                if isinstance(row, ImportFailure):
+                    reject(row.line, row.message)
+                    continue
+                error = self._import_row_error(row, windows)
+                if error:
+                    reject(row.line, error)
+                    continue
+                batch.append((row.line, Availability(
+                    id=uuid4(),
+                    user_id=row.user_id,
+                    organization_id=organization_id,
+                    date=row.date,
+                    start_time=row.start_time,
+                    end_time=row.end_time,
+                    note=row.note,
+                    created_at=datetime.now()
+                )))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch, windows = [], {}
+            if batch:
+                yield batch
+
+        # Reading and validating the rows is offloaded, one batch at a time;
+        # only the loads run on the session
+        parsed = batches()
+        while (batch := self.offload(next, parsed, None)) is not None:
+            load(batch)
+
+        for day, intervals in changed.items():
+            self._repair_draft(organization_id, day, list(intervals))
+        if result.rejected:
+            result.message = f"{result.imported} availabilities imported, {result.rejected} rows rejected."
+        return result
+
+    def _import_row_error(self, row: ImportRow, windows: dict[tuple, IntervalSet]) -> Optional[str]:
+        """
+        Validates an import row against the rules of `create` and the rows of its batch.
+        :param row: The parsed row.
+        :param windows: Intervals of the batch accepted so far, by (user, date); updated in place.
+        :return: The error message, or None if the row is valid.
+        """
+        if not start_time_must_be_before_end_time(row.start_time, row.end_time):
+            return "Start time must be before end time."
+        if not availability_date_must_be_today_or_future(row.date):
+            return "Availability date must be today or in the future."
+        window = windows.setdefault((row.user_id, row.date), IntervalSet())
+        if window.overlaps(row.start_time, row.end_time):
+            return "New availability overlaps with existing availabilities."
+        window.add(row.start_time, row.end_time)
+        return None
+
     def list_all(self) -> list[Availability]:
         results = self.repository.get_all()
         return results
         #return [AvailabilityRead(id=uuid4(), user_id=uuid4(), date=datetime.now().date(), start_time=datetime.now().time(), end_time=datetime.now().time(), created_at=datetime.now()),]  # Placeholder for actual implementation
 
+    def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[AvailabilityFilter] = None
+    ) -> Page[Availability]:
+        if filters and filters.date_from and filters.date_to and filters.date_to < filters.date_from:
+            raise InvalidDateRangeException("End date must not be before start date.")
+        return self.repository.get_page(limit, cursor, filters)
+
     def delete(self, availability_id: UUID) -> None:
         """
         Deletes an availability with the given ID.
@@ -92,12 +271,20 @@ class AvailabilityService:
         Raises:
             NotExistsException: If the availability does not exist
         """
+        existing = None
         try:
+            if self.draft_service:
+                existing = self.repository.get_by_id(availability_id)
+                existing = (existing.organization_id, existing.date, existing.start_time, existing.end_time)
             self.repository.delete(availability_id)
         except ValueError as ex:
             raise NotExistsException(f"Availability with ID {availability_id} does not exist") from ex
+        if existing:
+            organization_id, day, start_time, end_time = existing
+            self._repair_draft(organization_id, day, [(start_time, end_time)])
 
     def update(self, id: UUID, availability: AvailabilityUpdate) -> Availability:
+        # Only the note can change, so the draft schedules need no repair
         try:
             return self.repository.update(id, availability)
         except ValueError as ex:
@@ -132,4 +319,12 @@ class AvailabilityService:
         :param date: The date to filter availabilities.
         :return: A list of Availability entities for the specified date.
         """
-        return self.repository.get_by_date(date)
\ No newline at end of file
+        return self.repository.get_by_date(date)
+
+    def get_rows_by_date(self, date: date) -> list[dict]:
+        """
+        Retrieves all availabilities for a specific date as plain rows, for read-only listings.
+        :param date: The date to filter availabilities.
+        :return: A list of rows shaped like AvailabilityFull.
+        """
+        return self.repository.get_rows_by_date(date)
\ No newline at end of file
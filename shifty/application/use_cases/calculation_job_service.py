@@ -0,0 +1,87 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from uuid import UUID
+from shifty.application.dto.calculation_job_dto import CalculationJobAssignment, CalculationJobRead
+from shifty.application.dto.shift_dto import ShiftCalculationResult, ShiftRangeCalculationRequest
+from shifty.application.use_cases.shift_service import ShiftService, calculation_dates
+from shifty.domain.entities import CalculationJob, CalculationJobStatus
+from shifty.domain.exceptions import NotExistsException
+from shifty.domain.repositories import CalculationJobRepositoryInterface
+
+# Running jobs not finished within this delay are considered abandoned and claimed again
+JOB_LEASE = timedelta(minutes=10)
+
+
+def encode_result(result: ShiftCalculationResult) -> list:
+    """
+    Encodes a calculation result as a compact row:
+    [date, shift_slot_id, user_id, start_time, end_time].
+    """
+    return [
+        result.date.isoformat(),
+        str(result.shift_type.id) if result.shift_type else None,
+        str(result.user_id),
+        result.start_time.isoformat(),
+        result.end_time.isoformat(),
+    ]
+
+
+def decode_result(row: list) -> CalculationJobAssignment:
+    """
+    Decodes a compact row produced by `encode_result`.
+    """
+    day, shift_slot_id, user_id, start_time, end_time = row
+    return CalculationJobAssignment(
+        date=date.fromisoformat(day),
+        shift_slot_id=UUID(shift_slot_id) if shift_slot_id else None,
+        user_id=UUID(user_id),
+        start_time=time.fromisoformat(start_time),
+        end_time=time.fromisoformat(end_time),
+    )
+
+
+class CalculationJobService:
+    def __init__(self, repository: CalculationJobRepositoryInterface):
+        self.repository = repository
+
+    def submit(self, request: ShiftRangeCalculationRequest, requested_by_id: UUID) -> CalculationJob:
+        # Reject invalid windows now rather than in the worker
+        calculation_dates(request.start_date, request.end_date)
+        job = CalculationJob(
+            organization_id=request.organization_id,
+            requested_by_id=requested_by_id,
+            status=CalculationJobStatus.PENDING,
+            request=request.model_dump(mode="json"),
+            created_at=datetime.now()
+        )
+        return self.repository.add(job)
+
+    def get_by_id(self, job_id: UUID) -> CalculationJobRead:
+        job = self.repository.get_by_id(job_id)
+        if not job:
+            raise NotExistsException("Calculation job not found")
+        return CalculationJobRead(
+            id=job.id,
+            status=job.status,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            error=job.error,
+            results=[decode_result(row) for row in job.result] if job.result is not None else None
+        )
+
+    def claim_next(self) -> Optional[CalculationJob]:
+        return self.repository.claim_next(datetime.now() - JOB_LEASE)
+
+    def run(self, job: CalculationJob, shift_service: ShiftService) -> CalculationJob:
+        """
+        Runs a claimed job with the given shift service and stores its outcome.
+        :param job: The claimed job.
+        :param shift_service: ShiftService bound to the requester's session.
+        """
+        try:
+            request = ShiftRangeCalculationRequest.model_validate(job.request)
+            results = shift_service.calculate_shifts_range(request)
+        except Exception as ex:
+            return self.repository.fail(job.id, str(ex))
+        return self.repository.complete(job.id, [encode_result(r) for r in results])
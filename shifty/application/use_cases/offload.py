@@ -0,0 +1,16 @@
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+# Runs the CPU bound work of a service call (solvers, parsing): called with the
+# function and its arguments, returns its result
+Offload = Callable[..., T]
+
+
+def run_inline(call: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs the work in place. Default of the services, for callers with no event
+    loop to keep free (the worker, the tests).
+    :param call: The function to run.
+    """
+    return call(*args, **kwargs)
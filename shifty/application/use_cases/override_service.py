@@ -1,11 +1,14 @@
-from uuid import UUID, uuid4
-from typing import List
-from datetime import datetime, time
-from shifty.domain.entities import Override, Shift, ShiftStatus
-from shifty.application.dto.override_dto import OverrideCreate, OverrideTake, OverrideUpdate
+from uuid import UUID
+from typing import List, Optional
+from datetime import datetime
+from shifty.domain.entities import Override, Shift
+from shifty.application.dto.dto import Page
+from shifty.application.dto.override_dto import OverrideCreate, OverrideTake
+from shifty.application.use_cases.shift_splitter import ClaimedRange, split_shift_for_claims
 from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
 from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
 from shifty.domain.exceptions import InvalidOverrideException
+from shifty.domain.repositories import Loading
 
 
 class OverrideService:
@@ -15,7 +18,7 @@ class OverrideService:
 
     def create(self, data: OverrideCreate) -> Override:
         # Fetch the shift
-        shift = self.shift_repository.get_by_id(data.shift_id)
+        shift = self.shift_repository.get_by_id(data.shift_id, loading=Loading.LAZY)
         if not shift:
             raise InvalidOverrideException("Referenced shift does not exist.")
 
@@ -27,14 +30,10 @@ class OverrideService:
         if not (shift.start_time <= data.start_time < data.end_time <= shift.end_time):
             raise InvalidOverrideException("Override time range must be within shift's time range.")
 
-        # NEW RULE: No overlapping overrides for the same shift
-        existing_overrides = self.override_repository.get_all()
-        for o in existing_overrides:
-            if o.shift_id == data.shift_id and o.date == data.date:
-                # Check for time overlap
-                if not (data.end_time <= o.start_time or data.start_time >= o.end_time):
-                    raise InvalidOverrideException("Cannot create overlapping override for the same shift.")
-
+        # NEW RULE: No overlapping overrides for the same shift.
+        # Checked with one index probe; the overrides_no_overlap constraint catches concurrent creations.
+        if self.override_repository.exists_overlapping(data.shift_id, data.start_time, data.end_time):
+            raise InvalidOverrideException("Cannot create overlapping override for the same shift.")
         override = Override(
             shift_id=data.shift_id,
             user_id=data.requester_id,
@@ -50,6 +49,9 @@ class OverrideService:
     def list_all(self) -> List[Override]:
         return self.override_repository.get_all()
 
+    def list_page(self, limit: int, cursor: Optional[str] = None) -> Page[Override]:
+        return self.override_repository.get_page(limit, cursor)
+
     def get_by_id(self, override_id: UUID) -> Override:
         override = self.override_repository.get_by_id(override_id)
         if not override:
@@ -59,7 +61,23 @@ class OverrideService:
     def list_open(self) -> List[Override]:
         return self.override_repository.get_open()
 
+    def list_open_rows(self) -> List[dict]:
+        return self.override_repository.get_open_rows()
+
     def take(self, override_id: UUID, data: OverrideTake) -> List[Shift]:
+        return self.take_ranges(override_id, [data])
+
+    def take_ranges(self, override_id: UUID, claims: List[OverrideTake]) -> List[Shift]:
+        """
+        Take several ranges of an override at once, possibly by different users.
+        The shift is split a single time into the minimal set of segments.
+        :param override_id: UUID of the override to take.
+        :param claims: Claimed ranges with their takers.
+        :return: The segments replacing the shift.
+        """
+        if not claims:
+            raise InvalidOverrideException("At least one range must be claimed.")
+
         override = self.override_repository.get_by_id(override_id)
         if not override:
             raise InvalidOverrideException("Override not available.")
@@ -68,111 +86,47 @@ class OverrideService:
             raise InvalidOverrideException("Override already taken.")
 
         # Fetch the shift to check the owner
-        shift = self.shift_repository.get_by_id(override.shift_id)
+        shift = self.shift_repository.get_by_id(override.shift_id, loading=Loading.LAZY)
         if not shift:
             raise InvalidOverrideException("Associated shift not found.")
         
-        # Validate claimed range
-        if not (override.start_time <= data.start_time < data.end_time <= override.end_time):
-            raise InvalidOverrideException("Claimed range must be within override range.")
-        if not (shift.start_time <= data.start_time < data.end_time <= shift.end_time):
-            raise InvalidOverrideException("Claimed range must be within shift range.")
-
-
-        # Business rule: taker cannot be the shift owner
-        if shift.user_id == data.taken_by_id:
-            raise InvalidOverrideException("Shift owner cannot take their own override.")
+        for data in claims:
+            # Validate claimed range
+            if not (override.start_time <= data.start_time < data.end_time <= override.end_time):
+                raise InvalidOverrideException("Claimed range must be within override range.")
+            if not (shift.start_time <= data.start_time < data.end_time <= shift.end_time):
+                raise InvalidOverrideException("Claimed range must be within shift range.")
+
+            # Business rule: taker cannot be the shift owner
+            if shift.user_id == data.taken_by_id:
+                raise InvalidOverrideException("Shift owner cannot take their own override.")
         
-        # Create the new shifts based on the claimed range
-        segments = self.split_shift_for_partial_override(
-            shift,
-            override,
-            data.start_time,
-            data.end_time,
-            data.taken_by_id
-        )
-        # Add the new shifts to the repository
-        for new_shift in segments:
-            self.shift_repository.add(new_shift)
-
-        # Mark override as taken
-        override_update = OverrideUpdate(
-            shift_id=override.shift_id,
-            requester_id=override.user_id,
-            date=override.date,
-            start_time=data.start_time,
-            end_time=data.end_time,
-            taken_by_id=data.taken_by_id,
-            taken_at=datetime.now(),
-            is_taken=True
-        )
-        # override.taken_by_id = data.taken_by_id
-        # override.taken_at = datetime.now()
-        # override.is_taken = True
-        self.override_repository.update(override_id, override_update)
-
-        # Remove or mark the original shift as canceled (optional: delete or set status)
-        self.shift_repository.update(shift.id, {"status": ShiftStatus.CANCELED})
-        return segments
-
-    def split_shift_for_partial_override(
-        self,
-        shift: Shift,
-        override: Override,
-        claimed_start: time,
-        claimed_end: time,
-        taker_user_id: UUID
-    ) -> List[Shift]:
-        """
-        Splits the shift into up to three segments:
-        - before the claimed range (if any)
-        - the claimed range (assigned to taker)
-        - after the claimed range (if any)
-        All new segments reference the original shift via parent_shift_id.
-        """
-        segments = []
-        # Before claimed
-        if shift.start_time < claimed_start:
-            segments.append(Shift(
-                id=uuid4(),
-                user_id=shift.user_id,
-                origin_user_id=shift.origin_user_id,
-                organization_id=shift.organization_id,
-                date=shift.date,
-                start_time=shift.start_time,
-                end_time=claimed_start,
-                status=shift.status,
-                parent_shift_id=shift.id,
-                note=shift.note,
-                created_at=datetime.now()
-            ))
-        # Claimed segment
-        segments.append(Shift(
-            id=uuid4(),
-            user_id=taker_user_id,
-            origin_user_id=shift.origin_user_id,
-            organization_id=shift.organization_id,
-            date=shift.date,
-            start_time=claimed_start,
-            end_time=claimed_end,
-            status=ShiftStatus.TAKEN,
-            parent_shift_id=shift.id,
-            note=f"Taken via override {override.id}",
-            created_at=datetime.now()
-        ))
-        # After claimed
-        if claimed_end < shift.end_time:
-            segments.append(Shift(
-                id=uuid4(),
-                user_id=shift.user_id,
-                origin_user_id=shift.origin_user_id,
-                organization_id=shift.organization_id,
-                date=shift.date,
-                start_time=claimed_end,
-                end_time=shift.end_time,
-                status=shift.status,
-                parent_shift_id=shift.id,
-                note=shift.note,
-                created_at=datetime.now()
-            ))
-        return segments
\ No newline at end of file
+        # Create the new shifts based on the claimed ranges
+        try:
+            segments = split_shift_for_claims(
+                shift,
+                override,
+                [ClaimedRange(data.start_time, data.end_time, data.taken_by_id) for data in claims]
+            )
+        except ValueError as ex:
+            raise InvalidOverrideException(str(ex)) from ex
+
+        # The override records its taker only when a single user took it
+        takers = {data.taken_by_id for data in claims}
+        # Claim the override, cancel the original shift and add its segments in one
+        # transaction; only one of several concurrent takers can succeed
+        try:
+            self.override_repository.take(
+                override_id,
+                takers.pop() if len(takers) == 1 else None,
+                min(data.start_time for data in claims),
+                max(data.end_time for data in claims),
+                shift.id,
+                segments
+            )
+        except ValueError as ex:
+            raise InvalidOverrideException("Override already taken.") from ex
+        # The segments are inserted without the ORM: read them back with the users
+        # they are serialized with
+        saved = {s.id: s for s in self.shift_repository.get_many([segment.id for segment in segments])}
+        return [saved[segment.id] for segment in segments]
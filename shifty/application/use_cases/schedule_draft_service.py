@@ -0,0 +1,115 @@
+from datetime import date, time
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+from shifty.application.dto.shift_dto import DraftScheduleRead
+from shifty.application.use_cases.offload import Offload, run_inline
+from shifty.application.use_cases.solvers import Assignment, CalculationMode, get_solver
+from shifty.domain.entities import DraftAssignment, DraftSchedule
+from shifty.domain.exceptions import NotExistsException
+from shifty.domain.repositories import (
+    AvailabilityRepositoryInterface,
+    DraftScheduleRepositoryInterface,
+    Loading,
+    ShiftRepositoryInterface,
+    UserRepositoryInterface,
+)
+
+
+def to_draft_assignments(assignments: Iterable[Assignment]) -> List[DraftAssignment]:
+    """
+    Converts solver assignments into draft schedule rows.
+    :param assignments: Assignments returned by a solver.
+    """
+    return [
+        DraftAssignment(
+            shift_slot_id=a.shift_slot.id,
+            user_id=a.user_id,
+            start_time=a.start_time,
+            end_time=a.end_time
+        )
+        for a in assignments
+    ]
+
+
+class ScheduleDraftService:
+    def __init__(self,
+                 draft_repository: DraftScheduleRepositoryInterface,
+                 shift_repository: ShiftRepositoryInterface,
+                 availability_repository: AvailabilityRepositoryInterface,
+                 user_repository: UserRepositoryInterface,
+                 offload: Offload = run_inline):
+        self.draft_repository = draft_repository
+        self.shift_repository = shift_repository
+        self.availability_repository = availability_repository
+        self.user_repository = user_repository
+        # Runs the solvers, off the event loop when called from an async route
+        self.offload = offload
+
+    def get(self, organization_id: UUID, date: date) -> DraftScheduleRead:
+        draft = self.draft_repository.get_by_organization_and_date(organization_id, date)
+        if not draft:
+            raise NotExistsException("Draft schedule not found")
+        return DraftScheduleRead(
+            organization_id=draft.organization_id,
+            date=draft.date,
+            mode=draft.mode,
+            updated_at=draft.updated_at or draft.created_at,
+            assignments=self.draft_repository.get_assignments(draft.id)
+        )
+
+    def get_draft_dates(self, organization_id: UUID, start_date: date, end_date: Optional[date] = None) -> List[date]:
+        """
+        Lists the dates an organization has a draft schedule for within a period.
+        :param organization_id: The ID of the organization.
+        :param start_date: First date of the period.
+        :param end_date: Last date of the period, None for no end.
+        """
+        return self.draft_repository.get_dates(organization_id, start_date, end_date)
+
+    def repair(self, organization_id: UUID, date: date, changed: Iterable[Tuple[time, time]]) -> List[DraftAssignment]:
+        """
+        Re-solves the slots of a draft schedule whose candidate set may have changed.
+
+        Only the slots overlapping one of the changed availability intervals are solved
+        again, with the users already assigned to the other slots left out; the rest
+        of the draft is kept as is. Nothing happens if no draft exists for the date.
+        :param organization_id: UUID of the organization.
+        :param date: Date of the changed availabilities.
+        :param changed: (start_time, end_time) intervals of the created, updated or deleted availabilities.
+        :return: The new assignments of the re-solved slots.
+        """
+        # Repairs run after the change that triggered them, in the same unit of work:
+        # the savepoint keeps a failed repair, reads included, from aborting that change
+        with self.draft_repository.savepoint():
+            return self._repair(organization_id, date, changed)
+
+    def _repair(self, organization_id: UUID, date: date, changed: Iterable[Tuple[time, time]]) -> List[DraftAssignment]:
+        draft = self.draft_repository.get_by_organization_and_date(organization_id, date)
+        if not draft:
+            return []
+        changed = list(changed)
+        shift_slots = self.shift_repository.get_shift_slots()
+        affected = [
+            s for s in shift_slots
+            if any(start < s.end_time and end > s.start_time for start, end in changed)
+        ]
+        if not affected:
+            return []
+        affected_ids = {s.id for s in affected}
+
+        # Users kept on untouched slots stay out of the repair
+        kept = [a for a in self.draft_repository.get_assignments(draft.id) if a.shift_slot_id not in affected_ids]
+        busy = {a.user_id for a in kept}
+        availabilities = [
+            a for a in self.availability_repository.get_by_date(date, loading=Loading.LAZY) if a.user_id not in busy
+        ]
+        workers = [u.id for u in self.user_repository.get_by_role("worker") if u.id not in busy]
+
+        solver = get_solver(CalculationMode(draft.mode))
+        repaired = to_draft_assignments(self.offload(solver.solve, affected, availabilities, workers))
+        self.draft_repository.replace_assignments(draft.id, affected_ids, repaired)
+        return repaired
+
+    def save(self, organization_id: UUID, date: date, mode: CalculationMode, assignments: Iterable[Assignment]) -> DraftSchedule:
+        draft = DraftSchedule(organization_id=organization_id, date=date, mode=mode.value)
+        return self.draft_repository.save(draft, to_draft_assignments(assignments))
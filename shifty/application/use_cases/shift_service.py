@@ -1,30 +1,58 @@
-from uuid import UUID
-from datetime import datetime
-from typing import List
-from shifty.domain.entities import Shift, ShiftStatus, ShiftSlot
-from shifty.domain.exceptions import OverlappingShiftException, NotExistsException
-from shifty.application.dto.shift_dto import ShiftCreate, ShiftCalculationRequest, ShiftCalculationResult, ShiftSlotCreate, ShiftSlotUpdate
-from shifty.domain.repositories import ShiftRepositoryInterface, AvailabilityRepositoryInterface, UserRepositoryInterface
-import random
-import copy
+from uuid import UUID, uuid4
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from shifty.domain.entities import Rotation, RotationEntry, Shift, ShiftStatus, ShiftSlot, User
+from shifty.domain.intervals import IntervalSet
+from shifty.domain.exceptions import InvalidDateRangeException, InvalidShiftException, NotAllowedException, OverlappingShiftException, NotExistsException
+from shifty.application.dto.dto import Page
+from shifty.application.dto.shift_dto import RotationCreate, RotationMaterializeRequest, RotationMaterializeResult, ShiftBulkCreateResult, ShiftBulkItemResult, ShiftCreate, ShiftCalculationRequest, ShiftRangeCalculationRequest, ShiftCalculationResult, ShiftCompactionResult, ShiftFilter, ShiftLineageNode, ShiftSlotCreate, ShiftSlotUpdate
+from shifty.domain.repositories import Loading, ShiftRepositoryInterface, AvailabilityRepositoryInterface, UserRepositoryInterface
+from shifty.application.use_cases.offload import Offload, run_inline
+from shifty.application.use_cases.schedule_draft_service import ScheduleDraftService
+from shifty.application.use_cases.solvers import Assignment, get_solver
+
+# Longest window accepted by calculate_shifts_range (a full month)
+MAX_CALCULATION_DAYS = 31
+# Longest window accepted by materialize_rotation (a year)
+MAX_ROTATION_DAYS = 366
+
+
+def calculation_dates(start_date: date, end_date: date) -> list[date]:
+    """
+    Validates a calculation window and returns its dates.
+    :param start_date: First date of the window (inclusive).
+    :param end_date: Last date of the window (inclusive).
+    """
+    if end_date < start_date:
+        raise InvalidDateRangeException("End date must not be before start date.")
+    days = (end_date - start_date).days + 1
+    if days > MAX_CALCULATION_DAYS:
+        raise InvalidDateRangeException(f"Date range cannot exceed {MAX_CALCULATION_DAYS} days.")
+    return [start_date + timedelta(days=i) for i in range(days)]
 
 class ShiftService:
     def __init__(self,
                  repository: ShiftRepositoryInterface,
                  availability_repository: AvailabilityRepositoryInterface,
-                 user_repository: UserRepositoryInterface):
+                 user_repository: UserRepositoryInterface,
+                 draft_service: Optional[ScheduleDraftService] = None,
+                 offload: Offload = run_inline):
         self.repository = repository
         self.availability_repository = availability_repository
         self.user_repository = user_repository
+        # When set, every calculation is also saved as the draft schedule of its date
+        self.draft_service = draft_service
+        # Runs the solvers, off the event loop when called from an async route
+        self.offload = offload
 
     def create(self, data: ShiftCreate) -> Shift:
-        # Business rule: cannot create overlapping shifts for the same owner
-        existing_shifts = self.repository.get_by_user_and_date(data.user_id, data.date)
-        for s in existing_shifts:
-            if not (data.end_time <= s.start_time or data.start_time >= s.end_time):
-                raise OverlappingShiftException("Cannot create overlapping shift for the same owner.")
+        # Business rule: cannot create overlapping shifts for the same owner.
+        # Enforced by the shifts_no_overlap constraint: the repository raises OverlappingShiftException.
+        return self.repository.add(self._new_shift(data))
 
-        shift = Shift(
+    def _new_shift(self, data: ShiftCreate) -> Shift:
+        return Shift(
+            id=uuid4(),
             user_id=data.user_id,
             # parent_shift_id=data.parent_shift_id,
             origin_user_id=data.origin_user_id,
@@ -36,28 +64,109 @@ class ShiftService:
             status=ShiftStatus.TAKEN,  # Default status
             created_at=datetime.now()
         )
-        return self.repository.add(shift)
-
-    def create_bulk(self, data: list[ShiftCreate]) -> list[Shift]:
-        created = []
-        for shift_data in data:
-            try:
-                created_shift = self.create(shift_data)
-                created.append(copy.deepcopy(created_shift))
-            except Exception as e:
-                continue
-            # TODO: Handle exceptions for each shift creation
-        return created
+
+    def create_bulk(self, data: list[ShiftCreate]) -> ShiftBulkCreateResult:
+        """
+        Creates many shifts at once and reports the outcome of every item.
+        Existing shifts of the batch's (user, date) pairs are loaded with one query and
+        overlaps are checked in memory, items of the same batch included: like calling
+        `create` for each item in order, a shift overlapping an earlier one is rejected.
+        The valid shifts are saved with a single multi-row insert.
+        :param data: Shifts to create.
+        :return: Per-item report, in request order.
+        """
+        existing = self.repository.get_by_user_date_pairs({(d.user_id, d.date) for d in data})
+        booked: dict[tuple, list] = {}
+        for s in existing:
+            if s.status != ShiftStatus.CANCELED and s.start_time < s.end_time:
+                booked.setdefault((s.user_id, s.date), []).append((s.start_time, s.end_time))
+        interval_sets = {key: IntervalSet.from_intervals(intervals) for key, intervals in booked.items()}
+
+        items = []
+        valid = []
+        for index, shift_data in enumerate(data):
+            # Shifts whose end is not after their start have no range, like in the database constraint
+            if shift_data.start_time < shift_data.end_time:
+                interval_set = interval_sets.setdefault((shift_data.user_id, shift_data.date), IntervalSet())
+                if interval_set.overlaps(shift_data.start_time, shift_data.end_time):
+                    items.append(ShiftBulkItemResult(index=index, error="Cannot create overlapping shift for the same owner."))
+                    continue
+                interval_set.add(shift_data.start_time, shift_data.end_time)
+            shift = self._new_shift(shift_data)
+            valid.append(shift)
+            items.append(ShiftBulkItemResult(index=index, shift=shift))
+
+        try:
+            self.repository.add_many(valid)
+        except OverlappingShiftException as ex:
+            # A concurrent write got in between: the whole insert was rolled back
+            for item in items:
+                if item.shift is not None:
+                    item.shift, item.error = None, str(ex)
+        created = sum(1 for item in items if item.shift is not None)
+        return ShiftBulkCreateResult(created=created, failed=len(items) - created, items=items)
 
     def list_all(self) -> List[Shift]:
         return self.repository.get_all()
 
+    def list_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[ShiftFilter] = None) -> Page[Shift]:
+        if filters and filters.date_from and filters.date_to and filters.date_to < filters.date_from:
+            raise InvalidDateRangeException("End date must not be before start date.")
+        return self.repository.get_page(limit, cursor, filters)
+
     def get_by_id(self, shift_id: UUID) -> Shift:
         shift = self.repository.get_by_id(shift_id)
         if not shift:
             raise NotExistsException("Shift not found")
         return shift
 
+    def get_lineage(self, shift_id: UUID) -> list[ShiftLineageNode]:
+        """
+        Get the fragment tree of a shift, from the originally planned shift down.
+        """
+        lineage = self.repository.get_lineage(shift_id)
+        if not lineage:
+            raise NotExistsException("Shift not found")
+        return [ShiftLineageNode(**shift.model_dump(), depth=depth) for shift, depth in lineage]
+
+    def get_active_fragments(self, shift_id: UUID) -> list[Shift]:
+        """
+        Get the fragments descending from a shift that are still active.
+        """
+        return self.repository.get_active_descendants(self.get_by_id(shift_id))
+
+    def compact_fragments(
+        self,
+        requested_by_id: UUID,
+        organization_id: Optional[UUID] = None,
+        date: Optional[date] = None
+    ) -> ShiftCompactionResult:
+        """
+        Merges the contiguous fragments left by partial overrides, e.g. 10-12 and 12-13
+        of the same worker, into single shifts. Only managers can compact, and only the
+        shifts of their organization.
+        :param requested_by_id: ID of the user requesting the compaction.
+        :param organization_id: Organization of the shifts, that of the manager if not given.
+        :param date: Only compact the shifts of this date, if given.
+        """
+        manager = self._get_manager(requested_by_id, organization_id, "compact the shifts")
+        return self.repository.compact_fragments(manager.organization_id, date)
+
+    def _get_manager(self, user_id: UUID, organization_id: Optional[UUID], action: str) -> User:
+        """
+        Gets the user requesting an action reserved to the managers of an organization.
+        :param user_id: ID of the requesting user.
+        :param organization_id: Organization the action applies to, any if not given.
+        :param action: The action, for the error messages.
+        :raises NotAllowedException: If the user is not a manager of the organization.
+        """
+        manager = self.user_repository.get_by_id(user_id)
+        if manager is None or manager.role != "manager":
+            raise NotAllowedException(f"Only managers can {action}.")
+        if organization_id is not None and organization_id != manager.organization_id:
+            raise NotAllowedException(f"Managers can only {action} of their organization.")
+        return manager
+
     def delete(self, shift_id: UUID) -> None:
         try:
             self.repository.delete(shift_id)
@@ -67,6 +176,9 @@ class ShiftService:
     def get_by_date(self, date):
         return self.repository.get_by_date(date)
 
+    def get_rows_by_date(self, date):
+        return self.repository.get_rows_by_date(date)
+
     def get_by_user(self, user_id):
         return self.repository.get_by_user(user_id)
 
@@ -81,6 +193,9 @@ class ShiftService:
 
     def get_shift_slots(self):
         return self.repository.get_shift_slots()
+
+    def get_shift_slots_page(self, limit: int, cursor: Optional[str] = None) -> Page[ShiftSlot]:
+        return self.repository.get_shift_slots_page(limit, cursor)
     
     def get_shift_slots_by_organization(self, organization_id: UUID):
         return self.repository.get_shift_slots_by_organization(organization_id)
@@ -124,52 +239,130 @@ class ShiftService:
             raise NotExistsException("Shift slot not found")
         return shift_slot
 
+    def create_rotation(self, data: RotationCreate) -> Rotation:
+        """
+        Creates a rotation with its entries.
+        :param data: The rotation to create.
+        :raises InvalidShiftException: If an entry is outside the cycle, references a slot
+            of another organization, or overlaps another entry of the same user and day.
+        """
+        slots = {s.id: s for s in self.repository.get_shift_slots_by_organization(data.organization_id)}
+        days: dict[tuple, IntervalSet] = {}
+        for entry in data.entries:
+            if entry.week >= data.cycle_weeks:
+                raise InvalidShiftException(f"Week {entry.week} is outside the {data.cycle_weeks} weeks cycle.")
+            slot = slots.get(entry.shift_slot_id)
+            if not slot:
+                raise InvalidShiftException(f"Shift slot {entry.shift_slot_id} does not exist.")
+            if slot.start_time < slot.end_time:
+                day = days.setdefault((entry.user_id, entry.week, entry.weekday), IntervalSet())
+                if day.overlaps(slot.start_time, slot.end_time):
+                    raise InvalidShiftException("Rotation entries of the same user and day must not overlap.")
+                day.add(slot.start_time, slot.end_time)
+
+        rotation = Rotation(
+            organization_id=data.organization_id,
+            name=data.name,
+            cycle_weeks=data.cycle_weeks,
+            starts_on=data.starts_on,
+            created_at=datetime.now()
+        )
+        entries = [
+            RotationEntry(
+                rotation_id=rotation.id,
+                user_id=entry.user_id,
+                shift_slot_id=entry.shift_slot_id,
+                week=entry.week,
+                weekday=entry.weekday
+            )
+            for entry in data.entries
+        ]
+        return self.repository.add_rotation(rotation, entries)
+
+    def get_rotation_by_id(self, rotation_id: UUID) -> Rotation:
+        rotation = self.repository.get_rotation_by_id(rotation_id)
+        if not rotation:
+            raise NotExistsException("Rotation not found")
+        return rotation
+
+    def get_rotation_entries(self, rotation_id: UUID) -> list[RotationEntry]:
+        return self.repository.get_rotation_entries(self.get_rotation_by_id(rotation_id).id)
+
+    def materialize_rotation(
+        self,
+        requested_by_id: UUID,
+        rotation_id: UUID,
+        request: RotationMaterializeRequest
+    ) -> RotationMaterializeResult:
+        """
+        Creates the shifts of a rotation for a date window. The work is done by the
+        database in a single statement; shifts that would overlap an existing shift
+        of their user are skipped and reported as conflicts. Only the managers of the
+        rotation's organization can materialize it.
+        :param requested_by_id: ID of the user requesting the shifts.
+        :param rotation_id: The rotation to materialize.
+        :param request: The date window (inclusive).
+        """
+        if request.end_date < request.start_date:
+            raise InvalidDateRangeException("End date must not be before start date.")
+        if (request.end_date - request.start_date).days + 1 > MAX_ROTATION_DAYS:
+            raise InvalidDateRangeException(f"Date range cannot exceed {MAX_ROTATION_DAYS} days.")
+        rotation = self.get_rotation_by_id(rotation_id)
+        self._get_manager(requested_by_id, rotation.organization_id, "materialize the rotations")
+        return self.repository.materialize_rotation(rotation.id, request.start_date, request.end_date)
+
     def calculate_shifts(self, request: ShiftCalculationRequest) -> list[ShiftCalculationResult]:
-        availabilities = self.availability_repository.get_by_date(request.date)
+        availabilities = self.availability_repository.get_by_date(request.date, loading=Loading.LAZY)
         shift_slots = self.repository.get_shift_slots()
-        assigned_users = set()
-        results = []
         all_users = [u.id for u in self.user_repository.get_by_role("worker")]
-        for shift_slot in shift_slots:
-            shift_start = shift_slot.start_time
-            shift_end = shift_slot.end_time
-            needed = getattr(shift_slot, 'expected_workers', 1)
-            assigned_for_this_shift = 0
-            # Try to cover the shift with available users (no user can do more than one shift)
-            for a in availabilities:
-                if a.user_id in assigned_users:
-                    continue
-                if a.start_time <= shift_start and a.end_time >= shift_end:
-                    assigned_users.add(a.user_id)
-                    results.append(ShiftCalculationResult(
-                        user_id=a.user_id,
-                        organization_id=request.organization_id,
-                        date=request.date,
-                        created_at=datetime.now(),
-                        shift_type=shift_slot,
-                        start_time=shift_start,
-                        end_time=shift_end,
-                        user=self.user_repository.get_by_id(a.user_id)
-                    ))
-                    assigned_for_this_shift += 1
-                    if assigned_for_this_shift >= needed:
-                        break
-            # If not enough, pick random users not already assigned
-            while assigned_for_this_shift < needed:
-                available_users = [u for u in all_users if u not in assigned_users]
-                if not available_users:
-                    break
-                chosen_user_id = random.choice(available_users)
-                results.append(ShiftCalculationResult(
-                    user_id=chosen_user_id,
-                    organization_id=request.organization_id,
-                    date=request.date,
-                    created_at=datetime.now(),
-                    shift_type=shift_slot,
-                    start_time=shift_start,
-                    end_time=shift_end,
-                    user=self.user_repository.get_by_id(chosen_user_id)
-                ))
-                assigned_users.add(chosen_user_id)
-                assigned_for_this_shift += 1
-        return results
+        # Each user gets at most one shift per day
+        assignments = self.offload(get_solver(request.mode).solve, shift_slots, availabilities, all_users)
+        if self.draft_service:
+            self.draft_service.save(request.organization_id, request.date, request.mode, assignments)
+        return self._build_calculation_results(
+            request.organization_id,
+            [(request.date, assignment) for assignment in assignments]
+        )
+
+    def calculate_shifts_range(self, request: ShiftRangeCalculationRequest) -> list[ShiftCalculationResult]:
+        dates = calculation_dates(request.start_date, request.end_date)
+
+        # Slots and workers are shared by every day, availabilities come from one range query
+        availabilities = self.availability_repository.get_by_date_range(
+            request.start_date, request.end_date, loading=Loading.LAZY
+        )
+        shift_slots = self.repository.get_shift_slots()
+        all_users = [u.id for u in self.user_repository.get_by_role("worker")]
+        # The wait on the process pool (parallel) is offloaded with the solver
+        assignments_by_date = self.offload(
+            get_solver(request.mode).solve_range,
+            shift_slots, availabilities, dates, all_users, parallel=request.parallel
+        )
+        if self.draft_service:
+            for day in dates:
+                self.draft_service.save(request.organization_id, day, request.mode, assignments_by_date[day])
+        return self._build_calculation_results(
+            request.organization_id,
+            [(day, assignment) for day in dates for assignment in assignments_by_date[day]]
+        )
+
+    def _build_calculation_results(
+        self,
+        organization_id: UUID,
+        assignments: list[tuple[date, Assignment]]
+    ) -> list[ShiftCalculationResult]:
+        # Resolve every assigned user in one round trip and share the instances across results
+        users = {u.id: u for u in self.user_repository.get_many({a.user_id for _, a in assignments})}
+        return [
+            ShiftCalculationResult(
+                user_id=assignment.user_id,
+                organization_id=organization_id,
+                date=day,
+                created_at=datetime.now(),
+                shift_type=assignment.shift_slot,
+                start_time=assignment.start_time,
+                end_time=assignment.end_time,
+                user=users.get(assignment.user_id)
+            )
+            for day, assignment in assignments
+        ]
@@ -1,8 +1,89 @@
 from datetime import datetime, time
 from uuid import UUID, uuid4
-from typing import List
+from typing import Iterable, List, NamedTuple
 from shifty.domain.entities import Shift, Override, ShiftStatus
 
+
+class ClaimedRange(NamedTuple):
+    """A part of a shift claimed by a user through an override."""
+    start_time: time
+    end_time: time
+    taker_user_id: UUID
+
+
+def _fragment(shift: Shift, **fields) -> Shift:
+    fragment_id = uuid4()
+    return Shift(
+        id=fragment_id,
+        origin_user_id=shift.origin_user_id,
+        organization_id=shift.organization_id,
+        date=shift.date,
+        parent_shift_id=shift.id,
+        root_shift_id=shift.root_shift_id or shift.id,
+        lineage_path=f"{shift.lineage_prefix()}{fragment_id}/",
+        created_at=datetime.now(),
+        **fields
+    )
+
+
+def _owner_segment(shift: Shift, start_time: time, end_time: time) -> Shift:
+    return _fragment(
+        shift,
+        user_id=shift.user_id,
+        start_time=start_time,
+        end_time=end_time,
+        status=shift.status,
+        note=shift.note
+    )
+
+
+def _taken_segment(shift: Shift, override: Override, claim: ClaimedRange) -> Shift:
+    return _fragment(
+        shift,
+        user_id=claim.taker_user_id,
+        start_time=claim.start_time,
+        end_time=claim.end_time,
+        status=ShiftStatus.TAKEN,
+        note=f"Taken via override {override.id}"
+    )
+
+
+def split_shift_for_claims(
+    shift: Shift,
+    override: Override,
+    claims: Iterable[ClaimedRange]
+) -> List[Shift]:
+    """
+    Splits the shift into the minimal set of segments covering it, for any number of
+    claimed ranges:
+    - one segment per claimed range, assigned to its taker; adjacent ranges claimed
+      by the same user are joined into one segment
+    - one segment, kept by the owner, for each gap between claimed ranges
+    The claims are sorted once and walked in a single pass, O(n log n).
+    All new segments reference the original shift via parent_shift_id and carry
+    its lineage (root_shift_id, lineage_path).
+    :raises ValueError: If two claimed ranges overlap.
+    """
+    segments: List[Shift] = []
+    cursor = shift.start_time
+    previous = None
+    for claim in sorted(claims):
+        if previous is not None and claim.start_time < previous.end_time:
+            raise ValueError("Claimed ranges must not overlap.")
+        if cursor < claim.start_time:
+            segments.append(_owner_segment(shift, cursor, claim.start_time))
+        elif previous is not None and previous.taker_user_id == claim.taker_user_id:
+            # Same taker right after the previous claim: extend its segment
+            segments[-1].end_time = claim.end_time
+            previous, cursor = claim, claim.end_time
+            continue
+        segments.append(_taken_segment(shift, override, claim))
+        previous, cursor = claim, claim.end_time
+    if cursor < shift.end_time:
+        segments.append(_owner_segment(shift, cursor, shift.end_time))
+    return segments
+
+
 def split_shift_for_partial_override(
     shift: Shift,
     override: Override,
@@ -17,49 +98,4 @@ def split_shift_for_partial_override(
     - after the claimed range (if any)
     All new segments reference the original shift via parent_shift_id.
     """
-    segments = []
-    # Before claimed
-    if shift.start_time < claimed_start:
-        segments.append(Shift(
-            id=uuid4(),
-            user_id=shift.user_id,
-            origin_user_id=shift.origin_user_id,
-            organization_id=shift.organization_id,
-            date=shift.date,
-            start_time=shift.start_time,
-            end_time=claimed_start,
-            status=shift.status,
-            parent_shift_id=shift.id,
-            note=shift.note,
-            created_at=datetime.now()
-        ))
-    # Claimed segment
-    segments.append(Shift(
-        id=uuid4(),
-        user_id=taker_user_id,
-        origin_user_id=shift.origin_user_id,
-        organization_id=shift.organization_id,
-        date=shift.date,
-        start_time=claimed_start,
-        end_time=claimed_end,
-        status=ShiftStatus.TAKEN,
-        parent_shift_id=shift.id,
-        note=f"Taken via override {override.id}",
-        created_at=datetime.now()
-    ))
-    # After claimed
-    if claimed_end < shift.end_time:
-        segments.append(Shift(
-            id=uuid4(),
-            user_id=shift.user_id,
-            origin_user_id=shift.origin_user_id,
-            organization_id=shift.organization_id,
-            date=shift.date,
-            start_time=claimed_end,
-            end_time=shift.end_time,
-            status=shift.status,
-            parent_shift_id=shift.id,
-            note=shift.note,
-            created_at=datetime.now()
-        ))
-    return segments
\ No newline at end of file
+    return split_shift_for_claims(shift, override, [ClaimedRange(claimed_start, claimed_end, taker_user_id)])
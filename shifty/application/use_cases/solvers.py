@@ -0,0 +1,280 @@
+import enum
+import heapq
+import random
+import time as timer
+from abc import ABC, abstractmethod
+from datetime import date, time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+from shifty.application.use_cases.assignment_engine import assign_greedy, assign_greedy_range
+from shifty.domain.entities import Availability, ShiftSlot
+
+
+class CalculationMode(str, enum.Enum):
+    """
+    Enum representing the algorithm used to calculate shifts.
+    """
+    GREEDY = "greedy"
+    OPTIMAL = "optimal"
+
+
+class Assignment(NamedTuple):
+    """A user assigned to (part of) a shift slot."""
+    shift_slot: ShiftSlot
+    user_id: UUID
+    start_time: time
+    end_time: time
+
+
+class ShiftSolver(ABC):
+    @abstractmethod
+    def solve(
+        self,
+        shift_slots: Sequence[ShiftSlot],
+        availabilities: Sequence[Availability],
+        worker_ids: Sequence[UUID]
+    ) -> List[Assignment]:
+        """
+        Assign users to the shift slots of a single day.
+        :param shift_slots: Slots to fill, in priority order.
+        :param availabilities: Availabilities of the day.
+        :param worker_ids: IDs of the workers of the organization.
+        :return: List of assignments.
+        """
+        pass
+
+    def solve_range(
+        self,
+        shift_slots: Sequence[ShiftSlot],
+        availabilities: Iterable[Availability],
+        dates: Sequence[date],
+        worker_ids: Sequence[UUID],
+        parallel: bool = False
+    ) -> Dict[date, List[Assignment]]:
+        """
+        Assign users to the shift slots of several days.
+        :param shift_slots: Slots to fill each day, in priority order.
+        :param availabilities: Availabilities of the whole window.
+        :param dates: Dates to compute.
+        :param worker_ids: IDs of the workers of the organization.
+        :param parallel: Whether to use the process pool, when the solver supports it.
+        :return: Assignments keyed by date.
+        """
+        by_date: Dict[date, List[Availability]] = {day: [] for day in dates}
+        for a in availabilities:
+            if a.date in by_date:
+                by_date[a.date].append(a)
+        return {day: self.solve(shift_slots, by_date[day], worker_ids) for day in dates}
+
+
+class GreedySolver(ShiftSolver):
+    """
+    Fast first-fit solver: covering availabilities first, then random workers.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng
+
+    def solve(self, shift_slots, availabilities, worker_ids):
+        return [
+            Assignment(shift_slot, user_id, shift_slot.start_time, shift_slot.end_time)
+            for shift_slot, user_id in assign_greedy(shift_slots, availabilities, worker_ids, self.rng)
+        ]
+
+    def solve_range(self, shift_slots, availabilities, dates, worker_ids, parallel=False):
+        assignments_by_date = assign_greedy_range(
+            shift_slots, availabilities, dates, worker_ids, self.rng, parallel
+        )
+        return {
+            day: [
+                Assignment(shift_slot, user_id, shift_slot.start_time, shift_slot.end_time)
+                for shift_slot, user_id in assignments
+            ]
+            for day, assignments in assignments_by_date.items()
+        }
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+class _FlowNetwork:
+    """
+    Residual graph solved with successive shortest paths (Dijkstra with potentials).
+    Edges are stored as [to, capacity, cost, reverse edge index].
+    """
+
+    def __init__(self, size: int):
+        self.graph: List[List[list]] = [[] for _ in range(size)]
+
+    def add_edge(self, u: int, v: int, capacity: int, cost: int) -> list:
+        edge = [v, capacity, cost, len(self.graph[v])]
+        self.graph[u].append(edge)
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return edge
+
+    def flow(self, edge: list) -> int:
+        v, _, _, rev = edge
+        return self.graph[v][rev][1]
+
+    def min_cost_flow(self, source: int, sink: int, deadline: float) -> None:
+        """
+        Push as much flow as possible at minimum cost, stopping early at `deadline`.
+        Every intermediate state is a valid (min-cost for its value) flow.
+        """
+        size = len(self.graph)
+        potential = [0] * size
+        while timer.monotonic() < deadline:
+            dist: List[Optional[int]] = [None] * size
+            prev: List[Optional[Tuple[int, list]]] = [None] * size
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d != dist[u]:
+                    continue
+                for edge in self.graph[u]:
+                    v, capacity, cost, _ = edge
+                    if capacity <= 0:
+                        continue
+                    nd = d + cost + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = (u, edge)
+                        heapq.heappush(heap, (nd, v))
+            if dist[sink] is None:
+                return
+            for v in range(size):
+                if dist[v] is not None:
+                    potential[v] += dist[v]
+
+            push = None
+            v = sink
+            while v != source:
+                u, edge = prev[v]
+                push = edge[1] if push is None else min(push, edge[1])
+                v = u
+            v = sink
+            while v != source:
+                u, edge = prev[v]
+                edge[1] -= push
+                self.graph[v][edge[3]][1] += push
+                v = u
+
+
+class MatchingSolver(ShiftSolver):
+    """
+    Min-cost flow solver: fills as many seats (slot x expected_workers) as possible
+    with users who declared an availability overlapping the slot, at minimum cost.
+
+    Costs are expressed in minutes: every uncovered minute of a partially covered slot
+    costs `partial_coverage_weight`, and every shift a user already has in the
+    calculation window costs `fairness_weight`. Users with the same availability
+    intervals and load are interchangeable, so they are collapsed into one node with
+    matching capacity; the network stays small (slots x distinct intervals) even for
+    organizations with thousands of workers, and successive shortest paths keep the
+    solve polynomial. When `time_budget` (seconds) runs out the best flow found so
+    far is returned.
+    """
+
+    def __init__(
+        self,
+        time_budget: float = 2.0,
+        partial_coverage_weight: int = 1,
+        fairness_weight: int = 60,
+        allow_partial: bool = True
+    ):
+        self.time_budget = time_budget
+        self.partial_coverage_weight = partial_coverage_weight
+        self.fairness_weight = fairness_weight
+        self.allow_partial = allow_partial
+
+    def solve(self, shift_slots, availabilities, worker_ids, load: Optional[Dict[UUID, int]] = None):
+        load = load or {}
+        intervals: Dict[UUID, set] = {}
+        for a in availabilities:
+            intervals.setdefault(a.user_id, set()).add((a.start_time, a.end_time))
+
+        # Group interchangeable users, keeping their first-seen order
+        classes: Dict[Tuple, List[UUID]] = {}
+        for user_id, user_intervals in intervals.items():
+            key = (tuple(sorted(user_intervals)), load.get(user_id, 0))
+            classes.setdefault(key, []).append(user_id)
+        class_keys = list(classes)
+
+        source, sink = 0, 1
+        slot_offset = 2
+        class_offset = slot_offset + len(shift_slots)
+        network = _FlowNetwork(class_offset + len(class_keys))
+        edges = []
+        for s, shift_slot in enumerate(shift_slots):
+            needed = getattr(shift_slot, 'expected_workers', 1)
+            if needed <= 0:
+                continue
+            network.add_edge(source, slot_offset + s, needed, 0)
+            slot_length = _minutes(shift_slot.end_time) - _minutes(shift_slot.start_time)
+            for c, (user_intervals, _) in enumerate(class_keys):
+                window = self._best_window(user_intervals, shift_slot.start_time, shift_slot.end_time)
+                if window is None:
+                    continue
+                uncovered = slot_length - (_minutes(window[1]) - _minutes(window[0]))
+                edge = network.add_edge(
+                    slot_offset + s, class_offset + c, needed, uncovered * self.partial_coverage_weight
+                )
+                edges.append((shift_slot, c, window, edge))
+        for c, key in enumerate(class_keys):
+            network.add_edge(class_offset + c, sink, len(classes[key]), key[1] * self.fairness_weight)
+
+        network.min_cost_flow(source, sink, timer.monotonic() + self.time_budget)
+
+        assignments = []
+        taken = [0] * len(class_keys)
+        for shift_slot, c, window, edge in edges:
+            members = classes[class_keys[c]]
+            for _ in range(network.flow(edge)):
+                assignments.append(Assignment(shift_slot, members[taken[c]], window[0], window[1]))
+                taken[c] += 1
+        # Report assignments in slot order, like the greedy solver
+        positions = {id(shift_slot): i for i, shift_slot in enumerate(shift_slots)}
+        assignments.sort(key=lambda a: positions[id(a.shift_slot)])
+        return assignments
+
+    def solve_range(self, shift_slots, availabilities, dates, worker_ids, parallel=False):
+        # Days are solved in order so the fairness cost sees the shifts given on previous days
+        by_date: Dict[date, List[Availability]] = {day: [] for day in dates}
+        for a in availabilities:
+            if a.date in by_date:
+                by_date[a.date].append(a)
+        load: Dict[UUID, int] = {}
+        result = {}
+        for day in dates:
+            result[day] = self.solve(shift_slots, by_date[day], worker_ids, load)
+            for assignment in result[day]:
+                load[assignment.user_id] = load.get(assignment.user_id, 0) + 1
+        return result
+
+    def _best_window(self, user_intervals, slot_start: time, slot_end: time) -> Optional[Tuple[time, time]]:
+        """
+        Largest part of the slot covered by one of the user's availabilities, or None.
+        """
+        slot_length = _minutes(slot_end) - _minutes(slot_start)
+        best = None
+        best_length = 0
+        for start, end in user_intervals:
+            window = (max(start, slot_start), min(end, slot_end))
+            length = _minutes(window[1]) - _minutes(window[0])
+            if length <= best_length:
+                continue
+            if not self.allow_partial and length < slot_length:
+                continue
+            best, best_length = window, length
+        return best
+
+
+def get_solver(mode: CalculationMode) -> ShiftSolver:
+    """
+    Return the solver implementing the given calculation mode.
+    """
+    if mode == CalculationMode.OPTIMAL:
+        return MatchingSolver()
+    return GreedySolver()
@@ -1,3 +1,4 @@
+from shifty.application.dto.dto import Page
 from shifty.domain.repositories import UserRepositoryInterface
 from shifty.domain.entities import User
 from typing import List, Optional
@@ -13,6 +14,9 @@ class UserService:
     def get_all(self) -> List[User]:
         return self.repository.get_all()
 
+    def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[User]:
+        return self.repository.get_page(limit, cursor)
+
     def add(self, user: User) -> User:
         return self.repository.add(user)
 
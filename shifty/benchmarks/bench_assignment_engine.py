@@ -0,0 +1,91 @@
+"""
+Benchmark of the shift assignment engine against the original slots x availabilities scan.
+
+Run with:
+    python -m shifty.benchmarks.bench_assignment_engine
+"""
+import random
+import time as timer
+from datetime import date, datetime, time
+from uuid import uuid4
+from shifty.application.use_cases.assignment_engine import assign_greedy
+from shifty.domain.entities import Availability, ShiftSlot
+
+SIZES = [100, 1_000, 5_000, 10_000, 50_000]
+SLOTS = 24
+
+
+def naive_greedy(shift_slots, availabilities, worker_ids, rng):
+    assigned_users = set()
+    assignments = []
+    for shift_slot in shift_slots:
+        needed = shift_slot.expected_workers
+        assigned_for_this_shift = 0
+        for a in availabilities:
+            if a.user_id in assigned_users:
+                continue
+            if a.start_time <= shift_slot.start_time and a.end_time >= shift_slot.end_time:
+                assigned_users.add(a.user_id)
+                assignments.append((shift_slot, a.user_id))
+                assigned_for_this_shift += 1
+                if assigned_for_this_shift >= needed:
+                    break
+        while assigned_for_this_shift < needed:
+            available_users = [u for u in worker_ids if u not in assigned_users]
+            if not available_users:
+                break
+            chosen_user_id = rng.choice(available_users)
+            assignments.append((shift_slot, chosen_user_id))
+            assigned_users.add(chosen_user_id)
+            assigned_for_this_shift += 1
+    return assignments
+
+
+def make_dataset(size, rng):
+    worker_ids = [uuid4() for _ in range(size)]
+    org_id = uuid4()
+    availabilities = []
+    for user_id in worker_ids:
+        start = rng.randint(0, 22)
+        availabilities.append(Availability(
+            id=uuid4(),
+            user_id=user_id,
+            organization_id=org_id,
+            date=date(2025, 6, 18),
+            start_time=time(start, rng.choice([0, 15, 30, 45])),
+            end_time=time(rng.randint(start + 1, 23), 0),
+            created_at=datetime.now()
+        ))
+    slots = []
+    for i in range(SLOTS):
+        start = i % 20
+        slots.append(ShiftSlot(
+            organization_id=org_id,
+            name=f"Slot {i}",
+            start_time=time(start, 0),
+            end_time=time(start + 4, 0),
+            # Ask for more workers than the covering availabilities to exercise the random fallback too
+            expected_workers=max(1, size // SLOTS),
+            created_at=datetime.now()
+        ))
+    return slots, availabilities, worker_ids
+
+
+def measure(fn, *args):
+    started = timer.perf_counter()
+    result = fn(*args)
+    return timer.perf_counter() - started, result
+
+
+def main():
+    print(f"{'availabilities':>14} {'naive (s)':>10} {'engine (s)':>11} {'speedup':>8}")
+    for size in SIZES:
+        slots, availabilities, worker_ids = make_dataset(size, random.Random(size))
+        naive_time, expected = measure(naive_greedy, slots, availabilities, worker_ids, random.Random(0))
+        engine_time, result = measure(assign_greedy, slots, availabilities, worker_ids, random.Random(0))
+        assert result == expected, "engine diverged from the naive scan"
+        print(f"{size:>14} {naive_time:>10.3f} {engine_time:>11.3f} {naive_time / engine_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
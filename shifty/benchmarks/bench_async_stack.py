@@ -0,0 +1,269 @@
+"""
+Latency of the shift listing under concurrent clients: the async stack (async routes,
+asyncpg, repositories run through AsyncSession.run_sync) against the sync stack
+(def routes in the threadpool, psycopg2). The async stack is also measured while
+a client keeps running month-long calculations, with the solver run in the
+greenlet, on the event loop, and offloaded to the threadpool as the routes do.
+
+With BENCH_USER_ID, runs on the Postgres database of DATABASE_URL, as that user
+(its row level security applies to the requests; the calculation scenarios use
+its organization, which needs shift slots and availabilities). Without it, runs
+on a temporary SQLite database (sqlite / aiosqlite), seeded by the benchmark.
+Run with:
+    python -m shifty.benchmarks.bench_async_stack
+    BENCH_USER_ID=<user id> python -m shifty.benchmarks.bench_async_stack
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time as timer
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Callable, ContextManager, List, Optional
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from shifty.api.routers import shifts
+from shifty.application.dto.shift_dto import ShiftFilter
+from shifty.application.use_cases.offload import Offload, run_inline
+from shifty.application.use_cases.shift_service import ShiftService
+from shifty.dependencies import build_shift_service, get_shift_service
+from shifty.domain.entities import Availability, Organization, Shift, ShiftSlot, ShiftStatus, User
+from shifty.infrastructure.async_services import AsyncService, run_blocking
+from shifty.infrastructure.db import engine, get_async_engine, get_session, user_session
+from shifty.infrastructure.repositories.availability_sqlalchemy import AvailabilityRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
+from shifty.infrastructure.unit_of_work import UnitOfWork
+from shifty.security.dependencies import get_current_user_id
+
+CLIENTS = 500
+REQUESTS_PER_CLIENT = 10
+PAGE_SIZE = 50
+# Listing clients of the calculation scenarios: a light load, on which the stalls
+# of the event loop show
+CALCULATION_CLIENTS = 20
+# Period of the ticker measuring the stalls of the event loop (seconds)
+TICK = 0.01
+# Seed of the SQLite database
+WORKERS = 200
+SLOTS = 12
+DAYS = 31
+START = date(2030, 1, 1)
+
+
+def seed(bind) -> uuid.UUID:
+    """Workers of one organization with a month of shifts, slots and availabilities."""
+    now = datetime.now()
+    org_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(WORKERS)]
+    shift_rows, availability_rows = [], []
+    for d in range(DAYS):
+        day = START + timedelta(days=d)
+        for i, user_id in enumerate(user_ids):
+            common = dict(user_id=user_id, organization_id=org_id, date=day, start_time=time(i % 12 + 6), end_time=time(i % 12 + 10))
+            shift_rows.append(dict(id=uuid.uuid4(), origin_user_id=user_id, status=ShiftStatus.TAKEN, created_at=now, **common))
+            availability_rows.append(dict(id=uuid.uuid4(), created_at=now, **common))
+    with Session(bind) as session:
+        session.add(Organization(id=org_id, name="Bench", org_code="bench1"))
+        session.add_all(
+            User(id=user_id, full_name=f"user {i}", email=f"user{i}@example.com", role="worker", organization_id=org_id)
+            for i, user_id in enumerate(user_ids)
+        )
+        session.add_all(
+            ShiftSlot(organization_id=org_id, name=f"Slot {i}", start_time=time(i + 6), end_time=time(i + 8), expected_workers=5)
+            for i in range(SLOTS)
+        )
+        session.flush()
+        for entity, rows in ((Shift, shift_rows), (Availability, availability_rows)):
+            for i in range(0, len(rows), 1000):
+                session.exec(insert(entity).values(rows[i:i + 1000]))  # type: ignore
+        session.commit()
+    return org_id
+
+
+def sync_app(session_scope: Callable[[], ContextManager[Session]]) -> FastAPI:
+    app = FastAPI()
+
+    # The route as it was before the async stack
+    @app.get("/shifts/")
+    def list_shifts(limit: int = Query(PAGE_SIZE)):
+        with session_scope() as session:
+            return build_shift_service(session).list_page(limit, None, ShiftFilter())
+
+    return app
+
+
+def async_app(overrides: dict, offload: Optional[Offload] = None) -> FastAPI:
+    app = FastAPI()
+    app.include_router(shifts.router)
+    app.dependency_overrides.update(overrides)
+    if offload:
+        # Calculations without drafts, so that they only read, with the given offload
+        def build_calculation_service(session: Session) -> ShiftService:
+            return ShiftService(
+                ShiftRepository(session), AvailabilityRepository(session), UserRepository(session), offload=offload
+            )
+
+        def get_calculation_service(session=Depends(get_session, scope="function")) -> AsyncService[ShiftService]:
+            return AsyncService(session, build_calculation_service)
+        app.dependency_overrides[get_shift_service] = get_calculation_service
+    return app
+
+
+async def request(app: FastAPI, method: str, path: str, query: str = "", body: Optional[dict] = None) -> int:
+    """Calls the ASGI app directly, so that no HTTP client skews the timings."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")] if body is not None else [],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_clients(app: FastAPI, clients: int, calculation: Optional[dict] = None) -> tuple[List[float], float, int]:
+    """
+    Runs the listing clients, with one more client calculating meanwhile when a
+    calculation request is given.
+    :return: Latencies of the listings, longest stall of the event loop (the
+        delay of a 10 ms ticker, like the keepalives of the event streams),
+        number of calculations run.
+    """
+    latencies: List[float] = []
+    calculations = 0
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def client():
+        for _ in range(REQUESTS_PER_CLIENT):
+            started = timer.perf_counter()
+            status = await request(app, "GET", "/shifts/", f"limit={PAGE_SIZE}")
+            latencies.append(timer.perf_counter() - started)
+            assert status == 200, f"Unexpected status {status}"
+
+    async def calculating_client():
+        nonlocal calculations
+        while not done.is_set():
+            status = await request(app, "POST", "/shifts/calculate/range", body=calculation)
+            assert status == 200, f"Unexpected status {status}"
+            calculations += 1
+
+    async def ticker():
+        nonlocal stall
+        while not done.is_set():
+            started = timer.perf_counter()
+            await asyncio.sleep(TICK)
+            stall = max(stall, timer.perf_counter() - started - TICK)
+
+    async def listing_clients():
+        await asyncio.gather(*(client() for _ in range(clients)))
+        done.set()
+
+    tasks = [listing_clients(), ticker()]
+    if calculation is not None:
+        tasks.append(calculating_client())
+    await asyncio.gather(*tasks)
+    return latencies, stall, calculations
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def main():
+    user_id = os.environ.get("BENCH_USER_ID")
+    directory = tempfile.TemporaryDirectory()
+    if user_id:
+        # Statement logging would dominate the timings
+        engine.echo = False
+        get_async_engine().echo = False
+        async_engine = get_async_engine()
+        with Session(engine) as session:
+            organization_id = session.get(User, uuid.UUID(user_id)).organization_id
+        sync_scope = lambda: user_session(user_id)
+        overrides = {get_current_user_id: lambda: user_id}
+    else:
+        url = f"{directory.name}/bench.db"
+        sync_engine = create_engine(f"sqlite:///{url}", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(sync_engine)
+        organization_id = seed(sync_engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+
+        @contextmanager
+        def sync_scope():
+            with Session(sync_engine, expire_on_commit=False) as session, UnitOfWork(session):
+                yield session
+
+        async def sqlite_session():
+            async with AsyncSession(async_engine, expire_on_commit=False) as session, UnitOfWork(session):
+                yield session
+        overrides = {get_session: sqlite_session}
+
+    calculation = {
+        "start_date": str(START),
+        "end_date": str(START + timedelta(days=DAYS - 1)),
+        "organization_id": str(organization_id),
+        "mode": "greedy",
+        "parallel": True,
+    }
+    backend = "postgres" if user_id else "sqlite"
+    header = f"{'stack':>24} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'loop stall (ms)':>16} {'calculations':>13}"
+
+    async def measure(name: str, app: FastAPI, clients: int, calculation: Optional[dict] = None) -> None:
+        # Warm up the pools
+        await request(app, "GET", "/shifts/", f"limit={PAGE_SIZE}")
+        started = timer.perf_counter()
+        latencies, stall, calculations = await run_clients(app, clients, calculation)
+        elapsed = timer.perf_counter() - started
+        print(
+            f"{name:>24} {len(latencies) / elapsed:>8.0f} "
+            f"{percentile(latencies, 0.5) * 1e3:>9.1f} {percentile(latencies, 0.99) * 1e3:>9.1f} "
+            f"{stall * 1e3:>16.1f} {calculations if calculation else '-':>13}"
+        )
+
+    print(f"{CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, GET /shifts/?limit={PAGE_SIZE}, on {backend}")
+    print(header)
+    await measure("sync", sync_app(sync_scope), CLIENTS)
+    await measure("async", async_app(overrides), CLIENTS)
+
+    print()
+    print(
+        f"{CALCULATION_CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, GET /shifts/?limit={PAGE_SIZE}, "
+        f"while one client runs {DAYS} days calculations (parallel greedy), on {backend}"
+    )
+    print(header)
+    await measure("async, no calculation", async_app(overrides), CALCULATION_CLIENTS)
+    await measure("async, solver on loop", async_app(overrides, run_inline), CALCULATION_CLIENTS, calculation)
+    await measure("async, solver offloaded", async_app(overrides, run_blocking), CALCULATION_CLIENTS, calculation)
+    await async_engine.dispose()
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
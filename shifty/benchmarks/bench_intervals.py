@@ -0,0 +1,44 @@
+"""
+Microbenchmark of IntervalSet overlap queries against a linear scan.
+
+Run with:
+    python -m shifty.benchmarks.bench_intervals
+"""
+import random
+import time as timer
+from shifty.domain.intervals import IntervalSet
+
+SIZES = [10, 100, 1_000, 10_000]
+QUERIES = 10_000
+
+
+def naive_overlaps(intervals, start, end):
+    return any(s < end and e > start for s, e in intervals)
+
+
+def main():
+    print(f"{'intervals':>10} {'scan (us/query)':>16} {'IntervalSet (us/query)':>23}")
+    for size in SIZES:
+        rng = random.Random(size)
+        # Disjoint intervals, like the shifts of a user or the overrides of a shift
+        intervals = [(i * 10, i * 10 + rng.randint(1, 9)) for i in range(size)]
+        queries = []
+        for _ in range(QUERIES):
+            start = rng.randint(0, size * 10)
+            queries.append((start, start + rng.randint(1, 5)))
+        interval_set = IntervalSet.from_intervals(intervals)
+
+        started = timer.perf_counter()
+        expected = [naive_overlaps(intervals, s, e) for s, e in queries]
+        scan = (timer.perf_counter() - started) / QUERIES * 1e6
+
+        started = timer.perf_counter()
+        result = [interval_set.overlaps(s, e) for s, e in queries]
+        indexed = (timer.perf_counter() - started) / QUERIES * 1e6
+
+        assert result == expected
+        print(f"{size:>10} {scan:>16.2f} {indexed:>23.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Rows per second of the read-only listings (/shifts/date/{date},
+/availabilities/date/{date}, /overrides/open) over 100k rows: ORM entities
+validated into the response model, as before, against the column projections.
+Each listing is timed from the query to the JSON of the response, the way
+FastAPI validates and serializes it.
+
+/overrides/open could not serialize entities (OverrideRead.requester_id has no
+attribute on Override), so it only compares loading the rows.
+
+Runs on a temporary SQLite database, or on BENCH_DATABASE_URL (e.g. a scratch
+Postgres database, tables are created and filled). Run with:
+    python -m shifty.benchmarks.bench_projections
+"""
+import os
+import tempfile
+import time as timer
+import uuid
+from datetime import date, datetime, time
+from typing import Callable, List
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine
+from shifty.application.dto.availability_dto import AvailabilityFull
+from shifty.application.dto.override_dto import OverrideRead
+from shifty.domain.entities import Availability, Organization, Override, Shift, ShiftRead, ShiftStatus, User
+from shifty.infrastructure.repositories.availability_sqlalchemy import AvailabilityRepository
+from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+
+ROWS = 100_000
+USERS = 1_000
+DAY = date(2025, 6, 18)
+RUNS = 3
+
+
+def seed(engine) -> None:
+    """ROWS shifts, availabilities and open overrides on DAY, 10 minutes apart per user."""
+    now = datetime.now()
+    org_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(USERS)]
+    shifts, availabilities, overrides = [], [], []
+    for i in range(ROWS):
+        user_id = user_ids[i % USERS]
+        minute = i // USERS * 10
+        start, end = time(minute // 60, minute % 60), time((minute + 5) // 60, (minute + 5) % 60)
+        shift_id = uuid.uuid4()
+        common = dict(user_id=user_id, organization_id=org_id, date=DAY, start_time=start, end_time=end)
+        shifts.append(dict(
+            id=shift_id, origin_user_id=user_id, status=ShiftStatus.TAKEN, created_at=now, **common
+        ))
+        availabilities.append(dict(id=uuid.uuid4(), created_at=now, **common))
+        overrides.append(dict(id=uuid.uuid4(), shift_id=shift_id, is_taken=False, created_at=now, **common))
+    with Session(engine) as session:
+        session.add(Organization(id=org_id, name="Bench", org_code="bench0"))
+        session.add_all(
+            User(id=user_id, full_name=f"user {i}", email=f"user{i}@example.com", role="worker", organization_id=org_id)
+            for i, user_id in enumerate(user_ids)
+        )
+        session.flush()
+        for entity, rows in ((Shift, shifts), (Availability, availabilities), (Override, overrides)):
+            for i in range(0, len(rows), 1000):
+                session.exec(insert(entity).values(rows[i:i + 1000]))  # type: ignore
+        session.commit()
+
+
+def rows_per_second(engine, listing: Callable[[Session], List]) -> float:
+    best = float("inf")
+    for _ in range(RUNS):
+        # A new session per run, like a request: nothing is cached in the identity map
+        with Session(engine) as session:
+            started = timer.perf_counter()
+            rows = listing(session)
+            best = min(best, timer.perf_counter() - started)
+        assert len(rows) == ROWS, f"Expected {ROWS} rows, got {len(rows)}"
+    return ROWS / best
+
+
+def serialized(adapter: TypeAdapter, **options) -> Callable[[List], List]:
+    def serialize(rows: List) -> List:
+        adapter.dump_json(adapter.validate_python(rows, **options))
+        return rows
+    return serialize
+
+
+def main():
+    url = os.environ.get("BENCH_DATABASE_URL")
+    directory = tempfile.TemporaryDirectory()
+    engine = create_engine(url or f"sqlite:///{directory.name}/bench.db")
+    SQLModel.metadata.create_all(engine)
+    seed(engine)
+
+    shifts = serialized(TypeAdapter(List[ShiftRead]))
+    shift_entities = serialized(TypeAdapter(List[ShiftRead]), from_attributes=True)
+    availabilities = serialized(TypeAdapter(List[AvailabilityFull]))
+    availability_entities = serialized(TypeAdapter(List[AvailabilityFull]), from_attributes=True)
+    overrides = serialized(TypeAdapter(List[OverrideRead]))
+    listings = [
+        (
+            "/shifts/date",
+            lambda s: shift_entities(ShiftRepository(s).get_by_date(DAY)),
+            lambda s: shifts(ShiftRepository(s).get_rows_by_date(DAY))
+        ),
+        (
+            "/availabilities/date",
+            lambda s: availability_entities(AvailabilityRepository(s).get_by_date(DAY)),
+            lambda s: availabilities(AvailabilityRepository(s).get_rows_by_date(DAY))
+        ),
+        (
+            "/overrides/open (load)",
+            lambda s: OverrideRepository(s).get_open(),
+            lambda s: OverrideRepository(s).get_open_rows()
+        ),
+        (
+            "/overrides/open",
+            None,
+            lambda s: overrides(OverrideRepository(s).get_open_rows())
+        ),
+    ]
+
+    print(f"{ROWS} rows on {engine.url.get_backend_name()}, best of {RUNS} runs")
+    print(f"{'listing':>24} {'entities (rows/s)':>18} {'projection (rows/s)':>20} {'speedup':>8}")
+    for name, before, after in listings:
+        after_rate = rows_per_second(engine, after)
+        if before is None:
+            print(f"{name:>24} {'-':>18} {after_rate:>20,.0f} {'-':>8}")
+            continue
+        before_rate = rows_per_second(engine, before)
+        print(f"{name:>24} {before_rate:>18,.0f} {after_rate:>20,.0f} {after_rate / before_rate:>7.1f}x")
+    engine.dispose()
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,63 @@
 from fastapi import Depends
+from sqlmodel import Session
 from shifty.application.use_cases.availability_service import AvailabilityService
+from shifty.application.use_cases.calculation_job_service import CalculationJobService
+from shifty.application.use_cases.schedule_draft_service import ScheduleDraftService
 from shifty.application.use_cases.shift_service import ShiftService
+from shifty.infrastructure.async_services import AsyncService, run_blocking
 from shifty.infrastructure.repositories.availability_sqlalchemy import AvailabilityRepository
-from shifty.infrastructure.db import get_session
+from shifty.infrastructure.repositories.calculation_job_sqlalchemy import CalculationJobRepository
+from shifty.infrastructure.repositories.draft_schedule_sqlalchemy import DraftScheduleRepository
+from shifty.infrastructure.db import engine, get_session
+from shifty.infrastructure.notifications import OverrideEventBroker, connect_listener
 from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
 from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
 
-def get_availability_service(session = Depends(get_session)) -> AvailabilityService:
+# Services built on a synchronous session, for the worker and the async facades.
+# Their CPU bound work goes through run_blocking, so that it leaves the event loop
+# when they run in the greenlet of an async route
+
+def build_schedule_draft_service(session: Session) -> ScheduleDraftService:
+    return ScheduleDraftService(
+        DraftScheduleRepository(session),
+        ShiftRepository(session),
+        AvailabilityRepository(session),
+        UserRepository(session),
+        offload=run_blocking
+    )
+
+def build_availability_service(session: Session) -> AvailabilityService:
     repository = AvailabilityRepository(session)
-    return AvailabilityService(repository)
+    return AvailabilityService(repository, build_schedule_draft_service(session), offload=run_blocking)
 
-def get_shift_service(session=Depends(get_session)):
+def build_shift_service(session: Session) -> ShiftService:
     return ShiftService(
         ShiftRepository(session),
         AvailabilityRepository(session),
-        UserRepository(session)
-    )
\ No newline at end of file
+        UserRepository(session),
+        build_schedule_draft_service(session),
+        offload=run_blocking
+    )
+
+def build_calculation_job_service(session: Session) -> CalculationJobService:
+    return CalculationJobService(CalculationJobRepository(session))
+
+# Request dependencies
+
+def get_schedule_draft_service(session=Depends(get_session, scope="function")) -> AsyncService[ScheduleDraftService]:
+    return AsyncService(session, build_schedule_draft_service)
+
+def get_availability_service(session=Depends(get_session, scope="function")) -> AsyncService[AvailabilityService]:
+    return AsyncService(session, build_availability_service)
+
+def get_shift_service(session=Depends(get_session, scope="function")) -> AsyncService[ShiftService]:
+    return AsyncService(session, build_shift_service)
+
+def get_calculation_job_service(session=Depends(get_session, scope="function")) -> AsyncService[CalculationJobService]:
+    return AsyncService(session, build_calculation_job_service)
+
+# One listener per process, shared by every client of the override events stream
+override_event_broker = OverrideEventBroker(lambda: connect_listener(engine))
+
+def get_override_event_broker() -> OverrideEventBroker:
+    return override_event_broker
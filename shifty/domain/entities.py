@@ -1,7 +1,7 @@
 import enum
 from typing import Optional
 from pydantic import EmailStr
-from sqlmodel import Column, Enum, Field, SQLModel, Relationship
+from sqlmodel import JSON, Column, Enum, Field, Index, SQLModel, Relationship, UniqueConstraint, text
 from datetime import date, time, datetime, timedelta
 import uuid
 
@@ -35,6 +35,13 @@ class User(UserBase, table=True):
     This model is used to store user information such as full name, email, role, and active status.
     """
     __tablename__ = "users"  # type: ignore
+    __table_args__ = (
+        # Login and registration look users up by email, the solvers by role
+        Index("ix_users_email", "email"),
+        Index("ix_users_role", "role"),
+        # Sort key of the paginated listing
+        Index("ix_users_full_name_id", "full_name", "id"),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     organization_id: uuid.UUID = Field(
         foreign_key="organizations.id",
@@ -90,6 +97,13 @@ class Availability(SQLModel, table=True):
     This model is used to store the availability of a user for a specific date and time range.
     """
     __tablename__ = "availabilities" # type: ignore
+    __table_args__ = (
+        # Sort key of the paginated listing
+        Index("ix_availabilities_date_start_time_id", "date", "start_time", "id"),
+        # Date range listings of an organization or a user
+        Index("ix_availabilities_organization_id_date", "organization_id", "date"),
+        Index("ix_availabilities_user_id_date", "user_id", "date"),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id")
     date: date
@@ -107,6 +121,74 @@ class Availability(SQLModel, table=True):
     }
 
 
+class AvailabilityOccurrence(SQLModel):
+    """
+    Represents a recurring availability on one of its dates. It is derived from its
+    template when the date is queried, not stored: it has no ID of its own, and is
+    changed or removed through the template (recurring_id).
+    """
+    recurring_id: uuid.UUID
+    user_id: uuid.UUID
+    organization_id: uuid.UUID
+    date: date
+    start_time: time
+    end_time: time
+    note: Optional[str] = None
+    created_at: datetime
+
+
+class RecurringAvailability(SQLModel, table=True):
+    """
+    Represents an availability repeated every week on the same weekday.
+    It is not stored once per date: repositories expand it into occurrences
+    for the dates being queried, unless the user has one-off availabilities
+    on that date, which take precedence.
+    """
+    __tablename__ = "recurring_availabilities"  # type: ignore
+    __table_args__ = (
+        Index("ix_recurring_availabilities_weekday_validity", "weekday", "valid_from", "valid_until"),
+    )
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="users.id", index=True)
+    organization_id: uuid.UUID = Field(foreign_key="organizations.id")
+    weekday: int  # 0 = Monday ... 6 = Sunday, like date.weekday()
+    start_time: time
+    end_time: time
+    valid_from: date
+    valid_until: Optional[date] = None  # Inclusive, None for no end
+    exceptions: list = Field(default_factory=list, sa_column=Column(JSON, nullable=False))  # ISO dates skipped
+    note: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    def occurs_on(self, day: date) -> bool:
+        """
+        Checks whether the template applies to a date.
+        :param day: The date to check.
+        """
+        return (
+            day.weekday() == self.weekday
+            and self.valid_from <= day
+            and (self.valid_until is None or day <= self.valid_until)
+            and day.isoformat() not in self.exceptions
+        )
+
+    def expand(self, day: date) -> AvailabilityOccurrence:
+        """
+        Builds the occurrence of the template on a date.
+        :param day: A date the template occurs on.
+        """
+        return AvailabilityOccurrence(
+            recurring_id=self.id,
+            user_id=self.user_id,
+            organization_id=self.organization_id,
+            date=day,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            note=self.note,
+            created_at=self.created_at
+        )
+
+
 
 class ShiftStatus(str, enum.Enum):
     """
@@ -139,6 +221,15 @@ class Shift(ShiftBase, table=True):
     Represents a work shift assigned to a user in an organization.
     """
     __tablename__ = "shifts"  # type: ignore
+    __table_args__ = (
+        # Prefix (LIKE 'path%') lookups on Postgres need the pattern operator class
+        Index("ix_shifts_lineage_path", "lineage_path", postgresql_ops={"lineage_path": "text_pattern_ops"}),
+        # Sort key of the paginated listing
+        Index("ix_shifts_date_start_time_id", "date", "start_time", "id"),
+        # Date range listings of an organization or a user
+        Index("ix_shifts_organization_id_date", "organization_id", "date"),
+        Index("ix_shifts_user_id_date", "user_id", "date"),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id")
     origin_user_id: uuid.UUID = Field(foreign_key="users.id")
@@ -149,6 +240,10 @@ class Shift(ShiftBase, table=True):
     note: Optional[str] = None
     status: ShiftStatus = Field(sa_column=Column(Enum(ShiftStatus)), default=ShiftStatus.PENDING)
     parent_shift_id: Optional[uuid.UUID] = Field(default=None, foreign_key="shifts.id")
+    # Lineage of a fragment, maintained on split: the originally planned shift and the
+    # ids from it down to this fragment ("root/child/.../id/"). Both are NULL on roots.
+    root_shift_id: Optional[uuid.UUID] = Field(default=None, index=True)
+    lineage_path: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
 
     user: Optional["User"] = Relationship(
@@ -166,6 +261,12 @@ class Shift(ShiftBase, table=True):
         sa_relationship_kwargs={"cascade": "all, delete-orphan"}
     )
 
+    def lineage_prefix(self) -> str:
+        """
+        Path prefix shared by the lineage paths of all the fragments descending from this shift.
+        """
+        return self.lineage_path or f"{self.id}/"
+
 
 class ShiftSlot(SQLModel, table=True):
     """ Represents a shift slot in an organization """
@@ -183,11 +284,50 @@ class ShiftSlot(SQLModel, table=True):
     updated_at: Optional[datetime] = None  # When the slot was last updated
 
 
+class Rotation(SQLModel, table=True):
+    """
+    Represents a repeating pattern of shifts: who works which shift slot on which
+    weekday, over a cycle of one or more weeks. Week 0 of the cycle is the week
+    of `starts_on`.
+    """
+    __tablename__ = "rotations"  # type: ignore
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    organization_id: uuid.UUID = Field(foreign_key="organizations.id")
+    name: str
+    cycle_weeks: int = Field(default=1)  # Length of the cycle, in weeks
+    starts_on: date  # Any date of the first week of the cycle
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class RotationEntry(SQLModel, table=True):
+    """
+    Represents a user working a shift slot on a weekday of a week of a rotation cycle.
+    """
+    __tablename__ = "rotation_entries"  # type: ignore
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    rotation_id: uuid.UUID = Field(foreign_key="rotations.id", index=True)
+    user_id: uuid.UUID = Field(foreign_key="users.id")
+    shift_slot_id: uuid.UUID = Field(foreign_key="shift_slots.id")
+    week: int = Field(default=0)  # 0 ... cycle_weeks - 1
+    weekday: int  # 0 = Monday ... 6 = Sunday, like date.weekday()
+
+
 class Override(SQLModel, table=True):
     """
     Represents a request to override (partially or totally) a shift by another user.
     """
     __tablename__ = "overrides"  # type: ignore
+    __table_args__ = (
+        Index("ix_overrides_shift_id_date", "shift_id", "date"),
+        # Sort key of the paginated listing
+        Index("ix_overrides_date_start_time_id", "date", "start_time", "id"),
+        # Open overrides in listing order; taken ones, most of the table over time, are left out
+        Index(
+            "ix_overrides_open", "date", "start_time", "id",
+            postgresql_where=text("is_taken = false"),
+            sqlite_where=text("is_taken = 0")
+        ),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     shift_id: uuid.UUID = Field(foreign_key="shifts.id")
     user_id: uuid.UUID = Field(foreign_key="users.id")
@@ -209,6 +349,66 @@ class Override(SQLModel, table=True):
 
 
 
+class DraftSchedule(SQLModel, table=True):
+    """
+    Represents the proposed (not yet published) schedule of an organization for a date.
+    It is refreshed incrementally when availabilities change.
+    """
+    __tablename__ = "draft_schedules"  # type: ignore
+    __table_args__ = (UniqueConstraint("organization_id", "date"),)
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    organization_id: uuid.UUID = Field(foreign_key="organizations.id")
+    date: date
+    mode: str = Field(default="greedy")  # Calculation mode used to produce and repair the draft
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: Optional[datetime] = None
+
+
+class DraftAssignment(SQLModel, table=True):
+    """
+    Represents a user proposed for a shift slot in a draft schedule.
+    """
+    __tablename__ = "draft_assignments"  # type: ignore
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    draft_schedule_id: uuid.UUID = Field(foreign_key="draft_schedules.id", index=True)
+    shift_slot_id: uuid.UUID = Field(foreign_key="shift_slots.id")
+    user_id: uuid.UUID = Field(foreign_key="users.id")
+    start_time: time
+    end_time: time
+
+
+class CalculationJobStatus(str, enum.Enum):
+    """
+    Enum representing the status of a background shift calculation job.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class CalculationJob(SQLModel, table=True):
+    """
+    Represents a shift calculation queued for a background worker.
+    The request is stored as submitted; the result is stored as compact rows
+    [date, shift_slot_id, user_id, start_time, end_time].
+    """
+    __tablename__ = "calculation_jobs"  # type: ignore
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    organization_id: uuid.UUID = Field(foreign_key="organizations.id")
+    requested_by_id: uuid.UUID = Field(foreign_key="users.id")
+    status: CalculationJobStatus = Field(
+        sa_column=Column(Enum(CalculationJobStatus), index=True),
+        default=CalculationJobStatus.PENDING
+    )
+    request: dict = Field(sa_column=Column(JSON, nullable=False))
+    result: Optional[list] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class Auth(SQLModel, table=True):
     __tablename__ = "auth"  # type: ignore
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -20,4 +20,12 @@ class InvalidShiftException(Exception):
 
 class OverlappingShiftException(Exception):
     """Exception raised when a shift overlaps with another."""
-    pass
\ No newline at end of file
+    pass
+
+class NotAllowedException(Exception):
+    """Exception raised when a user is not allowed to perform an action."""
+    pass
+
+class InvalidCursorException(Exception):
+    """Exception raised when a pagination cursor cannot be decoded."""
+    pass
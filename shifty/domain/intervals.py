@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+from typing import Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalSet(Generic[T]):
+    """
+    Sorted set of disjoint half-open intervals [start, end).
+
+    Starts and ends are kept in two parallel sorted lists. Because the intervals are
+    disjoint the ends are sorted too, so an overlap query only has to look at the
+    interval with the largest start before the queried end: O(log n) with a bisect.
+    Works with any comparable bound (times, datetimes, numbers).
+    """
+
+    def __init__(self):
+        self._starts: List[T] = []
+        self._ends: List[T] = []
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Tuple[T, T]]) -> "IntervalSet[T]":
+        """
+        Builds a set from intervals that may overlap each other, by merging them.
+        Overlap queries on the result answer "does it overlap any of the intervals".
+        :param intervals: (start, end) pairs.
+        """
+        interval_set = cls()
+        for start, end in intervals:
+            interval_set.merge(start, end)
+        return interval_set
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[Tuple[T, T]]:
+        return iter(zip(self._starts, self._ends))
+
+    def __contains__(self, interval: Tuple[T, T]) -> bool:
+        start, end = interval
+        i = bisect_left(self._starts, start)
+        return i < len(self._starts) and self._starts[i] == start and self._ends[i] == end
+
+    def overlaps(self, start: T, end: T) -> bool:
+        """
+        Checks whether [start, end) overlaps an interval of the set.
+        Touching intervals (one ends where the other starts) do not overlap.
+        :param start: Start of the queried interval.
+        :param end: End of the queried interval.
+        """
+        i = bisect_left(self._starts, end) - 1
+        return i >= 0 and self._ends[i] > start
+
+    def add(self, start: T, end: T) -> None:
+        """
+        Inserts an interval that must not overlap the set.
+        :param start: Start of the interval.
+        :param end: End of the interval.
+        :raises ValueError: If the interval overlaps an interval of the set.
+        """
+        if self.overlaps(start, end):
+            raise ValueError("Interval overlaps an existing interval.")
+        i = bisect_left(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+
+    def remove(self, start: T, end: T) -> None:
+        """
+        Removes an interval of the set.
+        :param start: Start of the interval.
+        :param end: End of the interval.
+        :raises ValueError: If the interval is not in the set.
+        """
+        if (start, end) not in self:
+            raise ValueError("Interval not in set.")
+        i = bisect_left(self._starts, start)
+        del self._starts[i]
+        del self._ends[i]
+
+    def merge(self, start: T, end: T) -> Tuple[T, T]:
+        """
+        Inserts an interval, coalescing it with the intervals it overlaps or touches.
+        :param start: Start of the interval.
+        :param end: End of the interval.
+        :return: The resulting (start, end) interval of the set.
+        """
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+        return start, end
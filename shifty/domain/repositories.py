@@ -1,10 +1,24 @@
 # shifty/domain/repositories.py
+import enum
 from abc import ABC, abstractmethod
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime
+from typing import ContextManager, Iterable, List, Optional, Tuple
 from uuid import UUID
-from shifty.application.dto.availability_dto import AvailabilityUpdate
-from shifty.domain.entities import Availability, User, Shift, ShiftSlot
+from shifty.application.dto.availability_dto import AvailabilityFilter, AvailabilityUpdate
+from shifty.application.dto.dto import Page
+from shifty.domain.entities import Availability, AvailabilityOccurrence, RecurringAvailability, CalculationJob, DraftAssignment, DraftSchedule, Rotation, RotationEntry, User, Shift, ShiftSlot
+from shifty.application.dto.shift_dto import RotationMaterializeResult, ShiftCompactionResult, ShiftFilter
+
+class Loading(str, enum.Enum):
+    """
+    How a query loads the users embedded by the response models (ShiftRead.user,
+    AvailabilityFull.user): left lazy, each row issues its own SELECT when it is
+    serialized, which the async stack cannot do outside of run_sync anyway.
+    """
+    LAZY = "lazy"  # Not loaded, for callers that do not read them
+    SELECTIN = "selectin"  # One more SELECT ... WHERE id IN (...) for the whole list
+    JOINED = "joined"  # A LEFT OUTER JOIN in the same statement, for single rows
+
 
 # Repository interface for managing Availability entities
 class AvailabilityRepositoryInterface(ABC):
@@ -25,10 +39,30 @@ class AvailabilityRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def get_all(self) -> List[Availability]:
+    def get_all(self, loading: Loading = Loading.SELECTIN) -> List[Availability]:
         """
         Retrieve all Availability entities from the repository.
         This method is used to fetch all availability records.
+        :param loading: How the user of each availability is loaded.
+        """
+        pass
+
+    @abstractmethod
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[AvailabilityFilter] = None,
+        loading: Loading = Loading.SELECTIN
+    ) -> Page[Availability]:
+        """
+        Retrieve one page of Availability entities, sorted by date, start time and ID.
+        :param limit: Maximum number of availabilities of the page.
+        :param cursor: The next_cursor of the previous page, None for the first page.
+        :param filters: Criteria the availabilities must match, if given.
+        :param loading: How the user of each availability is loaded.
+        :return: The page, with the cursor of the next one.
+        :raises InvalidCursorException: If the cursor is malformed.
         """
         pass
 
@@ -51,39 +85,119 @@ class AvailabilityRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def get_by_id(self, availability_id: UUID) -> Availability:
+    def get_by_id(self, availability_id: UUID, loading: Loading = Loading.JOINED) -> Availability:
         """
         Retrieve an Availability entity by its ID.
         :param availability_id: UUID of the availability to be retrieved.
+        :param loading: How the user of the availability is loaded.
         :return: Availability entity corresponding to the provided ID.
         """
         pass
 
     @abstractmethod
-    def get_by_user_id(self, user_id: UUID) -> List[Availability]:
+    def get_by_user_id(self, user_id: UUID, loading: Loading = Loading.SELECTIN) -> List[Availability]:
         """
         Get all Availability entities for a specific user.
         :param user_id: UUID of the user whose availability is being queried.
+        :param loading: How the user of each availability is loaded.
         :return: List of Availability entities for the specified user.
         """
         pass
 
     @abstractmethod
-    def get_by_date(self, date: date) -> List[Availability]:
+    def get_by_date(
+        self,
+        date: date,
+        loading: Loading = Loading.SELECTIN
+    ) -> List[Availability | AvailabilityOccurrence]:
+        """
+        Get all Availability entities for a specific date, and the occurrences of the
+        recurring availabilities on that date.
+        :param date: Date for which availability is being queried.
+        :param loading: How the user of each availability is loaded.
+        :return: List of Availability entities and occurrences for the specified date.
+        """
+        pass
+
+    @abstractmethod
+    def get_rows_by_date(self, date: date) -> List[dict]:
         """
-        Get all Availability entities for a specific date.
+        Get the availabilities of a specific date like get_by_date, as plain rows shaped
+        like AvailabilityFull (with the user nested), read with a column projection
+        instead of Availability entities. For read-only listings.
         :param date: Date for which availability is being queried.
-        :return: List of Availability entities for the specified date.
+        :return: List of rows for the specified date.
         """
         pass
 
     @abstractmethod
-    def get_by_user_id_and_date(self, user_id: UUID, date: date) -> List[Availability]:
+    def import_many(self, availabilities: List[Availability]) -> List[UUID]:
         """
-        Get all Availability entities for a specific user on a specific date.
+        Bulk load Availability entities, skipping the ones that overlap an availability
+        already stored for the same user. The entities must not overlap each other.
+        :param availabilities: Availability entities to be saved, with their IDs already set.
+        :return: IDs of the skipped availabilities.
+        """
+        pass
+
+    @abstractmethod
+    def get_by_date_range(
+        self,
+        start_date: date,
+        end_date: date,
+        loading: Loading = Loading.SELECTIN
+    ) -> List[Availability | AvailabilityOccurrence]:
+        """
+        Get all Availability entities between two dates in a single query, and the
+        occurrences of the recurring availabilities on those dates.
+        :param start_date: First date of the range (inclusive).
+        :param end_date: Last date of the range (inclusive).
+        :param loading: How the user of each availability is loaded.
+        :return: List of Availability entities and occurrences within the range.
+        """
+        pass
+
+    @abstractmethod
+    def get_by_user_id_and_date(
+        self,
+        user_id: UUID,
+        date: date,
+        loading: Loading = Loading.SELECTIN
+    ) -> List[Availability | AvailabilityOccurrence]:
+        """
+        Get all Availability entities for a specific user on a specific date, and the
+        occurrences of the user's recurring availabilities on that date.
         :param user_id: UUID of the user whose availability is being queried.
         :param date: Date for which availability is being queried.
-        :return: List of Availability entities for the specified user and date.
+        :param loading: How the user of each availability is loaded.
+        :return: List of Availability entities and occurrences for the specified user and date.
+        """
+        pass
+
+    @abstractmethod
+    def add_recurring(self, recurring: RecurringAvailability) -> RecurringAvailability:
+        """
+        Add a new RecurringAvailability entity to the repository.
+        :param recurring: The weekly availability template to be saved.
+        """
+        pass
+
+    @abstractmethod
+    def get_recurring_by_user_id(self, user_id: UUID) -> List[RecurringAvailability]:
+        """
+        Get all RecurringAvailability entities of a user.
+        :param user_id: UUID of the user whose templates are being queried.
+        :return: List of RecurringAvailability entities of the user.
+        """
+        pass
+
+    @abstractmethod
+    def delete_recurring(self, recurring_id: UUID) -> RecurringAvailability:
+        """
+        Delete a RecurringAvailability entity by its ID.
+        :param recurring_id: UUID of the template to be deleted.
+        :return: The deleted template.
+        :raises ValueError: If the template does not exist.
         """
         pass
 
@@ -98,6 +212,15 @@ class UserRepositoryInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_many(self, user_ids: Iterable[UUID]) -> List[User]:
+        """
+        Retrieve several User entities by their IDs in a single query.
+        :param user_ids: UUIDs of the users to be retrieved.
+        :return: List of the User entities found, in no particular order.
+        """
+        pass
+
     @abstractmethod
     def get_all(self) -> List[User]:
         """
@@ -106,6 +229,17 @@ class UserRepositoryInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[User]:
+        """
+        Retrieve one page of User entities, sorted by full name and ID.
+        :param limit: Maximum number of users of the page.
+        :param cursor: The next_cursor of the previous page, None for the first page.
+        :return: The page, with the cursor of the next one.
+        :raises InvalidCursorException: If the cursor is malformed.
+        """
+        pass
+
     @abstractmethod
     def add(self, user: User) -> User:
         """
@@ -134,19 +268,50 @@ class UserRepositoryInterface(ABC):
 
 class ShiftRepositoryInterface(ABC):
     @abstractmethod
-    def get_by_id(self, shift_id: UUID) -> Optional[Shift]:
+    def get_by_id(self, shift_id: UUID, loading: Loading = Loading.JOINED) -> Optional[Shift]:
         """
         Retrieve a Shift entity by its ID.
         :param shift_id: UUID of the shift to be retrieved.
+        :param loading: How the user of the shift is loaded.
         :return: Shift entity corresponding to the provided ID, or None if not found.
         """
         pass
 
     @abstractmethod
-    def get_all(self) -> List[Shift]:
+    def get_many(self, shift_ids: Iterable[UUID], loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        """
+        Retrieve several Shift entities by their IDs in a single query.
+        :param shift_ids: UUIDs of the shifts to be retrieved.
+        :param loading: How the user of each shift is loaded.
+        :return: List of the Shift entities found, in no particular order.
+        """
+        pass
+
+    @abstractmethod
+    def get_all(self, loading: Loading = Loading.SELECTIN) -> List[Shift]:
         """
         Retrieve all Shift entities from the repository.
         This method is used to fetch all shift records.
+        :param loading: How the user of each shift is loaded.
+        """
+        pass
+
+    @abstractmethod
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[ShiftFilter] = None,
+        loading: Loading = Loading.SELECTIN
+    ) -> Page[Shift]:
+        """
+        Retrieve one page of Shift entities, sorted by date, start time and ID.
+        :param limit: Maximum number of shifts of the page.
+        :param cursor: The next_cursor of the previous page, None for the first page.
+        :param filters: Criteria the shifts must match, if given.
+        :param loading: How the user of each shift is loaded.
+        :return: The page, with the cursor of the next one.
+        :raises InvalidCursorException: If the cursor is malformed.
         """
         pass
 
@@ -158,6 +323,16 @@ class ShiftRepositoryInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_many(self, shifts: List[Shift]) -> List[Shift]:
+        """
+        Add several Shift entities with a single multi-row insert, in one transaction.
+        Either all the shifts are saved or none is.
+        :param shifts: Shift entities to be saved, with their IDs already set.
+        :return: The saved Shift entities.
+        """
+        pass
+
     @abstractmethod
     def delete(self, shift_id: UUID) -> None:
         """
@@ -167,14 +342,26 @@ class ShiftRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def get_by_date(self, date: date) -> List[Shift]:
+    def get_by_date(self, date: date, loading: Loading = Loading.SELECTIN) -> List[Shift]:
         """
         Get all Shift entities for a specific date.
         :param date: Date for which shifts are being queried.
+        :param loading: How the user of each shift is loaded.
         :return: List of Shift entities for the specified date.
         """
         pass
 
+    @abstractmethod
+    def get_rows_by_date(self, date: date) -> List[dict]:
+        """
+        Get the shifts of a specific date as plain rows shaped like ShiftRead (with the
+        user nested), read with a column projection instead of Shift entities.
+        For read-only listings.
+        :param date: Date for which shifts are being queried.
+        :return: List of rows for the specified date.
+        """
+        pass
+
     @abstractmethod
     def get_shift_slots(self) -> List[ShiftSlot]:
         """
@@ -182,6 +369,17 @@ class ShiftRepositoryInterface(ABC):
         This method is used to fetch all shift slot records.
         """
         pass
+
+    @abstractmethod
+    def get_shift_slots_page(self, limit: int, cursor: Optional[str] = None) -> Page[ShiftSlot]:
+        """
+        Retrieve one page of ShiftSlot entities, sorted by start time and ID.
+        :param limit: Maximum number of shift slots of the page.
+        :param cursor: The next_cursor of the previous page, None for the first page.
+        :return: The page, with the cursor of the next one.
+        :raises InvalidCursorException: If the cursor is malformed.
+        """
+        pass
     
     @abstractmethod
     def get_shift_slots_by_organization(self, organization_id: UUID) -> List[ShiftSlot]:
@@ -228,24 +426,40 @@ class ShiftRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def get_by_user(self, user_id: UUID) -> List[Shift]:
+    def get_by_user(self, user_id: UUID, loading: Loading = Loading.SELECTIN) -> List[Shift]:
         """
         Get all shifts for a specific user.
         :param user_id: UUID of the user whose shifts are being queried.
+        :param loading: How the user of each shift is loaded.
         :return: List of Shift entities for the specified user.
         """
         pass
 
     @abstractmethod
-    def get_by_user_and_date(self, user_id: UUID, date: date) -> List[Shift]:
+    def get_by_user_and_date(
+        self,
+        user_id: UUID,
+        date: date,
+        loading: Loading = Loading.SELECTIN
+    ) -> List[Shift]:
         """
         Get all shifts for a specific user on a specific date.
         :param user_id: UUID of the user whose shifts are being queried.
         :param date: Date for which shifts are being queried.
+        :param loading: How the user of each shift is loaded.
         :return: List of Shift entities for the specified user and date.
         """
         pass
 
+    @abstractmethod
+    def get_by_user_date_pairs(self, pairs: Iterable[Tuple[UUID, date]]) -> List[Shift]:
+        """
+        Get the shifts of several (user, date) pairs with a single query.
+        :param pairs: (user ID, date) pairs whose shifts are being queried.
+        :return: List of Shift entities matching any of the pairs.
+        """
+        pass
+
     @abstractmethod
     def update(self, shift_id: UUID, data: dict) -> Shift:
         """
@@ -255,3 +469,210 @@ class ShiftRepositoryInterface(ABC):
         :return: Updated Shift entity.
         """
         pass
+
+    @abstractmethod
+    def get_lineage(self, shift_id: UUID) -> List[Tuple[Shift, int]]:
+        """
+        Get the whole fragment tree a shift belongs to, from the originally planned
+        shift down, with a single recursive query.
+        :param shift_id: UUID of any shift of the tree.
+        :return: (shift, depth) pairs ordered by depth, the root having depth 0;
+                 empty if the shift does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def get_active_descendants(self, shift: Shift, loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        """
+        Get the fragments descending from a shift that are not canceled, using the
+        materialized lineage columns.
+        :param shift: The shift whose descendants are being queried.
+        :param loading: How the user of each shift is loaded.
+        :return: List of Shift entities.
+        """
+        pass
+
+    @abstractmethod
+    def compact_fragments(
+        self,
+        organization_id: Optional[UUID] = None,
+        date: Optional[date] = None
+    ) -> ShiftCompactionResult:
+        """
+        Merge contiguous active fragments of the same parent shift, owner, day and
+        status into one row, in one transaction. The first fragment of each run is
+        extended; the others, which had the same parent_shift_id, are deleted and
+        their overrides moved to it, so the lineage is kept.
+        :param organization_id: Only compact the shifts of this organization, if given.
+        :param date: Only compact the shifts of this date, if given.
+        :return: Counts of extended and deleted fragments.
+        """
+        pass
+
+    @abstractmethod
+    def get_compactable_dates(self) -> List[Tuple[UUID, date]]:
+        """
+        Get the organizations and dates with more than one active fragment of the same
+        parent shift, owner and status, i.e. those `compact_fragments` may merge.
+        Nothing is locked.
+        :return: List of (organization ID, date) pairs.
+        """
+        pass
+
+    @abstractmethod
+    def add_rotation(self, rotation: Rotation, entries: List[RotationEntry]) -> Rotation:
+        """
+        Add a new Rotation entity with its entries, in one transaction.
+        :param rotation: The rotation to be saved.
+        :param entries: The entries of the rotation.
+        :return: The saved Rotation entity.
+        """
+        pass
+
+    @abstractmethod
+    def get_rotation_by_id(self, rotation_id: UUID) -> Optional[Rotation]:
+        """
+        Retrieve a Rotation entity by its ID.
+        :param rotation_id: UUID of the rotation to be retrieved.
+        :return: Rotation entity corresponding to the provided ID, or None if not found.
+        """
+        pass
+
+    @abstractmethod
+    def get_rotation_entries(self, rotation_id: UUID) -> List[RotationEntry]:
+        """
+        Get the entries of a rotation.
+        :param rotation_id: UUID of the rotation.
+        :return: List of RotationEntry entities of the rotation.
+        """
+        pass
+
+    @abstractmethod
+    def materialize_rotation(self, rotation_id: UUID, start_date: date, end_date: date) -> RotationMaterializeResult:
+        """
+        Create the shifts of a rotation for a date window with a single statement run
+        by the database. Shifts overlapping an existing shift of the user are skipped.
+        :param rotation_id: UUID of the rotation.
+        :param start_date: First date of the window (inclusive).
+        :param end_date: Last date of the window (inclusive).
+        :return: Counts of created and skipped shifts, and the conflicts.
+        """
+        pass
+
+
+
+class CalculationJobRepositoryInterface(ABC):
+    @abstractmethod
+    def add(self, job: CalculationJob) -> CalculationJob:
+        """
+        Add a new CalculationJob entity to the repository.
+        This method is used to queue a new calculation.
+        """
+        pass
+
+    @abstractmethod
+    def get_by_id(self, job_id: UUID) -> Optional[CalculationJob]:
+        """
+        Retrieve a CalculationJob entity by its ID.
+        :param job_id: UUID of the job to be retrieved.
+        :return: CalculationJob entity corresponding to the provided ID, or None if not found.
+        """
+        pass
+
+    @abstractmethod
+    def claim_next(self, stale_before: datetime) -> Optional[CalculationJob]:
+        """
+        Claim the oldest pending job and mark it as running.
+        Jobs left running since before `stale_before` are claimed again.
+        Concurrent workers never claim the same job.
+        :param stale_before: Start time before which a running job is considered abandoned.
+        :return: The claimed CalculationJob, or None if there is nothing to do.
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, job_id: UUID, result: list) -> CalculationJob:
+        """
+        Store the result of a job and mark it as done.
+        :param job_id: UUID of the job.
+        :param result: Compact result rows.
+        :return: Updated CalculationJob entity.
+        """
+        pass
+
+    @abstractmethod
+    def fail(self, job_id: UUID, error: str) -> CalculationJob:
+        """
+        Mark a job as failed.
+        :param job_id: UUID of the job.
+        :param error: Description of the failure.
+        :return: Updated CalculationJob entity.
+        """
+        pass
+
+
+
+class DraftScheduleRepositoryInterface(ABC):
+    @abstractmethod
+    def get_by_organization_and_date(self, organization_id: UUID, date: date) -> Optional[DraftSchedule]:
+        """
+        Retrieve the draft schedule of an organization for a date.
+        :param organization_id: UUID of the organization.
+        :param date: Date of the draft.
+        :return: DraftSchedule entity, or None if no calculation was saved for that date.
+        """
+        pass
+
+    @abstractmethod
+    def get_dates(self, organization_id: UUID, start_date: date, end_date: Optional[date] = None) -> List[date]:
+        """
+        Get the dates of the draft schedules of an organization within a period.
+        :param organization_id: UUID of the organization.
+        :param start_date: First date of the period (inclusive).
+        :param end_date: Last date of the period (inclusive), None for no end.
+        :return: Sorted list of the dates with a draft schedule.
+        """
+        pass
+
+    @abstractmethod
+    def get_assignments(self, draft_schedule_id: UUID) -> List[DraftAssignment]:
+        """
+        Get all assignments of a draft schedule.
+        :param draft_schedule_id: UUID of the draft schedule.
+        :return: List of DraftAssignment entities.
+        """
+        pass
+
+    @abstractmethod
+    def save(self, draft: DraftSchedule, assignments: List[DraftAssignment]) -> DraftSchedule:
+        """
+        Save a draft schedule, replacing the draft and every assignment previously
+        stored for the same organization and date.
+        :param draft: DraftSchedule entity to save.
+        :param assignments: Assignments of the draft.
+        :return: Saved DraftSchedule entity.
+        """
+        pass
+
+    @abstractmethod
+    def replace_assignments(
+        self,
+        draft_schedule_id: UUID,
+        shift_slot_ids: Iterable[UUID],
+        assignments: List[DraftAssignment]
+    ) -> None:
+        """
+        Replace the assignments of some shift slots of a draft schedule, leaving the others untouched.
+        :param draft_schedule_id: UUID of the draft schedule.
+        :param shift_slot_ids: UUIDs of the shift slots whose assignments are replaced.
+        :param assignments: New assignments for those shift slots.
+        """
+        pass
+
+    @abstractmethod
+    def savepoint(self) -> ContextManager[None]:
+        """
+        Run a block in a savepoint of the unit of work: an error raised by the block
+        only undoes the block's statements, the unit of work can still commit.
+        """
+        pass
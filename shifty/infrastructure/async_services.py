@@ -0,0 +1,86 @@
+from typing import AsyncIterator, Callable, Generic, Iterator, Optional, TypeVar, Union
+from anyio import from_thread
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+
+class AsyncService(Generic[S]):
+    """
+    Awaitable facade of a service, used by the async routes.
+
+    Every method of the service is exposed as a coroutine. With an AsyncSession the
+    call runs through AsyncSession.run_sync: the repositories issue their queries on
+    the asyncpg connection from a greenlet, and the event loop keeps serving other
+    requests while they wait on the database, with no thread held per request.
+    With a plain Session (the admin routes, the tests) the call runs in the
+    threadpool, as the synchronous routes did.
+
+    Only the database work belongs on the greenlet, which runs on the event loop
+    thread: the services hand their CPU bound work to run_blocking.
+    """
+
+    def __init__(
+        self,
+        session: Optional[Union[AsyncSession, Session]],
+        factory: Callable[[Session], S]
+    ):
+        """
+        :param session: Session of the request.
+        :param factory: Builds the service and its repositories on a synchronous session.
+        """
+        self.session = session
+        self.factory = factory
+
+    async def run(self, call: Callable[[S], T]) -> T:
+        """
+        Runs a function of the service.
+        :param call: Receives the service, its result is returned.
+        """
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(lambda session: call(self.factory(session)))
+        return await run_in_threadpool(lambda: call(self.factory(self.session)))
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            return await self.run(lambda service: getattr(service, name)(*args, **kwargs))
+        method.__name__ = name
+        return method
+
+
+def iterate_blocking(items: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Consumes an async iterator, e.g. the body of a request, from a call run by
+    AsyncService, in a greenlet of run_sync or in a threadpool thread.
+    :param items: The async iterator.
+    """
+    while True:
+        try:
+            if in_greenlet():
+                item = await_only(items.__anext__())
+            else:
+                item = from_thread.run(items.__anext__)
+        except StopAsyncIteration:
+            return
+        yield item
+
+
+def run_blocking(call: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs the CPU bound or blocking work of a service call (solvers, parsing) off
+    the event loop. From the greenlet of run_sync the work goes to the threadpool
+    and the greenlet waits for it while the loop serves other requests; anywhere
+    else (a threadpool thread, the worker) it runs in place. The work must not use
+    the session, which belongs to the greenlet.
+    :param call: The function to run.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(call, *args, **kwargs))
+    return call(*args, **kwargs)
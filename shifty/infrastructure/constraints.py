@@ -0,0 +1,30 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+
+
+# Names of the exclusion constraints (created by migration 0013), used by the
+# repositories to recognize violations
+SHIFTS_NO_OVERLAP = "shifts_no_overlap"
+AVAILABILITIES_NO_OVERLAP = "availabilities_no_overlap"
+OVERRIDES_NO_OVERLAP = "overrides_no_overlap"
+
+# SQLSTATE raised by Postgres when an EXCLUDE constraint is violated
+EXCLUSION_VIOLATION = "23P01"
+
+
+def violated_exclusion_constraint(error: IntegrityError) -> Optional[str]:
+    """
+    Name of the exclusion constraint violated by a failed statement, or None
+    when the error is of another kind.
+    :param error: The IntegrityError raised by SQLAlchemy.
+    """
+    orig = getattr(error, "orig", None)
+    if getattr(orig, "pgcode", None) != EXCLUSION_VIOLATION:
+        return None
+    diag = getattr(orig, "diag", None)
+    if diag is not None:
+        # psycopg2
+        return getattr(diag, "constraint_name", None)
+    # asyncpg: SQLAlchemy's translated error only has the SQLSTATE, the asyncpg
+    # exception it was raised from has the constraint
+    return getattr(orig.__cause__, "constraint_name", None)
@@ -0,0 +1,63 @@
+"""
+Alembic environment of the schema migrations.
+
+Migrations run as the admin role, on the connection handed over by run_migrations
+(startup, tests) or on ADMIN_DATABASE_URL (alembic command line). The functions
+and row level security policies are still created by their idempotent scripts
+after the migrations.
+"""
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import Connection
+from sqlmodel import SQLModel
+import shifty.domain.entities  # noqa: F401 (registers the tables on the metadata)
+from shifty.infrastructure.db import admin_engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = SQLModel.metadata
+
+# Postgres-only generated columns of the exclusion constraints, created by migration
+# 0013 and absent from the models, which SQLite must be able to create
+UNMANAGED_COLUMNS = {"time_range"}
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    if type_ == "column" and reflected and compare_to is None and name in UNMANAGED_COLUMNS:
+        return False
+    return True
+
+
+def run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite alters tables by copying them
+        render_as_batch=connection.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=admin_engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    run_migrations(config.attributes["connection"])
+else:
+    with admin_engine.connect() as connection:
+        run_migrations(connection)
+        connection.commit()
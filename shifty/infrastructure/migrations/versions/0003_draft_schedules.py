@@ -0,0 +1,54 @@
+"""Draft schedules, repaired incrementally when availabilities change.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 21:02:38.115937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('draft_schedules',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('mode', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organization_id', 'date')
+    )
+    op.create_table('draft_assignments',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('draft_schedule_id', sa.Uuid(), nullable=False),
+    sa.Column('shift_slot_id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.ForeignKeyConstraint(['draft_schedule_id'], ['draft_schedules.id'], ),
+    sa.ForeignKeyConstraint(['shift_slot_id'], ['shift_slots.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_draft_assignments_draft_schedule_id'), 'draft_assignments', ['draft_schedule_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_draft_assignments_draft_schedule_id'), table_name='draft_assignments')
+    op.drop_table('draft_assignments')
+    op.drop_table('draft_schedules')
@@ -0,0 +1,53 @@
+"""Rotations, repeating patterns of shifts over a cycle of weeks.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 21:03:31.290584
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rotations',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('cycle_weeks', sa.Integer(), nullable=False),
+    sa.Column('starts_on', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('rotation_entries',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('rotation_id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('shift_slot_id', sa.Uuid(), nullable=False),
+    sa.Column('week', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['rotation_id'], ['rotations.id'], ),
+    sa.ForeignKeyConstraint(['shift_slot_id'], ['shift_slots.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rotation_entries_rotation_id'), 'rotation_entries', ['rotation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rotation_entries_rotation_id'), table_name='rotation_entries')
+    op.drop_table('rotation_entries')
+    op.drop_table('rotations')
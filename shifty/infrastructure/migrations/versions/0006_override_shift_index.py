@@ -0,0 +1,29 @@
+"""Index of the overrides of a shift on a date, looked up when an override is taken.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 21:03:57.604419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_overrides_shift_id_date', 'overrides', ['shift_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_overrides_shift_id_date', table_name='overrides')
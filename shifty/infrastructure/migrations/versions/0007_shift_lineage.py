@@ -0,0 +1,36 @@
+"""Lineage of the shift fragments: their root shift and the path of ids down to them.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 21:04:22.980153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('shifts', sa.Column('root_shift_id', sa.Uuid(), nullable=True))
+    op.add_column('shifts', sa.Column('lineage_path', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_shifts_root_shift_id'), 'shifts', ['root_shift_id'], unique=False)
+    op.create_index('ix_shifts_lineage_path', 'shifts', ['lineage_path'], unique=False, postgresql_ops={'lineage_path': 'text_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_shifts_lineage_path', table_name='shifts')
+    op.drop_index(op.f('ix_shifts_root_shift_id'), table_name='shifts')
+    with op.batch_alter_table('shifts') as batch_op:
+        batch_op.drop_column('lineage_path')
+        batch_op.drop_column('root_shift_id')
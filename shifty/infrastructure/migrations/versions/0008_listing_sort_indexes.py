@@ -0,0 +1,33 @@
+"""Indexes of the sort key (date, start_time, id) of the paginated listings.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 21:04:49.331760
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_availabilities_date_start_time_id', 'availabilities', ['date', 'start_time', 'id'], unique=False)
+    op.create_index('ix_shifts_date_start_time_id', 'shifts', ['date', 'start_time', 'id'], unique=False)
+    op.create_index('ix_overrides_date_start_time_id', 'overrides', ['date', 'start_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_overrides_date_start_time_id', table_name='overrides')
+    op.drop_index('ix_shifts_date_start_time_id', table_name='shifts')
+    op.drop_index('ix_availabilities_date_start_time_id', table_name='availabilities')
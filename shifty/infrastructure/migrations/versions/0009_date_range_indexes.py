@@ -0,0 +1,35 @@
+"""Indexes of the date range listings of an organization or a user.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 21:05:14.862047
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_availabilities_organization_id_date', 'availabilities', ['organization_id', 'date'], unique=False)
+    op.create_index('ix_availabilities_user_id_date', 'availabilities', ['user_id', 'date'], unique=False)
+    op.create_index('ix_shifts_organization_id_date', 'shifts', ['organization_id', 'date'], unique=False)
+    op.create_index('ix_shifts_user_id_date', 'shifts', ['user_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_shifts_user_id_date', table_name='shifts')
+    op.drop_index('ix_shifts_organization_id_date', table_name='shifts')
+    op.drop_index('ix_availabilities_user_id_date', table_name='availabilities')
+    op.drop_index('ix_availabilities_organization_id_date', table_name='availabilities')
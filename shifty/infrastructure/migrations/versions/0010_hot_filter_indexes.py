@@ -0,0 +1,43 @@
+"""Indexes of the hot filters not served by the earlier revisions.
+
+Lookups of users by email (login, registration) and by role (solvers), and the
+open overrides, in listing order. The other hot filters already have an index
+with them as leading columns: shifts(user_id, date), shifts(organization_id, date),
+availabilities(user_id, date), availabilities(date) by ix_availabilities_date_start_time_id
+and overrides(shift_id) by ix_overrides_shift_id_date (see test_migrations).
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 21:05:40.517392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_overrides_open', 'overrides', ['date', 'start_time', 'id'], unique=False,
+        postgresql_where=sa.text('is_taken = false'),
+        sqlite_where=sa.text('is_taken = 0')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=False)
+    op.create_index('ix_users_role', 'users', ['role'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_role', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_overrides_open', table_name='overrides')
@@ -0,0 +1,62 @@
+"""Backfills the lineage of the fragments split before it was maintained.
+
+Their root_shift_id and lineage_path are NULL, so the descendant lookups, which
+filter on them, missed them. They are derived from the parent_shift_id chains,
+walked down from the original shifts, as the splitter sets them: the id of the
+original shift, and the ids from it down to the fragment ("root/child/.../id/").
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 22:41:07.239518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def uuid_text(column: str) -> str:
+    """The canonical (hyphenated) text of a UUID column, as in the lineage paths."""
+    if op.get_bind().dialect.name == "postgresql":
+        return f"CAST({column} AS TEXT)"
+    # Stored as 32 hex digits where UUIDs are not native
+    return " || '-' || ".join(
+        f"lower(substr({column}, {start}, {length}))"
+        for start, length in ((1, 8), (9, 4), (13, 4), (17, 4), (21, 12))
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text(f"""
+        WITH RECURSIVE lineage (id, root_shift_id, lineage_path) AS (
+            SELECT id, id, {uuid_text("id")} || '/'
+            FROM shifts
+            WHERE parent_shift_id IS NULL
+            UNION ALL
+            SELECT shifts.id, lineage.root_shift_id, lineage.lineage_path || {uuid_text("shifts.id")} || '/'
+            FROM shifts
+            JOIN lineage ON shifts.parent_shift_id = lineage.id
+        )
+        UPDATE shifts
+        SET root_shift_id = lineage.root_shift_id, lineage_path = lineage.lineage_path
+        FROM lineage
+        WHERE shifts.id = lineage.id
+          AND shifts.parent_shift_id IS NOT NULL
+          AND shifts.lineage_path IS NULL
+    """))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The backfilled lineage is what the splitter would have set: it is kept
+    pass
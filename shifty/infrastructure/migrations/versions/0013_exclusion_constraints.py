@@ -0,0 +1,105 @@
+"""Exclusion constraints against overlapping shifts, availabilities and overrides.
+
+Each table gets its time range as a generated column, and an EXCLUDE constraint on
+it: a user cannot hold two overlapping shifts (canceled ones do not count) nor
+declare two overlapping availabilities, and a shift cannot have two overlapping
+overrides. Rows whose end is not after their start get a NULL range, which the
+constraints ignore.
+
+They used to be added by a script at startup, so a database may already have
+them: those are kept. The rows already stored are checked first; the migration
+fails, listing them, when some overlap, as the constraint could not be added.
+
+Range types and exclusion constraints are Postgres features: on other databases
+(the SQLite of the tests) nothing is created and the repositories only get their
+overlap errors from Postgres.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 23:48:12.406127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, Sequence[str], None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Overlapping rows listed in the error, the others are only counted
+MAX_REPORTED_OVERLAPS = 20
+
+# (constraint, table, column rows must not share while overlapping, rows that count)
+CONSTRAINTS = [
+    ('shifts_no_overlap', 'shifts', 'user_id', "status <> 'CANCELED'"),
+    ('availabilities_no_overlap', 'availabilities', 'user_id', None),
+    ('overrides_no_overlap', 'overrides', 'shift_id', None),
+]
+
+
+class OverlappingRowsError(Exception):
+    """Rows already stored would violate an exclusion constraint being added."""
+
+
+def constraint_exists(name: str) -> bool:
+    return op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_catalog.pg_constraint WHERE conname = :name"), {"name": name}
+    ).first() is not None
+
+
+def check_no_overlaps(name: str, table: str, key: str, where: Union[str, None]) -> None:
+    """
+    Raises OverlappingRowsError listing the pairs of rows the constraint would reject.
+    """
+    counted = f"AND a.{where} AND b.{where}" if where else ""
+    overlaps = op.get_bind().execute(sa.text(f"""
+        SELECT a.id, b.id, a.{key}, a.date, COUNT(*) OVER ()
+        FROM {table} a
+        JOIN {table} b ON b.{key} = a.{key} AND a.id < b.id AND a.time_range && b.time_range
+        WHERE TRUE {counted}
+        ORDER BY a.date, a.{key}
+        LIMIT {MAX_REPORTED_OVERLAPS}
+    """)).all()
+    if overlaps:
+        pairs = "\n".join(f"  {table} {a} and {b} ({key} {k}, {day})" for a, b, k, day, _ in overlaps)
+        raise OverlappingRowsError(
+            f"Cannot add {name}: {overlaps[0][-1]} pairs of {table} overlap, resolve them and "
+            f"migrate again. The first ones:\n{pairs}"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # btree_gist provides the gist operator classes for equality on uuid columns
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for name, table, key, where in CONSTRAINTS:
+        op.execute(f"""
+            ALTER TABLE {table} ADD COLUMN IF NOT EXISTS time_range tsrange
+                GENERATED ALWAYS AS (
+                    CASE WHEN end_time > start_time THEN tsrange(date + start_time, date + end_time, '[)') END
+                ) STORED
+        """)
+        if constraint_exists(name):
+            continue
+        check_no_overlaps(name, table, key, where)
+        op.execute(f"""
+            ALTER TABLE {table} ADD CONSTRAINT {name}
+            EXCLUDE USING gist ({key} WITH =, time_range WITH &&){f' WHERE ({where})' if where else ''}
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, _, _ in reversed(CONSTRAINTS):
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS time_range")
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Set
+from uuid import UUID
+from sqlalchemy import Engine
+from shifty.application.dto.override_dto import OverrideEvent
+
+logger = logging.getLogger(__name__)
+
+# Channel the override repository notifies on, in the transaction of each change
+OVERRIDE_EVENTS_CHANNEL = "override_events"
+
+# Events buffered for a client before new ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+# Delay before listening again after the connection was lost
+RECONNECT_DELAY_SECONDS = 5
+
+
+def connect_listener(engine: Engine):
+    """
+    Opens a dedicated psycopg2 connection, outside of the pool, and listens on the
+    override events channel.
+    """
+    import psycopg2
+    connection = psycopg2.connect(
+        **engine.url.translate_connect_args(username="user", database="dbname")
+    )
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {OVERRIDE_EVENTS_CHANNEL}")
+    return connection
+
+
+class OverrideEventBroker:
+    """
+    Fans the override events out to the clients connected to the process.
+
+    A single connection per process listens on the channel. It is opened in the
+    default executor, as connecting blocks, then watched by the event loop (no
+    polling) and every notification is put in the queue of each client of its
+    organization. Slow clients lose events instead of slowing the others down.
+    """
+
+    def __init__(self, connect: Callable[[], object]):
+        self.connect = connect
+        self.subscribers: Dict[UUID, Set[asyncio.Queue]] = defaultdict(set)
+        self.connection = None
+        # Opening of the connection, while it runs in the executor
+        self.connecting: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, organization_id: UUID) -> asyncio.Queue:
+        """
+        Registers a client; the listener is started with the first one.
+        Must be called from the event loop.
+        :param organization_id: Organization whose events the client receives.
+        :return: The queue the client reads its events from.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers[organization_id].add(queue)
+        if self.connection is None and self.connecting is None:
+            self.loop = asyncio.get_running_loop()
+            self.connecting = self.loop.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, organization_id: UUID, queue: asyncio.Queue) -> None:
+        """
+        Unregisters a client.
+        :param organization_id: Organization the client subscribed to.
+        :param queue: The queue returned by subscribe.
+        """
+        queues = self.subscribers.get(organization_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[organization_id]
+
+    def publish(self, event: OverrideEvent) -> None:
+        """
+        Puts an event in the queue of every client of its organization.
+        :param event: The event to deliver.
+        """
+        for queue in self.subscribers.get(event.organization_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropped override event {event.event} for a slow client")
+
+    def close(self) -> None:
+        """
+        Stops listening and closes the connection.
+        """
+        if self.connection is not None:
+            if self.loop is not None and not self.loop.is_closed():
+                self.loop.remove_reader(self.connection.fileno())
+            self.connection.close()
+            self.connection = None
+
+    async def _listen(self) -> None:
+        try:
+            connection = await self.loop.run_in_executor(None, self.connect)
+        except Exception as e:
+            logger.error(f"Cannot listen for override events: {e}")
+            self.loop.call_later(RECONNECT_DELAY_SECONDS, self._reconnect)
+            return
+        finally:
+            self.connecting = None
+        if not self.subscribers:
+            # Every client left while connecting
+            connection.close()
+            return
+        self.connection = connection
+        self.loop.add_reader(connection.fileno(), self._on_readable)
+
+    def _reconnect(self) -> None:
+        if self.connection is None and self.connecting is None and self.subscribers:
+            self.connecting = self.loop.create_task(self._listen())
+
+    def _on_readable(self) -> None:
+        try:
+            self.connection.poll()
+        except Exception as e:
+            logger.error(f"Override events listener lost its connection: {e}")
+            self.close()
+            self.loop.call_later(RECONNECT_DELAY_SECONDS, self._reconnect)
+            return
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            try:
+                self.publish(OverrideEvent.model_validate_json(notify.payload))
+            except ValueError as e:
+                logger.error(f"Invalid override event payload: {e}")
+
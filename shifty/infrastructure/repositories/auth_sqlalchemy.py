@@ -11,8 +11,7 @@ class AuthRepository:
 
     def add(self, auth: Auth) -> Auth:
         self.session.add(auth)
-        self.session.commit()
-        self.session.refresh(auth)
+        self.session.flush()
         return auth
 
     def set_validity(self, username: str, is_valid: bool):
@@ -20,12 +19,10 @@ class AuthRepository:
         if auth:
             auth.is_valid = is_valid
             self.session.add(auth)
-            self.session.commit()
-            self.session.refresh(auth)
+            self.session.flush()
         return auth
 
     def update(self, auth: Auth) -> Auth:
         self.session.add(auth)
-        self.session.commit()
-        self.session.refresh(auth)
+        self.session.flush()
         return auth
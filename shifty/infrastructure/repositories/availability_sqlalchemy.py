@@ -1,13 +1,69 @@
+import csv
+import io
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Set, Tuple
 from uuid import UUID
-from shifty.application.dto.availability_dto import AvailabilityUpdate
-from shifty.domain.repositories import AvailabilityRepositoryInterface
-from shifty.domain.entities import Availability #, AvailabilitySlot
-from sqlmodel import Session, select  # Assuming SQLModel is used for ORM
+from shifty.application.dto.availability_dto import AvailabilityFilter, AvailabilityFull, AvailabilityUpdate
+from shifty.application.dto.dto import Page
+from shifty.domain.repositories import AvailabilityRepositoryInterface, Loading
+from shifty.domain.entities import Availability, AvailabilityOccurrence, RecurringAvailability #, AvailabilitySlot
+from shifty.domain.exceptions import InvalidAvailabilityException
+from shifty.infrastructure.constraints import AVAILABILITIES_NO_OVERLAP, violated_exclusion_constraint
+from shifty.infrastructure.repositories.loading import load_options
+from shifty.infrastructure.repositories.pagination import paginate
+from shifty.infrastructure.repositories.projections import columns_of, project, with_users
+from sqlalchemy import Column, ColumnElement, Connection, MetaData, Table, delete, exists, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.util.concurrency import await_only
+from sqlmodel import Session, col, select  # Assuming SQLModel is used for ORM
+
+# Sort key of the paginated listing
+DATED_PAGE_KEYS = ("date", "start_time", "id")
+
+# Session-local staging table for imports, with the same columns as availabilities
+availability_import_staging = Table(
+    "availability_import_staging",
+    MetaData(),
+    *[Column(column.name, column.type) for column in Availability.__table__.columns],  # type: ignore
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS"
+)
+
+def availability_filters(filters: AvailabilityFilter) -> List[ColumnElement[bool]]:
+    """
+    WHERE clauses of an availability filter, to be combined with any query on
+    availabilities. Date ranges of a user or an organization are served by the
+    (user_id, date) and (organization_id, date) indexes.
+    """
+    clauses = []
+    if filters.date_from is not None:
+        clauses.append(col(Availability.date) >= filters.date_from)
+    if filters.date_to is not None:
+        clauses.append(col(Availability.date) <= filters.date_to)
+    if filters.user_id is not None:
+        clauses.append(col(Availability.user_id) == filters.user_id)
+    if filters.organization_id is not None:
+        clauses.append(col(Availability.organization_id) == filters.organization_id)
+    return clauses
+
 
 class AvailabilityRepository(AvailabilityRepositoryInterface):
     def __init__(self, session: Session):
         self.session = session
 
+    @contextmanager
+    def _savepoint(self) -> Iterator[None]:
+        # The writes of the block run in a savepoint: a violated constraint only undoes
+        # them, not the unit of work of the caller (nor its row level security setting)
+        try:
+            with self.session.begin_nested():
+                yield
+        except IntegrityError as ex:
+            if violated_exclusion_constraint(ex) == AVAILABILITIES_NO_OVERLAP:
+                raise InvalidAvailabilityException("New availability overlaps with existing availabilities.") from ex
+            raise
+
     def add(self, availability: Availability) -> Availability:
         """
         Add a new Availability entity to the repository.
@@ -16,20 +72,96 @@ class AvailabilityRepository(AvailabilityRepositoryInterface):
         if not isinstance(availability, Availability):
             raise TypeError("Expected an instance of Availability.")
         
-        self.session.add(availability)
-        self.session.commit()
-        self.session.refresh(availability)
+        # The exclusion constraint replaces the read-then-insert overlap check
+        with self._savepoint():
+            self.session.add(availability)
+            self.session.flush()
         return availability
 
+    def import_many(self, availabilities: List[Availability]) -> List[UUID]:
+        staging = availability_import_staging
+        conn = self.session.connection()
+        staging.create(conn, checkfirst=True)
+        conn.execute(delete(staging))
+        rows = [a.model_dump() for a in availabilities]
+        if conn.dialect.driver == "psycopg2":
+            self._copy_to_staging(conn, rows)
+        elif conn.dialect.driver == "asyncpg":
+            self._copy_records_to_staging(conn, rows)
+        else:
+            conn.execute(insert(staging), rows)
+
+        overlapping = exists().where(
+            Availability.user_id == staging.c.user_id,
+            Availability.date == staging.c.date,
+            Availability.start_time < staging.c.end_time,
+            Availability.end_time > staging.c.start_time
+        )
+        skipped = [row.id for row in conn.execute(select(staging.c.id).where(overlapping))]
+        columns = [column.name for column in staging.columns]
+        # A concurrent write may make a staged row overlap
+        with self._savepoint():
+            conn.execute(
+                insert(Availability).from_select(columns, select(*staging.columns).where(~overlapping))  # type: ignore
+            )
+        return skipped
+
+    def _copy_to_staging(self, conn: Connection, rows: List[dict]) -> None:
+        """
+        Load rows into the staging table with COPY, in the session's transaction.
+        """
+        columns = [column.name for column in availability_import_staging.columns]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # None is written as an unquoted empty field, which COPY reads as NULL
+            writer.writerow(row[column] for column in columns)
+        buffer.seek(0)
+        cursor = conn.connection.dbapi_connection.cursor()  # type: ignore
+        try:
+            cursor.copy_expert(
+                f"COPY {availability_import_staging.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def _copy_records_to_staging(self, conn: Connection, rows: List[dict]) -> None:
+        """
+        Load rows into the staging table with asyncpg's COPY, in the session's
+        transaction. Runs in the greenlet of AsyncSession.run_sync.
+        """
+        columns = [column.name for column in availability_import_staging.columns]
+        driver_connection = conn.connection.dbapi_connection.driver_connection  # type: ignore
+        await_only(driver_connection.copy_records_to_table(
+            availability_import_staging.name,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns
+        ))
+
     def save(self, availability):
         self.session.add(availability)
-        self.session.commit()
+        self.session.flush()
 
-    def get_all(self) -> list[Availability]:
-        stmt = select(Availability)
+    def get_all(self, loading: Loading = Loading.SELECTIN) -> list[Availability]:
+        stmt = select(Availability).options(*load_options(loading, Availability.user))
         availabilities = list(self.session.exec(stmt).all())
         return availabilities
 
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[AvailabilityFilter] = None,
+        loading: Loading = Loading.SELECTIN
+    ) -> Page[Availability]:
+        qry = (
+            select(Availability)
+            .where(*availability_filters(filters or AvailabilityFilter()))
+            .options(*load_options(loading, Availability.user))
+        )
+        return paginate(self.session, qry, Availability, DATED_PAGE_KEYS, limit, cursor)
+
     # def get_availability_on_day(self, user_id, date) -> list[AvailabilitySlot]:
     #     models = self.session.query(Availability).filter(
     #         Availability.user_id == user_id,
@@ -41,43 +173,133 @@ class AvailabilityRepository(AvailabilityRepositoryInterface):
         availability = self.session.get(Availability, availability_id)
         if availability:
             self.session.delete(availability)
-            self.session.commit()
+            self.session.flush()
         else:
             raise ValueError(f"Availability with id {availability_id} does not exist.")
     
     def update(self, id: UUID, availability: AvailabilityUpdate) -> Availability:
-        #existing_availability = self.session.get(Availability, id)
-        select1 = select(Availability).where(Availability.id == id)
-        existing_availability = self.session.exec(select1).first()
+        # A single UPDATE ... RETURNING, instead of a read, a write and a refresh;
+        # the user is loaded with it, AvailabilityFull embeds it
+        qry = (
+            update(Availability)
+            .where(Availability.id == id)
+            .values(note=availability.note)
+            .returning(Availability)
+            .options(*load_options(Loading.SELECTIN, Availability.user))
+            .execution_options(populate_existing=True)
+        )
+        existing_availability = self.session.exec(qry).scalar_one_or_none()  # type: ignore
 
         if not existing_availability:
             raise ValueError(f"Availability with id {id} does not exist.")
-        
-        #availability_data = availability.model_dump(exclude_unset=True)
-        #existing_availability.sqlmodel_update(availability_data)
-        existing_availability.note = availability.note
-        
-        self.session.add(existing_availability)
-        self.session.commit()
-        self.session.refresh(existing_availability)
         return existing_availability
         
 
-    def get_by_id(self, availability_id):
-        availability = self.session.get(Availability, availability_id)
+    def get_by_id(self, availability_id, loading: Loading = Loading.JOINED):
+        availability = self.session.get(
+            Availability, availability_id, options=load_options(loading, Availability.user)
+        )
         if availability is None:
             raise ValueError(f"Availability with id {availability_id} does not exist.")
         return availability
 
-    def get_by_user_id(self, user_id):
-        qry = select(Availability).where(Availability.user_id == user_id)
+    def get_by_user_id(self, user_id, loading: Loading = Loading.SELECTIN):
+        qry = select(Availability).where(Availability.user_id == user_id).options(
+            *load_options(loading, Availability.user))
         return list(self.session.exec(qry).all())
     
-    def get_by_user_id_and_date(self, user_id, date):
+    def get_by_user_id_and_date(self, user_id, date, loading: Loading = Loading.SELECTIN):
         qry = select(Availability).where(
-            Availability.user_id == user_id).where(Availability.date == date)
-        return list(self.session.exec(qry).all())
+            Availability.user_id == user_id).where(Availability.date == date).options(
+            *load_options(loading, Availability.user))
+        one_offs = list(self.session.exec(qry).all())
+        return self._with_recurring(one_offs, [date], user_id)
     
-    def get_by_date(self, date):
-        qry = select(Availability).where(Availability.date == date)
+    def get_by_date(self, date, loading: Loading = Loading.SELECTIN):
+        qry = select(Availability).where(Availability.date == date).options(
+            *load_options(loading, Availability.user))
+        one_offs = list(self.session.exec(qry).all())
+        return self._with_recurring(one_offs, [date])
+
+    def get_rows_by_date(self, date):
+        availabilities = Availability.__table__
+        qry = select(*columns_of(AvailabilityFull, availabilities)).where(availabilities.c.date == date)
+        one_offs = with_users(
+            self.session,
+            project(self.session, qry),
+            select(availabilities.c.user_id).where(availabilities.c.date == date)
+        )
+        covered = {(row["user_id"], row["date"]) for row in one_offs}
+        fields = set(AvailabilityFull.model_fields) - {"user"}
+        return one_offs + [
+            {**occurrence.model_dump(include=fields), "id": None, "user": None}
+            for occurrence in self._expand_recurring([date], covered)
+        ]
+
+    def get_by_date_range(self, start_date, end_date, loading: Loading = Loading.SELECTIN):
+        qry = select(Availability).where(
+            Availability.date >= start_date).where(Availability.date <= end_date).options(
+            *load_options(loading, Availability.user))
+        one_offs = list(self.session.exec(qry).all())
+        dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        return self._with_recurring(one_offs, dates)
+
+    def _with_recurring(
+        self,
+        one_offs: List[Availability],
+        dates: List[date],
+        user_id: Optional[UUID] = None
+    ) -> List[Availability | AvailabilityOccurrence]:
+        """
+        Add the recurring availabilities of the dates to the one-off ones.
+        """
+        return one_offs + self._expand_recurring(dates, {(a.user_id, a.date) for a in one_offs}, user_id)
+
+    def _expand_recurring(
+        self,
+        dates: List[date],
+        covered: Set[Tuple[UUID, date]],
+        user_id: Optional[UUID] = None
+    ) -> List[AvailabilityOccurrence]:
+        """
+        Expand the recurring availabilities of the dates. A template is not expanded
+        for a user and date that already have one-off availabilities: those replace it.
+        :param covered: (user ID, date) pairs with one-off availabilities.
+        """
+        if not dates:
+            return []
+        weekdays = {day.weekday() for day in dates}
+        qry = select(RecurringAvailability).where(
+            RecurringAvailability.valid_from <= max(dates),
+            or_(col(RecurringAvailability.valid_until).is_(None), col(RecurringAvailability.valid_until) >= min(dates))
+        )
+        if len(weekdays) < 7:
+            qry = qry.where(col(RecurringAvailability.weekday).in_(weekdays))
+        if user_id is not None:
+            qry = qry.where(RecurringAvailability.user_id == user_id)
+        templates_by_weekday: dict[int, List[RecurringAvailability]] = {}
+        for template in self.session.exec(qry).all():
+            templates_by_weekday.setdefault(template.weekday, []).append(template)
+        return [
+            template.expand(day)
+            for day in dates
+            for template in templates_by_weekday.get(day.weekday(), [])
+            if (template.user_id, day) not in covered and template.occurs_on(day)
+        ]
+
+    def add_recurring(self, recurring: RecurringAvailability) -> RecurringAvailability:
+        self.session.add(recurring)
+        self.session.flush()
+        return recurring
+
+    def get_recurring_by_user_id(self, user_id: UUID) -> List[RecurringAvailability]:
+        qry = select(RecurringAvailability).where(RecurringAvailability.user_id == user_id)
         return list(self.session.exec(qry).all())
+
+    def delete_recurring(self, recurring_id: UUID) -> RecurringAvailability:
+        recurring = self.session.get(RecurringAvailability, recurring_id)
+        if not recurring:
+            raise ValueError(f"Recurring availability with id {recurring_id} does not exist.")
+        self.session.delete(recurring)
+        self.session.flush()
+        return recurring
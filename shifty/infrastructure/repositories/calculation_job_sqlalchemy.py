@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlmodel import Session, and_, or_, select
+from shifty.domain.entities import CalculationJob, CalculationJobStatus
+from shifty.domain.repositories import CalculationJobRepositoryInterface
+
+
+class CalculationJobRepository(CalculationJobRepositoryInterface):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, job: CalculationJob) -> CalculationJob:
+        self.session.add(job)
+        self.session.flush()
+        return job
+
+    def get_by_id(self, job_id: UUID) -> Optional[CalculationJob]:
+        return self.session.get(CalculationJob, job_id)
+
+    def claim_next(self, stale_before: datetime) -> Optional[CalculationJob]:
+        # SKIP LOCKED lets several workers poll the queue without blocking on each other
+        qry = select(CalculationJob).where(or_(
+            CalculationJob.status == CalculationJobStatus.PENDING,
+            and_(
+                CalculationJob.status == CalculationJobStatus.RUNNING,
+                CalculationJob.started_at < stale_before
+            )
+        )).order_by(CalculationJob.created_at).limit(1).with_for_update(skip_locked=True)
+        job = self.session.exec(qry).first()
+        if not job:
+            return None
+        job.status = CalculationJobStatus.RUNNING
+        job.started_at = datetime.now()
+        self.session.add(job)
+        self.session.flush()
+        return job
+
+    def complete(self, job_id: UUID, result: list) -> CalculationJob:
+        return self._finish(job_id, CalculationJobStatus.DONE, result=result)
+
+    def fail(self, job_id: UUID, error: str) -> CalculationJob:
+        return self._finish(job_id, CalculationJobStatus.FAILED, error=error)
+
+    def _finish(self, job_id: UUID, status: CalculationJobStatus, **fields) -> CalculationJob:
+        job = self.session.get(CalculationJob, job_id)
+        if not job:
+            raise ValueError(f"Calculation job with id {job_id} does not exist.")
+        job.status = status
+        job.finished_at = datetime.now()
+        for field, value in fields.items():
+            setattr(job, field, value)
+        self.session.add(job)
+        self.session.flush()
+        return job
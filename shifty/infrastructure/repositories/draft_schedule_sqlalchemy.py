@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Optional
+from uuid import UUID
+from sqlmodel import Session, col, delete, select
+from shifty.domain.entities import DraftAssignment, DraftSchedule
+from shifty.domain.repositories import DraftScheduleRepositoryInterface
+
+
+class DraftScheduleRepository(DraftScheduleRepositoryInterface):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_by_organization_and_date(self, organization_id: UUID, date: date) -> Optional[DraftSchedule]:
+        return self.session.exec(select(DraftSchedule).where(
+            DraftSchedule.organization_id == organization_id, DraftSchedule.date == date
+        )).first()
+
+    def get_dates(self, organization_id: UUID, start_date: date, end_date: Optional[date] = None) -> List[date]:
+        qry = select(DraftSchedule.date).where(
+            DraftSchedule.organization_id == organization_id, DraftSchedule.date >= start_date
+        )
+        if end_date is not None:
+            qry = qry.where(DraftSchedule.date <= end_date)
+        return list(self.session.exec(qry.order_by(DraftSchedule.date)).all())
+
+    def get_assignments(self, draft_schedule_id: UUID) -> List[DraftAssignment]:
+        return list(self.session.exec(
+            select(DraftAssignment).where(DraftAssignment.draft_schedule_id == draft_schedule_id)
+        ).all())
+
+    def save(self, draft: DraftSchedule, assignments: List[DraftAssignment]) -> DraftSchedule:
+        existing = self.get_by_organization_and_date(draft.organization_id, draft.date)
+        if existing:
+            self.session.exec(delete(DraftAssignment).where(
+                col(DraftAssignment.draft_schedule_id) == existing.id
+            ))
+            existing.mode = draft.mode
+            existing.updated_at = datetime.now()
+            draft = existing
+        self.session.add(draft)
+        for assignment in assignments:
+            assignment.draft_schedule_id = draft.id
+        self.session.add_all(assignments)
+        self.session.flush()
+        return draft
+
+    def replace_assignments(
+        self,
+        draft_schedule_id: UUID,
+        shift_slot_ids: Iterable[UUID],
+        assignments: List[DraftAssignment]
+    ) -> None:
+        self.session.exec(delete(DraftAssignment).where(
+            col(DraftAssignment.draft_schedule_id) == draft_schedule_id,
+            col(DraftAssignment.shift_slot_id).in_(list(shift_slot_ids))
+        ))
+        for assignment in assignments:
+            assignment.draft_schedule_id = draft_schedule_id
+        self.session.add_all(assignments)
+        draft = self.session.get(DraftSchedule, draft_schedule_id)
+        if draft:
+            draft.updated_at = datetime.now()
+            self.session.add(draft)
+
+    @contextmanager
+    def savepoint(self) -> Iterator[None]:
+        with self.session.begin_nested():
+            yield
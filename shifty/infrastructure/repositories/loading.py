@@ -0,0 +1,17 @@
+from typing import List
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+from shifty.domain.repositories import Loading
+
+
+def load_options(loading: Loading, *relationships) -> List[LoaderOption]:
+    """
+    Loader options of a query for the relationships its rows are serialized with.
+    :param loading: How the relationships are loaded.
+    :param relationships: Relationship attributes of the selected entity, e.g. Shift.user.
+    """
+    if loading == Loading.SELECTIN:
+        return [selectinload(relationship) for relationship in relationships]
+    if loading == Loading.JOINED:
+        return [joinedload(relationship) for relationship in relationships]
+    return []
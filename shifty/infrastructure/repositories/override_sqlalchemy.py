@@ -1,42 +1,182 @@
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 from uuid import UUID
-from sqlmodel import Session, select
-from datetime import datetime
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, select
+from datetime import date, datetime, time
 
-from shifty.application.dto.override_dto import OverrideUpdate
-from shifty.domain.entities import Override
+from shifty.application.dto.dto import Page
+from shifty.application.dto.override_dto import OverrideEvent, OverrideEventType, OverrideRead, OverrideUpdate
+from shifty.domain.entities import Override, Shift, ShiftStatus
+from shifty.domain.exceptions import InvalidOverrideException, OverlappingShiftException
+from shifty.infrastructure.constraints import OVERRIDES_NO_OVERLAP, SHIFTS_NO_OVERLAP, violated_exclusion_constraint
+from shifty.domain.repositories import Loading
+from shifty.infrastructure.notifications import OVERRIDE_EVENTS_CHANNEL
+from shifty.infrastructure.repositories.loading import load_options
+from shifty.infrastructure.repositories.pagination import paginate
+from shifty.infrastructure.repositories.projections import columns_of, project
+
+# Sort key of the paginated listing
+PAGE_KEYS = ("date", "start_time", "id")
+# Order of the open overrides, the one of ix_overrides_open
+OPEN_ORDER = (col(Override.date), col(Override.start_time), col(Override.id))
 
 class OverrideRepository:
     def __init__(self, session: Session):
         self.session = session
 
+    @contextmanager
+    def _savepoint(self) -> Iterator[None]:
+        # The writes of the block run in a savepoint: a violated constraint only undoes
+        # them, not the unit of work of the caller (nor its row level security setting)
+        try:
+            with self.session.begin_nested():
+                yield
+        except IntegrityError as ex:
+            constraint = violated_exclusion_constraint(ex)
+            if constraint == OVERRIDES_NO_OVERLAP:
+                raise InvalidOverrideException("Cannot create overlapping override for the same shift.") from ex
+            if constraint == SHIFTS_NO_OVERLAP:
+                raise OverlappingShiftException("Cannot create overlapping shift for the same owner.") from ex
+            raise
+
+    def _notify(self, event: OverrideEventType, override: Override) -> None:
+        """
+        Queue an override event for the listeners. The notification is part of the
+        transaction, so it is only delivered if the change is committed.
+        """
+        if self.session.get_bind().dialect.name != "postgresql":
+            return
+        payload = OverrideEvent.from_override(event, override).model_dump_json()
+        self.session.exec(select(func.pg_notify(OVERRIDE_EVENTS_CHANNEL, payload)))
+
     def add(self, override: Override) -> Override:
-        self.session.add(override)
-        self.session.commit()
-        self.session.refresh(override)
+        with self._savepoint():
+            self.session.add(override)
+            self.session.flush()
+        self._notify(OverrideEventType.CREATED, override)
         return override
 
-    def get_all(self) -> List[Override]:
-        return list(self.session.exec(select(Override)).all())
+    def get_all(self, loading: Loading = Loading.LAZY) -> List[Override]:
+        return list(self.session.exec(select(Override).options(*load_options(loading, Override.taken_by))).all())
+
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        loading: Loading = Loading.LAZY
+    ) -> Page[Override]:
+        """
+        Get one page of overrides, sorted by date, start time and ID.
+        :param limit: Maximum number of overrides of the page.
+        :param cursor: The next_cursor of the previous page, None for the first page.
+        :param loading: How the user who took each override is loaded (OverrideRead does not embed it).
+        :raises InvalidCursorException: If the cursor is malformed.
+        """
+        qry = select(Override).options(*load_options(loading, Override.taken_by))
+        return paginate(self.session, qry, Override, PAGE_KEYS, limit, cursor)
+
+    def get_by_id(self, override_id: UUID, loading: Loading = Loading.LAZY) -> Optional[Override]:
+        return self.session.get(Override, override_id, options=load_options(loading, Override.taken_by))
+
+    def get_by_shift_and_date(self, shift_id: UUID, date: date) -> List[Override]:
+        """
+        Get the overrides of a shift on a date (served by ix_overrides_shift_id_date).
+        :param shift_id: UUID of the shift.
+        :param date: Date of the overrides.
+        """
+        return list(self.session.exec(
+            select(Override).where(Override.shift_id == shift_id, Override.date == date)
+        ).all())
+
+    def exists_overlapping(self, shift_id: UUID, start_time: time, end_time: time) -> bool:
+        """
+        Check whether the shift has an override overlapping [start_time, end_time).
+        The overlap predicate runs in the database, so this is a single index probe.
+        :param shift_id: UUID of the shift.
+        :param start_time: Start of the range to check.
+        :param end_time: End of the range to check.
+        """
+        qry = select(Override.id).where(
+            Override.shift_id == shift_id,
+            Override.start_time < end_time,
+            Override.end_time > start_time
+        ).limit(1)
+        return self.session.exec(qry).first() is not None
 
-    def get_by_id(self, override_id: UUID) -> Optional[Override]:
-        return self.session.get(Override, override_id)
+    def get_open(self, loading: Loading = Loading.LAZY) -> List[Override]:
+        return list(self.session.exec(
+            select(Override)
+            .where(Override.is_taken == False)
+            .order_by(*OPEN_ORDER)
+            .options(*load_options(loading, Override.taken_by))
+        ).all())
 
-    def get_open(self) -> List[Override]:
-        return list(self.session.exec(select(Override).where(Override.is_taken == False)).all())
+    def get_open_rows(self) -> List[dict]:
+        """
+        Get the open overrides as plain rows shaped like OverrideRead, read with a
+        column projection instead of loading Override entities.
+        """
+        overrides = Override.__table__
+        qry = (
+            select(*columns_of(OverrideRead, overrides, renamed={"requester_id": "user_id"}))  # type: ignore
+            .where(overrides.c.is_taken == False)
+            .order_by(*OPEN_ORDER)
+        )
+        return project(self.session, qry)
     
 
 
-    def take(self, override_id: UUID, taken_by_id: UUID) -> Override:
-        override = self.session.get(Override, override_id)
-        if not override or override.is_taken:
-            raise ValueError("Override not available")
-        override.taken_by_id = taken_by_id
-        override.taken_at = datetime.now()
-        override.is_taken = True
-        self.session.add(override)
-        self.session.commit()
-        self.session.refresh(override)
+    def take(
+        self,
+        override_id: UUID,
+        taken_by_id: Optional[UUID],
+        start_time: time,
+        end_time: time,
+        parent_shift_id: UUID,
+        segments: List[Shift]
+    ) -> Override:
+        """
+        Take an override in the transaction of the unit of work: mark it as taken,
+        cancel the parent shift and insert the segments the shift was split into.
+        The override is claimed with a conditional UPDATE ... RETURNING, so when several
+        users take it at the same time exactly one of them wins; the others wait on the
+        row lock and then match no row. Nothing is written unless every step succeeds:
+        the steps run in a savepoint, which a failure rolls back.
+        :param override_id: UUID of the override to take.
+        :param taken_by_id: UUID of the user taking the override, None when several users share it.
+        :param start_time: Start of the claimed range(s).
+        :param end_time: End of the claimed range(s).
+        :param parent_shift_id: UUID of the shift the override belongs to.
+        :param segments: Shifts replacing the parent shift.
+        :return: The taken Override instance.
+        :raises ValueError: If the override does not exist or is already taken.
+        :raises OverlappingShiftException: If a segment overlaps a shift of its owner.
+        """
+        with self._savepoint():
+            override = self.session.exec(
+                update(Override)
+                .where(Override.id == override_id, Override.is_taken == False)
+                .values(
+                    is_taken=True,
+                    taken_by_id=taken_by_id,
+                    taken_at=datetime.now(),
+                    start_time=start_time,
+                    end_time=end_time
+                )
+                .returning(Override)
+            ).scalar_one_or_none()  # type: ignore
+            if override is None:
+                raise ValueError("Override not available")
+            # Cancel the parent first: its segments overlap it and canceled shifts
+            # are the only ones the shifts_no_overlap constraint ignores
+            self.session.exec(
+                update(Shift).where(Shift.id == parent_shift_id).values(status=ShiftStatus.CANCELED)
+            )
+            if segments:
+                self.session.exec(insert(Shift).values([segment.model_dump() for segment in segments]))  # type: ignore
+        self._notify(OverrideEventType.TAKEN, override)
         return override
 
     def update(self, override_id: UUID, data: OverrideUpdate) -> Override:
@@ -51,9 +191,9 @@ class OverrideRepository:
             raise ValueError(f"Override with id {override_id} does not exist.")
 
         update_data = data.model_dump(exclude_unset=True)
-        override.sqlmodel_update(update_data)
-        self.session.add(override)
-        self.session.commit()
-        self.session.refresh(override)
+        with self._savepoint():
+            override.sqlmodel_update(update_data)
+            self.session.add(override)
+            self.session.flush()
         return override
     
\ No newline at end of file
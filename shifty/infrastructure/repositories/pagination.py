@@ -0,0 +1,72 @@
+import base64
+import json
+from typing import Optional, Sequence, Type, TypeVar
+from pydantic import TypeAdapter
+from sqlalchemy import tuple_
+from sqlmodel import Session, SQLModel
+from sqlmodel.sql.expression import SelectOfScalar
+from shifty.application.dto.dto import Page
+from shifty.domain.exceptions import InvalidCursorException
+
+M = TypeVar("M", bound=SQLModel)
+
+
+def encode_cursor(model: SQLModel, keys: Sequence[str]) -> str:
+    """
+    Opaque cursor pointing right after a row: its sort key, as url-safe base64 JSON.
+    :param model: The last row of a page.
+    :param keys: Names of the fields the rows are sorted by.
+    """
+    values = [getattr(model, key) for key in keys]
+    raw = json.dumps(TypeAdapter(list).dump_python(values, mode="json"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, entity: Type[SQLModel], keys: Sequence[str]) -> list:
+    """
+    Sort key encoded in a cursor, converted back to the types of the entity fields.
+    :param cursor: A cursor returned by encode_cursor.
+    :param entity: The entity the rows belong to.
+    :param keys: Names of the fields the rows are sorted by.
+    :raises InvalidCursorException: If the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("Wrong number of values.")
+        return [
+            TypeAdapter(entity.model_fields[key].annotation).validate_python(value)
+            for key, value in zip(keys, values)
+        ]
+    except ValueError as ex:
+        raise InvalidCursorException("Invalid cursor.") from ex
+
+
+def paginate(
+    session: Session,
+    qry: SelectOfScalar[M],
+    entity: Type[M],
+    keys: Sequence[str],
+    limit: int,
+    cursor: Optional[str] = None
+) -> Page[M]:
+    """
+    Fetches one page of a query with keyset pagination: the rows are sorted by the
+    keys (which must end with a unique column) and a page starts right after the
+    key of the previous one, so its cost does not grow with the page number.
+    :param session: The session to run the query in.
+    :param qry: Query selecting the entity, possibly filtered.
+    :param entity: The entity selected by the query.
+    :param keys: Names of the fields the rows are sorted by.
+    :param limit: Maximum number of rows of the page.
+    :param cursor: The next_cursor of the previous page, None for the first page.
+    """
+    columns = [getattr(entity, key) for key in keys]
+    if cursor is not None:
+        qry = qry.where(tuple_(*columns) > tuple_(*decode_cursor(cursor, entity, keys)))
+    # One extra row tells whether there is a next page
+    rows = list(session.exec(qry.order_by(*columns).limit(limit + 1)).all())
+    if len(rows) <= limit:
+        return Page(items=rows)
+    rows = rows[:limit]
+    return Page(items=rows, next_cursor=encode_cursor(rows[-1], keys))
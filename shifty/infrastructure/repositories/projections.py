@@ -0,0 +1,52 @@
+from typing import List, Mapping, Optional, Type
+from pydantic import BaseModel
+from sqlalchemy import Label, Table
+from sqlmodel import Session, select
+from sqlmodel.sql.expression import Select
+from shifty.domain.entities import User
+
+
+def columns_of(model: Type[BaseModel], table: Table, renamed: Optional[Mapping[str, str]] = None) -> List[Label]:
+    """
+    Columns of a table read by a response model, labeled with its field names.
+    Fields that are not columns (nested objects) are left out.
+    :param model: The response model the rows are serialized with.
+    :param table: The table the columns are read from.
+    :param renamed: Column names of the fields named differently from their column.
+    """
+    renamed = renamed or {}
+    return [
+        table.c[renamed.get(name, name)].label(name)
+        for name in model.model_fields
+        if renamed.get(name, name) in table.c
+    ]
+
+
+def project(session: Session, qry: Select) -> List[dict]:
+    """
+    Runs a projection query into plain dicts, ready for the response model: no
+    entity is built and nothing enters the identity map.
+    :param session: The session to run the query in.
+    :param qry: Query selecting labeled columns.
+    """
+    result = session.exec(qry)  # type: ignore
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def with_users(session: Session, rows: List[dict], user_ids: Select) -> List[dict]:
+    """
+    Nests the user of each row under "user", like the response models embedding
+    it. The users are read with one more query, the way selectinload does, and
+    each is built once and shared by its rows: the response model does not
+    validate it again for every row, and its columns are not sent once per row.
+    :param session: The session to run the query in.
+    :param rows: Rows with a user_id.
+    :param user_ids: Query selecting the user IDs of the rows.
+    """
+    users = User.__table__
+    qry = select(*columns_of(User, users)).where(users.c.id.in_(user_ids))  # type: ignore
+    users_by_id = {row["id"]: User.model_validate(row) for row in project(session, qry)}
+    for row in rows:
+        row["user"] = users_by_id.get(row["user_id"])
+    return rows
@@ -16,8 +16,7 @@ class RegistrationRepository(RegistrationRepositoryInterface):
 
     def add_organization(self, org: Organization) -> Organization:
         self.session.add(org)
-        self.session.commit()
-        self.session.refresh(org)
+        self.session.flush()
         return org
 
     # def add_user(self, user: User) -> User:
@@ -1,59 +1,342 @@
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
 from uuid import UUID
-from sqlmodel import Session, select
-from shifty.domain.entities import Shift, ShiftSlot
-from shifty.domain.repositories import ShiftRepositoryInterface
+from datetime import date
+from sqlalchemy import ColumnElement, bindparam, exists, func, insert, literal, text, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, col, select
+from shifty.application.dto.dto import Page
+from shifty.application.dto.shift_dto import RotationConflict, RotationMaterializeResult, ShiftCompactionResult, ShiftFilter
+from shifty.domain.entities import Override, Rotation, RotationEntry, Shift, ShiftRead, ShiftSlot, ShiftStatus
+from shifty.domain.exceptions import OverlappingShiftException
+from shifty.domain.repositories import Loading, ShiftRepositoryInterface
+from shifty.infrastructure.constraints import SHIFTS_NO_OVERLAP, violated_exclusion_constraint
+from shifty.infrastructure.repositories.loading import load_options
+from shifty.infrastructure.repositories.pagination import paginate
+from shifty.infrastructure.repositories.projections import columns_of, project, with_users
+
+# Sort keys of the paginated listings
+DATED_PAGE_KEYS = ("date", "start_time", "id")
+SHIFT_SLOT_PAGE_KEYS = ("start_time", "id")
+
+# Rows per multi-row INSERT statement (Postgres accepts at most 65535 bind parameters)
+INSERT_CHUNK_SIZE = 1000
+
+# Creates the shifts of a rotation for a window in one round trip: the dates are
+# generated by the database, the rows are inserted with INSERT ... SELECT and only
+# the counts and the conflicts are sent back. Conflicts are candidate shifts that
+# overlap a shift the user already has, found beforehand, or one written meanwhile
+# (concurrently, or by the same statement), which ON CONFLICT DO NOTHING skips
+# (shifts_no_overlap constraint): the ids of the candidates are drawn up front, so
+# that those missing from the inserted rows can be told apart.
+materialize_rotation_statement = text(
+    """
+    WITH candidates AS MATERIALIZED (
+        SELECT gen_random_uuid() AS shift_id,
+               e.user_id, r.organization_id, g.day, e.shift_slot_id, s.start_time, s.end_time, r.name,
+               EXISTS (
+                   SELECT 1 FROM shifts x
+                   WHERE x.user_id = e.user_id
+                     AND x.date = g.day
+                     AND x.status <> 'CANCELED'
+                     AND x.start_time < s.end_time
+                     AND x.end_time > s.start_time
+               ) AS conflict
+        FROM rotations r
+        JOIN rotation_entries e ON e.rotation_id = r.id
+        JOIN shift_slots s ON s.id = e.shift_slot_id
+        CROSS JOIN LATERAL (
+            SELECT generate_series(CAST(:start_date AS date), CAST(:end_date AS date), interval '1 day')::date AS day
+        ) g
+        WHERE r.id = CAST(:rotation_id AS uuid)
+          AND extract(isodow FROM g.day)::int - 1 = e.weekday
+          AND ((date_trunc('week', g.day)::date - date_trunc('week', r.starts_on)::date) / 7 % r.cycle_weeks
+               + r.cycle_weeks) % r.cycle_weeks = e.week
+    ),
+    inserted AS (
+        INSERT INTO shifts (id, user_id, origin_user_id, organization_id, date, start_time, end_time, note, status, created_at)
+        SELECT shift_id, user_id, user_id, organization_id, day, start_time, end_time,
+               'Rotation ' || name, 'TAKEN', LOCALTIMESTAMP
+        FROM candidates
+        WHERE NOT conflict
+        ON CONFLICT DO NOTHING
+        RETURNING id
+    )
+    SELECT
+        (SELECT count(*) FROM candidates) AS total,
+        (SELECT count(*) FROM inserted) AS created,
+        (SELECT coalesce(
+            json_agg(json_build_object('user_id', user_id, 'date', day, 'shift_slot_id', shift_slot_id) ORDER BY day),
+            '[]'::json
+        ) FROM candidates c
+        WHERE conflict OR NOT EXISTS (SELECT 1 FROM inserted i WHERE i.id = c.shift_id)) AS conflicts
+    """
+)
+
+
+def shift_filters(filters: ShiftFilter) -> List[ColumnElement[bool]]:
+    """
+    WHERE clauses of a shift filter, to be combined with any query on shifts.
+    Date ranges of a user or an organization are served by the (user_id, date)
+    and (organization_id, date) indexes.
+    """
+    clauses = []
+    if filters.date_from is not None:
+        clauses.append(col(Shift.date) >= filters.date_from)
+    if filters.date_to is not None:
+        clauses.append(col(Shift.date) <= filters.date_to)
+    if filters.user_id is not None:
+        clauses.append(col(Shift.user_id) == filters.user_id)
+    if filters.organization_id is not None:
+        clauses.append(col(Shift.organization_id) == filters.organization_id)
+    if filters.status is not None:
+        clauses.append(col(Shift.status) == filters.status)
+    return clauses
 
 
 class ShiftRepository(ShiftRepositoryInterface):
     def __init__(self, session: Session):
         self.session = session
 
+    @contextmanager
+    def _savepoint(self) -> Iterator[None]:
+        # The writes of the block run in a savepoint: a violated constraint only undoes
+        # them, not the unit of work of the caller (nor its row level security setting)
+        try:
+            with self.session.begin_nested():
+                yield
+        except IntegrityError as ex:
+            if violated_exclusion_constraint(ex) == SHIFTS_NO_OVERLAP:
+                raise OverlappingShiftException("Cannot create overlapping shift for the same owner.") from ex
+            raise
+
     def add(self, shift: Shift) -> Shift:
-        self.session.add(shift)
-        self.session.commit()
-        self.session.refresh(shift)
+        with self._savepoint():
+            self.session.add(shift)
+            self.session.flush()
         return shift
 
-    def get_all(self) -> List[Shift]:
-        return list(self.session.exec(select(Shift)).all())
+    def add_many(self, shifts: List[Shift]) -> List[Shift]:
+        if not shifts:
+            return []
+        rows = [shift.model_dump() for shift in shifts]
+        # Multi-row INSERTs in chunks, to stay below the bind parameter limit
+        with self._savepoint():
+            for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+                self.session.exec(insert(Shift).values(rows[i:i + INSERT_CHUNK_SIZE]))  # type: ignore
+        return shifts
+
+    def get_all(self, loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        return list(self.session.exec(select(Shift).options(*load_options(loading, Shift.user))).all())
+
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[ShiftFilter] = None,
+        loading: Loading = Loading.SELECTIN
+    ) -> Page[Shift]:
+        qry = (
+            select(Shift)
+            .where(*shift_filters(filters or ShiftFilter()))
+            .options(*load_options(loading, Shift.user))
+        )
+        return paginate(self.session, qry, Shift, DATED_PAGE_KEYS, limit, cursor)
 
-    def get_by_id(self, shift_id: UUID) -> Optional[Shift]:
-        return self.session.get(Shift, shift_id)
+    def get_by_id(self, shift_id: UUID, loading: Loading = Loading.JOINED) -> Optional[Shift]:
+        return self.session.get(Shift, shift_id, options=load_options(loading, Shift.user))
+
+    def get_many(self, shift_ids: Iterable[UUID], loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        ids = set(shift_ids)
+        if not ids:
+            return []
+        qry = select(Shift).where(col(Shift.id).in_(ids)).options(*load_options(loading, Shift.user))
+        return list(self.session.exec(qry).all())
 
     def delete(self, shift_id: UUID) -> None:
         shift = self.session.get(Shift, shift_id)
         if shift:
             self.session.delete(shift)
-            self.session.commit()
+            self.session.flush()
         else:
             raise ValueError("Shift not found")
 
-    def get_by_date(self, date) -> List[Shift]:
-        return list(self.session.exec(select(Shift).where(Shift.date == date)).all())
+    def get_by_date(self, date, loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        return list(self.session.exec(
+            select(Shift).where(Shift.date == date).options(*load_options(loading, Shift.user))
+        ).all())
+
+    def get_rows_by_date(self, date) -> List[dict]:
+        shifts = Shift.__table__
+        rows = project(self.session, select(*columns_of(ShiftRead, shifts)).where(shifts.c.date == date))
+        return with_users(self.session, rows, select(shifts.c.user_id).where(shifts.c.date == date))
+
+    def get_by_user(self, user_id, loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        return list(self.session.exec(
+            select(Shift).where(Shift.user_id == user_id).options(*load_options(loading, Shift.user))
+        ).all())
 
-    def get_by_user(self, user_id) -> List[Shift]:
-        return list(self.session.exec(select(Shift).where(Shift.user_id == user_id)).all())
+    def get_by_user_and_date(self, user_id, date, loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        return list(self.session.exec(
+            select(Shift)
+            .where(Shift.user_id == user_id, Shift.date == date)
+            .options(*load_options(loading, Shift.user))
+        ).all())
 
-    def get_by_user_and_date(self, user_id, date) -> List[Shift]:
+    def get_by_user_date_pairs(self, pairs: Iterable[Tuple[UUID, date]]) -> List[Shift]:
+        pairs = list(set(pairs))
+        if not pairs:
+            return []
         return list(self.session.exec(
-            select(Shift).where(Shift.user_id == user_id, Shift.date == date)
+            select(Shift).where(tuple_(col(Shift.user_id), col(Shift.date)).in_(pairs))
         ).all())
 
     def update(self, shift_id, data) -> Shift:
-        shift = self.session.get(Shift, shift_id)
+        if not data:
+            shift = self.get_by_id(shift_id)
+        else:
+            # A single UPDATE ... RETURNING, instead of a read, a write and a refresh;
+            # the user is loaded with it, ShiftRead embeds it
+            with self._savepoint():
+                shift = self.session.exec(
+                    update(Shift)
+                    .where(col(Shift.id) == shift_id)
+                    .values(**data)
+                    .returning(Shift)
+                    .options(*load_options(Loading.SELECTIN, Shift.user))
+                    .execution_options(populate_existing=True)
+                ).scalar_one_or_none()  # type: ignore
         if not shift:
             raise ValueError("Shift not found")
-        for field, value in data.items():
-            setattr(shift, field, value)
-        self.session.add(shift)
-        self.session.commit()
-        self.session.refresh(shift)
         return shift
 
+    def get_lineage(self, shift_id: UUID) -> List[Tuple[Shift, int]]:
+        # Walk up to the originally planned shift, then down to every fragment, in one statement
+        ancestors = select(Shift.id, Shift.parent_shift_id).where(Shift.id == shift_id).cte("ancestors", recursive=True)
+        ancestors = ancestors.union_all(
+            select(Shift.id, Shift.parent_shift_id).join(ancestors, col(Shift.id) == ancestors.c.parent_shift_id)
+        )
+        root_id = select(ancestors.c.id).where(ancestors.c.parent_shift_id.is_(None)).scalar_subquery()
+        lineage = select(Shift.id, literal(0).label("depth")).where(Shift.id == root_id).cte("lineage", recursive=True)
+        lineage = lineage.union_all(
+            select(Shift.id, lineage.c.depth + 1).join(lineage, col(Shift.parent_shift_id) == lineage.c.id)
+        )
+        qry = (
+            select(Shift, lineage.c.depth)
+            .join(lineage, col(Shift.id) == lineage.c.id)
+            .order_by(lineage.c.depth, col(Shift.start_time))
+        )
+        return [(shift, depth) for shift, depth in self.session.exec(qry).all()]
+
+    def get_active_descendants(self, shift: Shift, loading: Loading = Loading.SELECTIN) -> List[Shift]:
+        if shift.parent_shift_id is None:
+            # Every fragment of an original shift points to it through root_shift_id
+            descends = col(Shift.root_shift_id) == shift.id
+        else:
+            # Paths are made of UUIDs and slashes, so the prefix needs no escaping
+            descends = col(Shift.lineage_path).startswith(shift.lineage_prefix()) & (col(Shift.id) != shift.id)
+        return list(self.session.exec(
+            select(Shift)
+            .where(descends, col(Shift.status) != ShiftStatus.CANCELED)
+            .order_by(col(Shift.start_time))
+            .options(*load_options(loading, Shift.user))
+        ).all())
+
+    def compact_fragments(
+        self,
+        organization_id: Optional[UUID] = None,
+        date: Optional[date] = None
+    ) -> ShiftCompactionResult:
+        qry = (
+            select(Shift)
+            .where(*self._compactable())
+            .order_by(
+                col(Shift.parent_shift_id),
+                col(Shift.user_id),
+                col(Shift.date),
+                col(Shift.status),
+                col(Shift.start_time)
+            )
+            .with_for_update()
+        )
+        if organization_id is not None:
+            qry = qry.where(Shift.organization_id == organization_id)
+        if date is not None:
+            qry = qry.where(Shift.date == date)
+
+        # Runs of contiguous fragments of the same parent shift, owner, day and status
+        # collapse into their first fragment. Fragments of different parents are never
+        # merged: the absorbed ones would lose their parent_shift_id, so the lineage
+        # would no longer reach it
+        survivor_ends = {}
+        absorbed = []
+        survivor = run_key = run_end = None
+        for shift in self.session.exec(qry).all():
+            key = (shift.parent_shift_id, shift.user_id, shift.date, shift.status)
+            if survivor is not None and key == run_key and shift.start_time == run_end:
+                absorbed.append({"absorbed_id": shift.id, "survivor_id": survivor.id})
+                run_end = survivor_ends[survivor.id] = shift.end_time
+            else:
+                survivor, run_key, run_end = shift, key, shift.end_time
+        if not absorbed:
+            return ShiftCompactionResult(merged=0, reclaimed=0)
+
+        shifts = Shift.__table__
+        overrides = Override.__table__
+        with self._savepoint():
+            # Overrides follow their fragment into the survivor
+            self.session.execute(
+                overrides.update()
+                .where(overrides.c.shift_id == bindparam("absorbed_id"))
+                .values(shift_id=bindparam("survivor_id")),
+                absorbed
+            )
+            absorbed_ids = [row["absorbed_id"] for row in absorbed]
+            for i in range(0, len(absorbed_ids), INSERT_CHUNK_SIZE):
+                self.session.execute(shifts.delete().where(shifts.c.id.in_(absorbed_ids[i:i + INSERT_CHUNK_SIZE])))
+            # Survivors grow only once the rows they absorb are gone (shifts_no_overlap)
+            self.session.execute(
+                shifts.update()
+                .where(shifts.c.id == bindparam("survivor_id"))
+                .values(end_time=bindparam("new_end_time")),
+                [{"survivor_id": survivor_id, "new_end_time": end} for survivor_id, end in survivor_ends.items()]
+            )
+        return ShiftCompactionResult(merged=len(survivor_ends), reclaimed=len(absorbed))
+
+    def get_compactable_dates(self) -> List[Tuple[UUID, date]]:
+        return [tuple(row) for row in self.session.exec(
+            select(Shift.organization_id, Shift.date)
+            .where(*self._compactable())
+            .group_by(
+                col(Shift.organization_id),
+                col(Shift.date),
+                col(Shift.parent_shift_id),
+                col(Shift.user_id),
+                col(Shift.status)
+            )
+            .having(func.count() > 1)
+            .distinct()
+            .order_by(col(Shift.organization_id), col(Shift.date))
+        ).all()]
+
+    @staticmethod
+    def _compactable() -> tuple:
+        """Conditions of the fragments compaction may merge."""
+        child = aliased(Shift)
+        return (
+            col(Shift.parent_shift_id).is_not(None),
+            col(Shift.status) != ShiftStatus.CANCELED,
+            # Fragments that were split again anchor their own lineage and are left alone
+            ~exists().where(col(child.parent_shift_id) == Shift.id)
+        )
+
     def get_shift_slots(self) -> List[ShiftSlot]:
         return list(self.session.exec(select(ShiftSlot)).all())
 
+    def get_shift_slots_page(self, limit: int, cursor: Optional[str] = None) -> Page[ShiftSlot]:
+        return paginate(self.session, select(ShiftSlot), ShiftSlot, SHIFT_SLOT_PAGE_KEYS, limit, cursor)
+
     def get_shift_slots_by_organization(self, organization_id: UUID) -> List[ShiftSlot]:
         return list(self.session.exec(
             select(ShiftSlot).where(ShiftSlot.organization_id == organization_id)
@@ -61,28 +344,55 @@ class ShiftRepository(ShiftRepositoryInterface):
 
     def add_shift_slot(self, shift_slot: ShiftSlot) -> ShiftSlot:
         self.session.add(shift_slot)
-        self.session.commit()
-        self.session.refresh(shift_slot)
+        self.session.flush()
         return shift_slot
 
     def update_shift_slot(self, shift_slot_id: UUID, data: dict) -> ShiftSlot:
-        shift_slot = self.session.get(ShiftSlot, shift_slot_id)
+        if not data:
+            shift_slot = self.session.get(ShiftSlot, shift_slot_id)
+        else:
+            shift_slot = self.session.exec(
+                update(ShiftSlot).where(col(ShiftSlot.id) == shift_slot_id).values(**data).returning(ShiftSlot)
+            ).scalar_one_or_none()  # type: ignore
         if not shift_slot:
             raise ValueError("Shift slot not found")
-        for field, value in data.items():
-            setattr(shift_slot, field, value)
-        self.session.add(shift_slot)
-        self.session.commit()
-        self.session.refresh(shift_slot)
         return shift_slot
 
     def delete_shift_slot(self, shift_slot_id: UUID) -> None:
         shift_slot = self.session.get(ShiftSlot, shift_slot_id)
         if shift_slot:
             self.session.delete(shift_slot)
-            self.session.commit()
+            self.session.flush()
         else:
             raise ValueError("Shift slot not found")
 
     def get_shift_slot_by_id(self, shift_slot_id: UUID) -> Optional[ShiftSlot]:
         return self.session.get(ShiftSlot, shift_slot_id)
+
+    def add_rotation(self, rotation: Rotation, entries: List[RotationEntry]) -> Rotation:
+        self.session.add(rotation)
+        for entry in entries:
+            entry.rotation_id = rotation.id
+            self.session.add(entry)
+        self.session.flush()
+        return rotation
+
+    def get_rotation_by_id(self, rotation_id: UUID) -> Optional[Rotation]:
+        return self.session.get(Rotation, rotation_id)
+
+    def get_rotation_entries(self, rotation_id: UUID) -> List[RotationEntry]:
+        return list(self.session.exec(
+            select(RotationEntry).where(RotationEntry.rotation_id == rotation_id)
+        ).all())
+
+    def materialize_rotation(self, rotation_id: UUID, start_date: date, end_date: date) -> RotationMaterializeResult:
+        row = self.session.connection().execute(materialize_rotation_statement, {
+            "rotation_id": str(rotation_id),
+            "start_date": start_date,
+            "end_date": end_date
+        }).one()
+        return RotationMaterializeResult(
+            created=row.created,
+            skipped=row.total - row.created,
+            conflicts=[RotationConflict(**conflict) for conflict in row.conflicts]
+        )
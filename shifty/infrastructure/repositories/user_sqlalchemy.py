@@ -1,8 +1,13 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
+from shifty.application.dto.dto import Page
 from shifty.domain.entities import User
 from shifty.domain.repositories import UserRepositoryInterface
+from shifty.infrastructure.repositories.pagination import paginate
+
+# Sort key of the paginated listing
+PAGE_KEYS = ("full_name", "id")
 
 class UserRepository(UserRepositoryInterface):
     def __init__(self, session: Session):
@@ -11,20 +16,28 @@ class UserRepository(UserRepositoryInterface):
     def get_by_id(self, user_id: UUID) -> Optional[User]:
         return self.session.get(User, user_id)
 
+    def get_many(self, user_ids: Iterable[UUID]) -> List[User]:
+        ids = set(user_ids)
+        if not ids:
+            return []
+        return list(self.session.exec(select(User).where(col(User.id).in_(ids))).all())
+
     def get_all(self) -> List[User]:
         return list(self.session.exec(select(User)).all())
 
+    def get_page(self, limit: int, cursor: Optional[str] = None) -> Page[User]:
+        return paginate(self.session, select(User), User, PAGE_KEYS, limit, cursor)
+
     def add(self, user: User) -> User:
         self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
+        self.session.flush()
         return user
 
     def delete(self, user_id: UUID) -> None:
         user = self.session.get(User, user_id)
         if user:
             self.session.delete(user)
-            self.session.commit()
+            self.session.flush()
         else:
             raise ValueError("User not found")
         
@@ -74,6 +74,80 @@ END $$;
 """
 )
 
+
+# Same rules as availabilities for the weekly templates
+recurring_availability_policies = text(
+    """
+    ALTER TABLE public.recurring_availabilities ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM pg_catalog.pg_policies
+        WHERE  policyname = 'recurring_availabilities_sel_policy')
+    THEN
+        CREATE POLICY recurring_availabilities_sel_policy ON recurring_availabilities
+        FOR SELECT
+        USING (organization_id = current_organization_id());
+    ELSE
+        RAISE NOTICE 'Policy "recurring_availabilities_sel_policy" already exists. Skipping.';
+    END IF;
+END $$;
+;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM pg_catalog.pg_policies
+        WHERE  policyname = 'recurring_availabilities_ins_policy')
+    THEN
+        CREATE POLICY recurring_availabilities_ins_policy ON recurring_availabilities
+        FOR insert
+        with check (
+            user_id = current_setting('app.current_user_id')::uuid
+            OR (organization_id = current_organization_id() and current_user_is_manager())
+        );
+    ELSE
+        RAISE NOTICE 'Policy "recurring_availabilities_ins_policy" already exists. Skipping.';
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM pg_catalog.pg_policies
+        WHERE  policyname = 'recurring_availabilities_mod_policy')
+    THEN
+        CREATE POLICY recurring_availabilities_mod_policy ON recurring_availabilities
+        FOR update
+        with check (
+            user_id = current_setting('app.current_user_id')::uuid
+            OR (organization_id = current_organization_id() and current_user_is_manager())
+        );
+    ELSE
+        RAISE NOTICE 'Policy "recurring_availabilities_mod_policy" already exists. Skipping.';
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM pg_catalog.pg_policies
+        WHERE  policyname = 'recurring_availabilities_del_policy')
+    THEN
+        CREATE POLICY recurring_availabilities_del_policy ON recurring_availabilities
+        FOR delete
+        USING (
+            user_id = current_setting('app.current_user_id')::uuid
+            OR (organization_id = current_organization_id() and current_user_is_manager())
+        );
+    ELSE
+        RAISE NOTICE 'Policy "recurring_availabilities_del_policy" already exists. Skipping.';
+    END IF;
+END $$;
+"""
+)
+
 # Policy function for filtering rows based on organization membership
 users_policy = text(
     """
@@ -330,10 +404,162 @@ overrides_security_policies = text(
     """
 )
 
+# Policy function for filtering rows based on organization membership
+calculation_jobs_policies = text(
+    """
+        ALTER TABLE public.calculation_jobs ENABLE ROW LEVEL SECURITY;
+
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'calculation_jobs_sel_policy')
+            THEN
+                CREATE POLICY calculation_jobs_sel_policy ON calculation_jobs
+                FOR SELECT
+                USING (organization_id = current_organization_id());
+            ELSE
+                RAISE NOTICE 'Policy "calculation_jobs_sel_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'calculation_jobs_ins_policy')
+            THEN
+                CREATE POLICY calculation_jobs_ins_policy ON calculation_jobs
+                FOR insert
+                with check (
+                    requested_by_id = current_setting('app.current_user_id')::uuid
+                    AND organization_id = current_organization_id()
+                );
+            ELSE
+                RAISE NOTICE 'Policy "calculation_jobs_ins_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+    """
+)
+
+# Policy function for filtering rows based on organization membership
+draft_schedules_policies = text(
+    """
+        ALTER TABLE public.draft_schedules ENABLE ROW LEVEL SECURITY;
+        ALTER TABLE public.draft_assignments ENABLE ROW LEVEL SECURITY;
+
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'draft_schedules_all_policy')
+            THEN
+                CREATE POLICY draft_schedules_all_policy ON draft_schedules
+                FOR ALL
+                USING (organization_id = current_organization_id())
+                with check (organization_id = current_organization_id());
+            ELSE
+                RAISE NOTICE 'Policy "draft_schedules_all_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'draft_assignments_all_policy')
+            THEN
+                CREATE POLICY draft_assignments_all_policy ON draft_assignments
+                FOR ALL
+                USING (draft_schedule_id IN (SELECT id FROM draft_schedules))
+                with check (draft_schedule_id IN (SELECT id FROM draft_schedules));
+            ELSE
+                RAISE NOTICE 'Policy "draft_assignments_all_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+    """
+)
+
+rotations_policies = text(
+    """
+        ALTER TABLE public.rotations ENABLE ROW LEVEL SECURITY;
+        ALTER TABLE public.rotation_entries ENABLE ROW LEVEL SECURITY;
+
+        -- Replaced by the policies below: its USING let every member of the
+        -- organization update and delete the rotations, WITH CHECK only guards new rows
+        DROP POLICY IF EXISTS rotations_all_policy ON rotations;
+        DROP POLICY IF EXISTS rotation_entries_all_policy ON rotation_entries;
+
+        -- Every member of the organization sees its rotations, only managers change them:
+        -- permissive policies add up, so SELECT passes either and the writes only the second
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'rotations_sel_policy')
+            THEN
+                CREATE POLICY rotations_sel_policy ON rotations
+                FOR SELECT
+                USING (organization_id = current_organization_id());
+            ELSE
+                RAISE NOTICE 'Policy "rotations_sel_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'rotations_mod_policy')
+            THEN
+                CREATE POLICY rotations_mod_policy ON rotations
+                FOR ALL
+                USING (organization_id = current_organization_id() and current_user_is_manager())
+                with check (organization_id = current_organization_id() and current_user_is_manager());
+            ELSE
+                RAISE NOTICE 'Policy "rotations_mod_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'rotation_entries_sel_policy')
+            THEN
+                CREATE POLICY rotation_entries_sel_policy ON rotation_entries
+                FOR SELECT
+                USING (rotation_id IN (SELECT id FROM rotations));
+            ELSE
+                RAISE NOTICE 'Policy "rotation_entries_sel_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT FROM pg_catalog.pg_policies
+                WHERE  policyname = 'rotation_entries_mod_policy')
+            THEN
+                CREATE POLICY rotation_entries_mod_policy ON rotation_entries
+                FOR ALL
+                USING (rotation_id IN (SELECT id FROM rotations) and current_user_is_manager())
+                with check (rotation_id IN (SELECT id FROM rotations) and current_user_is_manager());
+            ELSE
+                RAISE NOTICE 'Policy "rotation_entries_mod_policy" already exists. Skipping.';
+            END IF;
+        END $$;
+    """
+)
+
 all_policies = [
     availability_policies,
+    recurring_availability_policies,
     users_policy,
     shift_slots_policies,
     shift_security_policies,
-    overrides_security_policies
+    overrides_security_policies,
+    calculation_jobs_policies,
+    draft_schedules_policies,
+    rotations_policies
 ]
@@ -0,0 +1,39 @@
+from typing import Generic, TypeVar
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+S = TypeVar("S", Session, AsyncSession)
+
+
+class UnitOfWork(Generic[S]):
+    """
+    The transaction of a request, or of a step of the worker.
+
+    Repositories only add and flush their changes; the unit of work commits them
+    once, when its block ends without error, and rolls everything back otherwise.
+    Used with `with` on a Session and with `async with` on an AsyncSession.
+    """
+
+    def __init__(self, session: S):
+        """
+        :param session: Session shared by the repositories of the unit of work.
+        """
+        self.session = session
+
+    def __enter__(self) -> Session:
+        return self.session
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.session.commit()
+        else:
+            self.session.rollback()
+
+    async def __aenter__(self) -> AsyncSession:
+        return self.session
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.session.commit()
+        else:
+            await self.session.rollback()
@@ -2,7 +2,7 @@ import os
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from sqlmodel import SQLModel, text
+from sqlmodel import text
 from dotenv import load_dotenv
 from shifty.api.routers import availabilities, shifts, overrides, users, auth, registration
 
@@ -10,11 +10,14 @@ from shifty.api.routers import availabilities, shifts, overrides, users, auth, r
 load_dotenv()
 from shifty.infrastructure.db import (
     admin_engine, 
+    get_async_engine,
     create_all_functions,
     create_all_security_policies,
-    create_roles
+    create_roles,
+    run_migrations
 )
 from fastapi.middleware.cors import CORSMiddleware
+from shifty.dependencies import override_event_broker
 
 # Configure logging
 logging.basicConfig(
@@ -29,9 +32,9 @@ async def initialize_database():
     try:
         logger.info("Starting database initialization...")
         
-        # Create all tables from SQLModel metadata
-        logger.info("Creating database tables...")
-        SQLModel.metadata.create_all(admin_engine)
+        # Create or migrate the tables, their indexes and constraints
+        logger.info("Migrating database schema...")
+        run_migrations(admin_engine)
         
         # Create database functions, security policies, and roles
         logger.info("Setting up database functions, policies, and roles...")
@@ -51,8 +54,10 @@ async def cleanup_database():
     """Cleanup database connections and resources."""
     try:
         logger.info("Cleaning up database resources...")
-        # Close all connections in the engine pool
+        # Stop listening for override events and close all connections in the engine pool
+        override_event_broker.close()
         admin_engine.dispose()
+        await get_async_engine().dispose()
         logger.info("Database cleanup completed!")
     except Exception as e:
         logger.error(f"Database cleanup failed: {e}")
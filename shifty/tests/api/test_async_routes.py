@@ -0,0 +1,188 @@
+import itertools
+import threading
+from datetime import date, datetime, time, timedelta
+from uuid import uuid4
+import pytest
+from sqlmodel import delete, select
+from shifty.application.use_cases import availability_service
+from shifty.application.use_cases.solvers import GreedySolver
+from shifty.domain.entities import Availability, DraftSchedule, Organization, Override, Shift, ShiftSlot, User
+from shifty.infrastructure.repositories.availability_sqlalchemy import AvailabilityRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
+from shifty.main import app
+from shifty.security.dependencies import get_current_user_id
+
+# Far from the dates of the other tests, which share the database
+DAYS = (date(2032, 5, 3) + timedelta(days=i) for i in itertools.count())
+
+
+def seed(session, day: date, users: int = 3) -> tuple[Organization, list[User]]:
+    """An organization with a morning slot and workers available and on shift on a day."""
+    org = Organization(name=f"Org {day}", org_code=day.strftime("a%y%m%d"))
+    session.add(org)
+    session.add(ShiftSlot(organization_id=org.id, name="Morning", start_time=time(8, 0), end_time=time(12, 0)))
+    workers = []
+    for i in range(users):
+        user = User(full_name=f"worker {i}", email=f"worker{i}.{day}@example.com", role="worker", organization_id=org.id)
+        session.add(user)
+        session.add(Shift(
+            user_id=user.id,
+            origin_user_id=user.id,
+            organization_id=org.id,
+            date=day,
+            start_time=time(8, 0),
+            end_time=time(12, 0),
+            created_at=datetime.now()
+        ))
+        session.add(Availability(
+            user_id=user.id,
+            organization_id=org.id,
+            date=day,
+            start_time=time(8, 0),
+            end_time=time(12, 0),
+            created_at=datetime.now()
+        ))
+        workers.append(user)
+    # The requests read the rows from their own sessions
+    session.commit()
+    return org, workers
+
+
+@pytest.fixture
+def threads(monkeypatch):
+    """Records the threads running the solver and the queries of the workers."""
+    recorded = {}
+
+    def recording(cls, name, key):
+        method = getattr(cls, name)
+
+        def record(self, *args, **kwargs):
+            recorded[key] = threading.get_ident()
+            return method(self, *args, **kwargs)
+        monkeypatch.setattr(cls, name, record)
+
+    recording(GreedySolver, "solve", "solver")
+    recording(GreedySolver, "solve_range", "solver")
+    recording(UserRepository, "get_by_role", "session")
+    return recorded
+
+
+def test_listing_on_async_session(async_client, db_session):
+    day = next(DAYS)
+    seed(db_session, day)
+    response = async_client.get(f"/api/v1/shifts/date/{day}")
+    assert response.status_code == 200
+    shifts = response.json()
+    assert len(shifts) == 3
+    assert all(shift["user"]["id"] == shift["user_id"] for shift in shifts)
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/v1/shifts/calculate", lambda day, org: {"date": str(day), "organization_id": str(org.id)}),
+    ("/api/v1/shifts/calculate/range", lambda day, org: {
+        "start_date": str(day), "end_date": str(day), "organization_id": str(org.id)
+    }),
+])
+def test_calculation_solver_runs_off_the_event_loop(async_client, db_session, threads, path, body):
+    day = next(DAYS)
+    org, _ = seed(db_session, day)
+    response = async_client.post(path, json=body(day, org))
+    assert response.status_code == 200
+    assert response.json()
+    # The queries run in the greenlet, on the event loop thread; the solver in the threadpool
+    assert threads["solver"] != threads["session"]
+
+
+def test_availability_create_repairs_draft_off_the_event_loop(async_client, db_session, threads):
+    day = next(DAYS)
+    org, _ = seed(db_session, day, users=1)
+    newcomer = User(full_name="newcomer", email=f"newcomer.{day}@example.com", role="worker", organization_id=org.id)
+    db_session.add(newcomer)
+    db_session.add(DraftSchedule(organization_id=org.id, date=day))
+    db_session.commit()
+    response = async_client.post("/api/v1/availabilities/", json={
+        "user_id": str(newcomer.id),
+        "organization_id": str(org.id),
+        "date": str(day),
+        "start_time": "09:00:00",
+        "end_time": "11:00:00"
+    })
+    assert response.status_code == 201
+    # The availability changes the candidates of the morning slot, which is solved again
+    assert threads["solver"] != threads["session"]
+    assert async_client.get(f"/api/v1/availabilities/user/{newcomer.id}/date/{day}").json()
+
+
+def test_import_parses_off_the_event_loop(async_client, db_session, monkeypatch):
+    parser_threads, load_threads = set(), set()
+    parse_import, import_many = availability_service.parse_import, AvailabilityRepository.import_many
+
+    def recording_parse_import(lines, format):
+        for row in parse_import(lines, format):
+            parser_threads.add(threading.get_ident())
+            yield row
+
+    def recording_import_many(self, availabilities):
+        load_threads.add(threading.get_ident())
+        return import_many(self, availabilities)
+
+    monkeypatch.setattr(availability_service, "parse_import", recording_parse_import)
+    monkeypatch.setattr(AvailabilityRepository, "import_many", recording_import_many)
+
+    day = next(DAYS)
+    org, _ = seed(db_session, day, users=0)
+    user_ids = [uuid4() for _ in range(3)]
+    for user_id in user_ids:
+        db_session.add(User(id=user_id, full_name="importer", email=f"{user_id}@example.com", role="worker", organization_id=org.id))
+    db_session.commit()
+    body = b"user_id,date,start_time,end_time\n" + b"".join(
+        f"{user_id},{day},09:00,10:00\n".encode() for user_id in user_ids
+    ) + b"not,a,valid,row\n"
+    response = async_client.post(
+        f"/api/v1/availabilities/import?organization_id={org.id}",
+        content=iter([body[:10], body[10:70], body[70:]]),
+        headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["rejected"]) == (3, 1)
+    for user_id in user_ids:
+        assert len(async_client.get(f"/api/v1/availabilities/user/{user_id}/date/{day}").json()) == 1
+    # The rows are read and validated in the threadpool, loaded in the greenlet
+    assert parser_threads and load_threads and not parser_threads & load_threads
+
+
+def test_compaction_is_restricted_to_managers(async_client, db_session):
+    day = next(DAYS)
+    org, (worker,) = seed(db_session, day, users=1)
+    manager = User(full_name="manager", email=f"manager.{day}@example.com", role="manager", organization_id=org.id)
+    db_session.add(manager)
+    db_session.commit()
+    for user, status in ((worker, 403), (manager, 200)):
+        app.dependency_overrides[get_current_user_id] = lambda user=user: str(user.id)
+        response = async_client.post(f"/api/v1/shifts/compact?date={day}")
+        assert response.status_code == status
+    assert response.json() == {"merged": 0, "reclaimed": 0}
+
+
+def test_take_override_returns_the_segments_with_their_users(async_client, db_session):
+    day = next(DAYS)
+    org, (owner, taker) = seed(db_session, day, users=2)
+    shift = ShiftRepository(db_session).get_by_user_and_date(owner.id, day)[0]
+    db_session.add(Override(
+        shift_id=shift.id, user_id=owner.id, organization_id=org.id,
+        date=day, start_time=time(8, 0), end_time=time(12, 0)
+    ))
+    db_session.commit()
+    override = db_session.exec(select(Override).where(Override.shift_id == shift.id)).one()
+    # The taker's own shift would overlap the taken range
+    db_session.exec(delete(Shift).where(Shift.user_id == taker.id))
+    db_session.commit()
+    response = async_client.post(f"/api/v1/overrides/{override.id}/take", json={
+        "taken_by_id": str(taker.id), "start_time": "10:00:00", "end_time": "12:00:00"
+    })
+    assert response.status_code == 200
+    assert [(s["start_time"], s["user"]["id"]) for s in response.json()] == [
+        ("08:00:00", str(owner.id)), ("10:00:00", str(taker.id))
+    ]
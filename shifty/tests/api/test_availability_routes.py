@@ -1,10 +1,14 @@
 import pytest
 from uuid import uuid4
+from datetime import date
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from unittest.mock import Mock
+from unittest.mock import AsyncMock
 from shifty.api.routers import availabilities
-from shifty.domain.exceptions import NotExistsException
+from shifty.domain.exceptions import InvalidCursorException, NotExistsException
+from shifty.application.dto.availability_dto import AvailabilityFilter, AvailabilityImportResult
+from shifty.application.dto.dto import Page
+from shifty.infrastructure.async_services import AsyncService
 
 app = FastAPI()
 app.include_router(availabilities.router)
@@ -12,7 +16,7 @@ client = TestClient(app)
 
 @pytest.fixture
 def mock_availability_service():
-    return Mock()
+    return AsyncMock()
 
 @pytest.fixture
 def mock_get_availability_service(mock_availability_service):
@@ -43,4 +47,50 @@ def test_delete_availability_not_found(override_get_availability_service, mock_a
     response = client.delete(f"/availabilities/{test_id}")
     
     assert response.status_code == 404
-    mock_availability_service.delete.assert_called_once_with(test_id)
\ No newline at end of file
+    mock_availability_service.delete.assert_called_once_with(test_id)
+def test_import_availabilities_streams_body():
+    received = []
+
+    class FakeService:
+        def import_availabilities(self, organization_id, lines, format):
+            received.extend(lines)
+            return AvailabilityImportResult(result="success", message="ok", imported=len(received) - 1)
+
+    # Without an async session the import runs in the threadpool
+    app.dependency_overrides[availabilities.get_availability_service] = lambda: AsyncService(None, lambda session: FakeService())
+    try:
+        body = b"user_id,date,start_time,end_time\n" + b"".join(
+            f"{uuid4()},2099-01-01,09:00,10:00\n".encode() for _ in range(3)
+        )
+        response = client.post(
+            f"/availabilities/import?organization_id={uuid4()}",
+            content=iter([body[:10], body[10:50], body[50:]]),
+            headers={"content-type": "text/csv"}
+        )
+    finally:
+        app.dependency_overrides = {}
+    assert response.status_code == 200
+    assert response.json()["imported"] == 3
+    assert received[0] == "user_id,date,start_time,end_time\n"
+
+def test_list_availabilities_is_paginated():
+    service = AsyncMock()
+    service.list_page.return_value = Page(items=[], next_cursor="abc")
+    app.dependency_overrides[availabilities.get_availability_service] = lambda: service
+    try:
+        response = client.get("/availabilities/?limit=50&cursor=xyz")
+        assert response.status_code == 200
+        assert response.json() == {"items": [], "next_cursor": "abc"}
+        service.list_page.assert_called_once_with(50, "xyz", AvailabilityFilter())
+
+        user_id = uuid4()
+        client.get(f"/availabilities/?from=2025-06-16&to=2025-06-22&user_id={user_id}")
+        assert service.list_page.call_args.args[2] == AvailabilityFilter(
+            date_from=date(2025, 6, 16), date_to=date(2025, 6, 22), user_id=user_id
+        )
+
+        service.list_page.side_effect = InvalidCursorException("Invalid cursor.")
+        assert client.get("/availabilities/?cursor=bad").status_code == 400
+        assert client.get("/availabilities/?limit=0").status_code == 422
+    finally:
+        app.dependency_overrides = {}
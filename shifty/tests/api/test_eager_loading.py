@@ -0,0 +1,89 @@
+import itertools
+import pytest
+from datetime import date, datetime, time, timedelta
+from shifty.domain.entities import Availability, Organization, Shift, User
+
+# Far from the dates of the other tests, which share the database; every test
+# seeds its own days
+DAYS = (date(2031, 3, 3) + timedelta(days=i) for i in itertools.count())
+
+
+def seed(session, day: date, users: int) -> None:
+    """Shifts and availabilities of several users on a day, one of each per user."""
+    org = Organization(name=f"Org {day}", org_code=day.strftime("%y%m%d"))
+    session.add(org)
+    for i in range(users):
+        user = User(full_name=f"user {i}", email=f"user{i}.{day}@example.com", role="worker", organization_id=org.id)
+        session.add(user)
+        session.add(Shift(
+            user_id=user.id,
+            origin_user_id=user.id,
+            organization_id=org.id,
+            date=day,
+            start_time=time(8, 0),
+            end_time=time(16, 0),
+            created_at=datetime.now()
+        ))
+        session.add(Availability(
+            user_id=user.id,
+            organization_id=org.id,
+            date=day,
+            start_time=time(8, 0),
+            end_time=time(16, 0),
+            created_at=datetime.now()
+        ))
+
+
+@pytest.fixture
+def days(db_session):
+    """A day with one row of each listing and a day with five."""
+    one_row_day, many_rows_day = next(DAYS), next(DAYS)
+    seed(db_session, one_row_day, 1)
+    seed(db_session, many_rows_day, 5)
+    # The requests read the rows from their own sessions
+    db_session.commit()
+    return one_row_day, many_rows_day
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/shifts/date/{day}",
+    "/api/v1/shifts/?from={day}&to={day}",
+    "/api/v1/availabilities/date/{day}",
+    "/api/v1/availabilities/?from={day}&to={day}",
+])
+def test_listings_load_users_without_n_plus_one(client, days, assert_no_n_plus_one, url):
+    one_row_day, many_rows_day = days
+    assert_no_n_plus_one(client, url.format(day=one_row_day), url.format(day=many_rows_day))
+
+
+def test_listings_embed_users(client, days):
+    _, many_rows_day = days
+    shifts = client.get(f"/api/v1/shifts/date/{many_rows_day}").json()
+    availabilities = client.get(f"/api/v1/availabilities/date/{many_rows_day}").json()
+    assert len(shifts) == len(availabilities) == 5
+    assert all(item["user"]["id"] == item["user_id"] for item in shifts + availabilities)
+
+
+def test_updates_on_async_session_embed_users(async_client, db_session):
+    # On an AsyncSession the user can not be lazy loaded once the service call
+    # returned: the updates load it with their UPDATE ... RETURNING
+    day = next(DAYS)
+    seed(db_session, day, 1)
+    db_session.commit()
+    shift = async_client.get(f"/api/v1/shifts/date/{day}").json()[0]
+    availability = async_client.get(f"/api/v1/availabilities/date/{day}").json()[0]
+
+    response = async_client.put(f"/api/v1/shifts/{shift['id']}", json={
+        **{key: shift[key] for key in ("user_id", "origin_user_id", "organization_id", "date")},
+        "start_time": "09:00:00",
+        "end_time": "17:00:00",
+        "note": "moved"
+    })
+    assert response.status_code == 200
+    assert response.json()["start_time"] == "09:00:00"
+    assert response.json()["user"]["id"] == shift["user_id"]
+
+    response = async_client.put(f"/api/v1/availabilities/{availability['id']}", json={"date": str(day), "note": "noted"})
+    assert response.status_code == 200
+    assert response.json()["note"] == "noted"
+    assert response.json()["user"]["id"] == availability["user_id"]
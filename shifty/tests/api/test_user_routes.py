@@ -5,7 +5,7 @@ def test_list_users_and_delete(client):
     # List users
     response = client.get("/users/")
     assert response.status_code == 200
-    users = response.json()
+    users = response.json()["items"]
     assert isinstance(users, list)
     if users:
         user_id = users[0]["id"]
@@ -5,16 +5,31 @@ os.environ["DATABASE_URL"] = "sqlite:///./test.db"
 os.environ["ADMIN_DATABASE_URL"] = "sqlite:///./test.db"
 
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from shifty.main import app
 from shifty.infrastructure.db import get_session
+from shifty.infrastructure.unit_of_work import UnitOfWork
 
 # Use an in-memory SQLite database for testing
 TEST_DB_URL = "sqlite:///./test.db"
 engine = create_engine(TEST_DB_URL)
-TestSessionLocal = sessionmaker(class_=Session, autocommit=False, autoflush=False, bind=engine)
+TestSessionLocal = sessionmaker(class_=Session, autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+# Same database through aiosqlite, for the requests served on an AsyncSession as in
+# production; no pool, the connections are not shared across the test clients' loops
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "postgres: runs Postgres-only SQL, on the database of TEST_POSTGRES_URL (skipped when it is not set)"
+    )
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_database():
@@ -27,11 +42,8 @@ def setup_database():
 @pytest.fixture(autouse=True)
 def override_db_session():
     def override_get_session():
-        session = TestSessionLocal()
-        try:
+        with TestSessionLocal() as session, UnitOfWork(session):
             yield session
-        finally:
-            session.close()
     app.dependency_overrides[get_session] = override_get_session
     yield
     app.dependency_overrides = {}
@@ -39,3 +51,61 @@ def override_db_session():
 @pytest.fixture
 def client(override_db_session, setup_database):
     return TestClient(app)
+
+@pytest.fixture
+def async_client(override_db_session, setup_database):
+    """
+    Client whose requests run on an AsyncSession, like get_session in production:
+    the services are called through AsyncSession.run_sync, in a greenlet.
+    """
+    async def override_get_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session, UnitOfWork(session):
+            yield session
+    app.dependency_overrides[get_session] = override_get_session
+    return TestClient(app)
+
+@pytest.fixture
+def db_session(setup_database):
+    with TestSessionLocal() as session, UnitOfWork(session):
+        yield session
+
+@pytest.fixture
+def count_statements():
+    """
+    Records the SQL statements run on an engine (the test database by default)
+    while a block runs:
+
+        with count_statements() as statements:
+            client.get("/api/v1/shifts/date/2025-06-18")
+        assert len(statements) == 2
+    """
+    @contextmanager
+    def counting(bind: Engine = engine):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+    return counting
+
+@pytest.fixture
+def assert_no_n_plus_one(count_statements):
+    """
+    Fails when the statements of a request grow with its rows: the request is sent
+    for a listing of one row and for a listing of many, which must run as many
+    statements (an N+1 adds one SELECT per row).
+    """
+    def check(client: TestClient, one_row_url: str, many_rows_url: str) -> None:
+        with count_statements() as one:
+            assert client.get(one_row_url).status_code == 200
+        with count_statements() as many:
+            assert client.get(many_rows_url).status_code == 200
+        assert len(many) == len(one), (
+            f"{many_rows_url} ran {len(many)} statements, {one_row_url} ran {len(one)}:\n" + "\n".join(many)
+        )
+    return check
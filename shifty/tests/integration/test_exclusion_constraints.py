@@ -0,0 +1,85 @@
+import os
+import pytest
+from datetime import date, datetime, time
+from alembic import command
+from sqlalchemy import inspect
+from sqlmodel import Session, create_engine, text
+from shifty.domain.entities import Availability, Organization, User
+from shifty.infrastructure.db import migration_config, run_migrations
+
+# Admin URL of a disposable Postgres database, see test_rotation_materialization
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.postgres,
+    pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(TEST_POSTGRES_URL)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def conn(engine):
+    # Postgres DDL is transactional: the migrations of each test are rolled back
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        yield conn
+        transaction.rollback()
+
+
+def constraint_names(conn) -> set:
+    return set(conn.execute(text("SELECT conname FROM pg_catalog.pg_constraint WHERE contype = 'x'")).scalars())
+
+
+def add_availabilities(conn, *ranges):
+    with Session(bind=conn, join_transaction_mode="create_savepoint") as session:
+        org = Organization(name="Overlapping", org_code="overlap")
+        session.add(org)
+        session.flush()
+        user = User(full_name="alice", email="alice@example.com", role="worker", organization_id=org.id)
+        session.add(user)
+        session.flush()
+        session.add_all(
+            Availability(
+                user_id=user.id, organization_id=org.id, date=date(2025, 6, 18),
+                start_time=time(start), end_time=time(end), created_at=datetime.now()
+            )
+            for start, end in ranges
+        )
+        session.commit()
+
+
+def test_migrations_create_the_exclusion_constraints(conn):
+    assert constraint_names(conn) >= {"shifts_no_overlap", "availabilities_no_overlap", "overrides_no_overlap"}
+    assert "time_range" in {column["name"] for column in inspect(conn).get_columns("shifts")}
+
+
+def test_constraints_created_at_startup_are_kept(conn):
+    config = migration_config(conn)
+    command.downgrade(config, "0012")
+    assert constraint_names(conn) == set()
+    # As the startup script of the earlier versions left them
+    conn.execute(text("""
+        ALTER TABLE availabilities ADD COLUMN time_range tsrange GENERATED ALWAYS AS (
+            CASE WHEN end_time > start_time THEN tsrange(date + start_time, date + end_time, '[)') END
+        ) STORED;
+        ALTER TABLE availabilities ADD CONSTRAINT availabilities_no_overlap
+        EXCLUDE USING gist (user_id WITH =, time_range WITH &&);
+    """))
+    command.upgrade(config, "0013")
+    assert constraint_names(conn) >= {"shifts_no_overlap", "availabilities_no_overlap", "overrides_no_overlap"}
+
+
+def test_overlapping_rows_fail_the_migration(conn):
+    config = migration_config(conn)
+    command.downgrade(config, "0012")
+    add_availabilities(conn, (9, 12), (11, 13), (12, 14))
+
+    with pytest.raises(Exception, match=r"Cannot add availabilities_no_overlap: 2 pairs of availabilities overlap"):
+        command.upgrade(config, "0013")
@@ -0,0 +1,138 @@
+import random
+from uuid import uuid4
+from datetime import date, time, datetime
+
+from shifty.application.use_cases.assignment_engine import CoverageIndex, UnassignedUsers, assign_greedy, assign_greedy_range
+from shifty.domain.entities import Availability, ShiftSlot
+
+
+def naive_greedy(shift_slots, availabilities, worker_ids, rng):
+    # Reference: the original slots x availabilities scan of ShiftService.calculate_shifts
+    assigned_users = set()
+    assignments = []
+    for shift_slot in shift_slots:
+        needed = shift_slot.expected_workers
+        assigned_for_this_shift = 0
+        for a in availabilities:
+            if a.user_id in assigned_users:
+                continue
+            if a.start_time <= shift_slot.start_time and a.end_time >= shift_slot.end_time:
+                assigned_users.add(a.user_id)
+                assignments.append((shift_slot, a.user_id))
+                assigned_for_this_shift += 1
+                if assigned_for_this_shift >= needed:
+                    break
+        while assigned_for_this_shift < needed:
+            available_users = [u for u in worker_ids if u not in assigned_users]
+            if not available_users:
+                break
+            chosen_user_id = rng.choice(available_users)
+            assignments.append((shift_slot, chosen_user_id))
+            assigned_users.add(chosen_user_id)
+            assigned_for_this_shift += 1
+    return assignments
+
+
+def make_slot(start_hour, end_hour, expected_workers=1):
+    return ShiftSlot(
+        id=uuid4(),
+        organization_id=uuid4(),
+        name=f"{start_hour}-{end_hour}",
+        start_time=time(start_hour, 0),
+        end_time=time(end_hour, 0),
+        expected_workers=expected_workers,
+        created_at=datetime.now()
+    )
+
+
+def make_availability(user_id, start_hour, end_hour):
+    return Availability(
+        id=uuid4(),
+        user_id=user_id,
+        organization_id=uuid4(),
+        date=date(2025, 6, 18),
+        start_time=time(start_hour, 0),
+        end_time=time(end_hour, 0),
+        created_at=datetime.now()
+    )
+
+
+def random_day(seed, workers=40, availabilities=120):
+    rng = random.Random(seed)
+    worker_ids = [uuid4() for _ in range(workers)]
+    avails = []
+    for _ in range(availabilities):
+        start = rng.randint(0, 20)
+        avails.append(make_availability(rng.choice(worker_ids), start, rng.randint(start + 1, 23)))
+    slots = []
+    for _ in range(rng.randint(1, 8)):
+        start = rng.randint(0, 20)
+        slots.append(make_slot(start, rng.randint(start + 1, 23), rng.randint(1, 6)))
+    return slots, avails, worker_ids
+
+
+def test_assign_greedy_matches_naive_scan():
+    for seed in range(200):
+        slots, avails, worker_ids = random_day(seed)
+        expected = naive_greedy(slots, avails, worker_ids, random.Random(seed))
+        result = assign_greedy(slots, avails, worker_ids, random.Random(seed))
+        assert [(s.id, u) for s, u in result] == [(s.id, u) for s, u in expected]
+
+
+def test_assign_greedy_uses_module_random_by_default():
+    slots, avails, worker_ids = random_day(7, workers=10, availabilities=5)
+    random.seed(42)
+    expected = naive_greedy(slots, avails, worker_ids, random)
+    random.seed(42)
+    result = assign_greedy(slots, avails, worker_ids)
+    assert result == expected
+
+
+def test_coverage_index_takes_covering_users_in_list_order():
+    u1, u2, u3 = uuid4(), uuid4(), uuid4()
+    index = CoverageIndex([
+        make_availability(u1, 10, 12),
+        make_availability(u2, 6, 14),
+        make_availability(u3, 8, 12),
+    ])
+    assigned = set()
+    assert index.take(time(8, 0), time(12, 0), 5, assigned) == [u2, u3]
+    assert assigned == {u2, u3}
+    assert index.take(time(10, 0), time(12, 0), 5, assigned) == [u1]
+
+
+def test_unassigned_users_behaves_like_filtered_list():
+    users = [uuid4() for _ in range(20)]
+    view = UnassignedUsers(users)
+    removed = set(users[::3])
+    for u in removed:
+        view.discard(u)
+    expected = [u for u in users if u not in removed]
+    assert len(view) == len(expected)
+    assert [view[i] for i in range(len(view))] == expected
+
+
+def test_assign_greedy_range_runs_each_day_independently():
+    days = [date(2025, 6, 18), date(2025, 6, 19)]
+    slots, avails, worker_ids = random_day(3)
+    for i, a in enumerate(avails):
+        a.date = days[i % 2]
+    result = assign_greedy_range(slots, avails, days, worker_ids, random.Random(1))
+    rng = random.Random(1)
+    for day in days:
+        expected = assign_greedy(slots, [a for a in avails if a.date == day], worker_ids, rng)
+        assert result[day] == expected
+
+
+def test_assign_greedy_range_process_pool_is_reproducible():
+    days = [date(2025, 6, 18), date(2025, 6, 19), date(2025, 6, 20)]
+    slots, avails, worker_ids = random_day(5)
+    for i, a in enumerate(avails):
+        a.date = days[i % 3]
+    result = assign_greedy_range(slots, avails, days, worker_ids, random.Random(9), parallel=True)
+    seeds = random.Random(9)
+    for day in days:
+        expected = assign_greedy(
+            slots, [a for a in avails if a.date == day], worker_ids, random.Random(seeds.getrandbits(64))
+        )
+        assert [(s.id, u) for s, u in result[day]] == [(s.id, u) for s, u in expected]
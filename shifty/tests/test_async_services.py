@@ -0,0 +1,67 @@
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from shifty.application.use_cases.user_service import UserService
+from shifty.domain.entities import Organization, User
+from shifty.infrastructure.async_services import AsyncService, iterate_blocking
+from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
+
+
+def build_user_service(session: Session) -> UserService:
+    return UserService(UserRepository(session))
+
+
+def make_user(org, name):
+    return User(full_name=name, email=f"{name}@example.com", role="worker", organization_id=org.id)
+
+
+async def chunks(*items):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+def test_service_runs_on_async_session(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"
+
+    async def scenario():
+        engine = create_async_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        organization = Organization(name="TestOrg", org_code="123456")
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            session.add(organization)
+            await session.commit()
+            service = AsyncService(session, build_user_service)
+            saved = await service.add(make_user(organization, "alice"))
+            found = await service.get_by_id(saved.id)
+            # The body of a request is read from inside the greenlet
+            received = await service.run(lambda _: list(iterate_blocking(chunks(b"a", b"b"))))
+        await engine.dispose()
+        return saved, found, received
+
+    saved, found, received = asyncio.run(scenario())
+    assert found.full_name == "alice"
+    assert found.id == saved.id
+    assert received == [b"a", b"b"]
+
+
+def test_service_runs_on_sync_session_in_threadpool():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        organization = Organization(name="TestOrg", org_code="123456")
+        session.add(organization)
+        session.commit()
+        service = AsyncService(session, build_user_service)
+
+        async def scenario():
+            saved = await service.add(make_user(organization, "bob"))
+            received = await service.run(lambda _: list(iterate_blocking(chunks(1, 2, 3))))
+            return saved, received
+
+        saved, received = asyncio.run(scenario())
+        assert UserRepository(session).get_by_id(saved.id).full_name == "bob"
+        assert received == [1, 2, 3]
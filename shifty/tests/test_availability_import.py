@@ -0,0 +1,118 @@
+import pytest
+from unittest.mock import MagicMock
+from uuid import uuid4
+from datetime import date, time, timedelta
+
+from shifty.application.use_cases import availability_service
+from shifty.application.use_cases.availability_import import ImportFailure, ImportFormat, ImportRow, iter_lines, parse_csv, parse_ndjson
+from shifty.application.use_cases.availability_service import AvailabilityService
+
+TOMORROW = date.today() + timedelta(days=1)
+
+
+@pytest.fixture
+def mock_repository():
+    repository = MagicMock()
+    repository.import_many.return_value = []
+    return repository
+
+
+@pytest.fixture
+def service(mock_repository):
+    return AvailabilityService(mock_repository)
+
+
+def csv_lines(*rows):
+    return ["user_id,date,start_time,end_time,note\n"] + [",".join(str(v) for v in row) + "\n" for row in rows]
+
+
+def test_iter_lines_splits_chunks_at_any_byte():
+    text = "user_id,note\nà,b\r\nlast"
+    data = text.encode("utf-8")
+    # Split inside the two-byte "à" too
+    chunks = [data[i:i + 1] for i in range(len(data))]
+    assert list(iter_lines(chunks)) == ["user_id,note\n", "à,b\r\n", "last"]
+
+
+def test_parse_csv_reports_line_numbers():
+    user_id = uuid4()
+    rows = list(parse_csv(csv_lines(
+        (user_id, "2025-06-18", "09:00", "12:00", "morning"),
+        (user_id, "not a date", "09:00", "12:00", ""),
+    )))
+    assert rows[0] == ImportRow(2, user_id, date(2025, 6, 18), time(9, 0), time(12, 0), "morning")
+    assert isinstance(rows[1], ImportFailure) and rows[1].line == 3
+
+
+def test_parse_ndjson():
+    user_id = uuid4()
+    lines = [
+        f'{{"user_id": "{user_id}", "date": "2025-06-18", "start_time": "09:00", "end_time": "12:00"}}\n',
+        "\n",
+        f'{{"user_id": "{user_id}"}}\n',
+        "[1, 2]\n",
+    ]
+    rows = list(parse_ndjson(lines))
+    assert rows[0] == ImportRow(1, user_id, date(2025, 6, 18), time(9, 0), time(12, 0), None)
+    assert [(r.line, type(r)) for r in rows[1:]] == [(3, ImportFailure), (4, ImportFailure)]
+    assert "Missing column" in rows[1].message
+
+
+def test_import_format_from_content_type():
+    assert ImportFormat.from_content_type("application/x-ndjson; charset=utf-8") == ImportFormat.NDJSON
+    assert ImportFormat.from_content_type("text/csv") == ImportFormat.CSV
+    assert ImportFormat.from_content_type(None) == ImportFormat.CSV
+
+
+def test_import_validates_rows_in_memory(service, mock_repository):
+    user_id, other_id = uuid4(), uuid4()
+    result = service.import_availabilities(uuid4(), csv_lines(
+        (user_id, TOMORROW, "09:00", "12:00", ""),
+        (user_id, TOMORROW, "11:00", "13:00", ""),  # overlaps the previous row
+        (user_id, TOMORROW, "12:00", "14:00", ""),  # touches it
+        (other_id, TOMORROW, "11:00", "13:00", ""),
+        (other_id, TOMORROW, "15:00", "13:00", ""),
+        (other_id, date(2000, 1, 1), "09:00", "10:00", ""),
+    ))
+    assert (result.imported, result.rejected) == (3, 3)
+    assert [e.line for e in result.errors] == [3, 6, 7]
+    assert "overlaps" in result.errors[0].message
+    loaded = mock_repository.import_many.call_args[0][0]
+    assert [(a.user_id, a.start_time) for a in loaded] == [(user_id, time(9, 0)), (user_id, time(12, 0)), (other_id, time(11, 0))]
+
+
+def test_import_loads_in_batches(service, mock_repository):
+    user_id = uuid4()
+    rows = [(user_id, TOMORROW, f"{h:02d}:00", f"{h:02d}:30", "") for h in range(5)]
+    result = service.import_availabilities(uuid4(), csv_lines(*rows), batch_size=2)
+    assert result.imported == 5
+    assert [len(call[0][0]) for call in mock_repository.import_many.call_args_list] == [2, 2, 1]
+
+
+def test_import_reports_rows_skipped_by_repository(service, mock_repository):
+    mock_repository.import_many.side_effect = lambda availabilities: [availabilities[1].id]
+    user_id = uuid4()
+    result = service.import_availabilities(uuid4(), csv_lines(
+        (user_id, TOMORROW, "09:00", "10:00", ""),
+        (user_id, TOMORROW, "10:00", "11:00", ""),
+    ))
+    assert (result.imported, result.rejected) == (1, 1)
+    assert result.errors[0].line == 3
+
+
+def test_import_caps_reported_errors(service, monkeypatch):
+    monkeypatch.setattr(availability_service, "MAX_REPORTED_ERRORS", 2)
+    result = service.import_availabilities(uuid4(), csv_lines(*[("x", TOMORROW, "09:00", "10:00", "")] * 5))
+    assert result.rejected == 5
+    assert len(result.errors) == 2
+
+
+def test_import_repairs_drafts_once_per_date(mock_repository):
+    draft_service = MagicMock()
+    service = AvailabilityService(mock_repository, draft_service)
+    organization_id = uuid4()
+    service.import_availabilities(organization_id, csv_lines(
+        (uuid4(), TOMORROW, "09:00", "12:00", ""),
+        (uuid4(), TOMORROW, "11:00", "13:00", ""),
+    ))
+    draft_service.repair.assert_called_once_with(organization_id, TOMORROW, [(time(9, 0), time(13, 0))])
@@ -0,0 +1,150 @@
+import pytest
+from uuid import uuid4
+from datetime import date, time, datetime
+from sqlmodel import Session, create_engine, SQLModel
+from shifty.application.dto.availability_dto import AvailabilityFilter, AvailabilityFull
+from shifty.domain.entities import Availability, Organization, RecurringAvailability, User
+from shifty.infrastructure.repositories.availability_sqlalchemy import AvailabilityRepository
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def repo(session):
+    return AvailabilityRepository(session)
+
+@pytest.fixture
+def user(session):
+    org = Organization(name="TestOrg", org_code="123456")
+    session.add(org)
+    session.commit()
+    user = User(full_name="user", email="user@example.com", role="worker", organization_id=org.id)
+    session.add(user)
+    session.commit()
+    return user
+
+def make_availability(user, start_hour, end_hour, day=date(2025, 6, 18)):
+    return Availability(
+        id=uuid4(),
+        user_id=user.id,
+        organization_id=user.organization_id,
+        date=day,
+        start_time=time(start_hour, 0),
+        end_time=time(end_hour, 0),
+        note="imported",
+        created_at=datetime.now()
+    )
+
+def test_import_many_skips_overlaps_with_stored_rows(repo, user):
+    stored = repo.add(make_availability(user, 9, 12))
+    overlapping = make_availability(user, 11, 13)
+    touching = make_availability(user, 12, 14)
+    other_day = make_availability(user, 9, 12, date(2025, 6, 19))
+
+    skipped = repo.import_many([overlapping, touching, other_day])
+
+    assert skipped == [overlapping.id]
+    saved = {a.id: a for a in repo.get_by_user_id(user.id)}
+    assert set(saved) == {stored.id, touching.id, other_day.id}
+    assert saved[touching.id].start_time == time(12, 0)
+    assert saved[touching.id].note == "imported"
+
+def test_import_many_batches_see_each_other(repo, user):
+    assert repo.import_many([make_availability(user, 9, 12)]) == []
+    second = make_availability(user, 10, 11)
+    assert repo.import_many([second]) == [second.id]
+
+def make_recurring(user, weekday, start_hour, end_hour, **kwargs):
+    return RecurringAvailability(
+        user_id=user.id,
+        organization_id=user.organization_id,
+        weekday=weekday,
+        start_time=time(start_hour, 0),
+        end_time=time(end_hour, 0),
+        valid_from=kwargs.pop("valid_from", date(2025, 6, 1)),
+        **kwargs
+    )
+
+def test_get_by_date_expands_recurring(repo, user):
+    # 2025-06-18 is a Wednesday
+    template = repo.add_recurring(make_recurring(user, 2, 9, 13))
+    repo.add_recurring(make_recurring(user, 3, 9, 13))
+    found = repo.get_by_date(date(2025, 6, 18))
+    assert [(a.user_id, a.date, a.start_time) for a in found] == [(user.id, date(2025, 6, 18), time(9, 0))]
+    # Occurrences are derived from their template, they have no ID of their own
+    assert found[0].recurring_id == template.id
+    assert not hasattr(found[0], "id")
+
+def test_recurring_validity_and_exceptions(repo, user):
+    repo.add_recurring(make_recurring(
+        user, 2, 9, 13, valid_from=date(2025, 6, 11), valid_until=date(2025, 6, 25), exceptions=["2025-06-18"]
+    ))
+    assert repo.get_by_date(date(2025, 6, 4)) == []
+    assert len(repo.get_by_date(date(2025, 6, 11))) == 1
+    assert repo.get_by_date(date(2025, 6, 18)) == []
+    assert len(repo.get_by_date(date(2025, 6, 25))) == 1
+    assert repo.get_by_date(date(2025, 7, 2)) == []
+
+def test_one_off_availability_overrides_recurring(repo, user):
+    repo.add_recurring(make_recurring(user, 2, 9, 13))
+    one_off = repo.add(make_availability(user, 14, 18))
+    assert [a.id for a in repo.get_by_user_id_and_date(user.id, date(2025, 6, 18))] == [one_off.id]
+    assert len(repo.get_by_user_id_and_date(user.id, date(2025, 6, 25))) == 1
+    assert repo.get_by_user_id_and_date(uuid4(), date(2025, 6, 25)) == []
+
+def test_get_by_date_range_expands_each_date(repo, user):
+    repo.add_recurring(make_recurring(user, 2, 9, 13))
+    repo.add(make_availability(user, 14, 18, date(2025, 6, 25)))
+    found = repo.get_by_date_range(date(2025, 6, 16), date(2025, 7, 6))
+    assert sorted((a.date, a.start_time) for a in found) == [
+        (date(2025, 6, 18), time(9, 0)),
+        (date(2025, 6, 25), time(14, 0)),
+        (date(2025, 7, 2), time(9, 0)),
+    ]
+
+def test_delete_recurring(repo, user):
+    template = repo.add_recurring(make_recurring(user, 2, 9, 13))
+    assert repo.get_recurring_by_user_id(user.id) == [template]
+    assert repo.delete_recurring(template.id) == template
+    assert repo.get_recurring_by_user_id(user.id) == []
+    with pytest.raises(ValueError):
+        repo.delete_recurring(template.id)
+
+def test_get_page_with_filters(repo, user, session):
+    other = User(full_name="other", email="other@example.com", role="worker", organization_id=user.organization_id)
+    session.add(other)
+    session.commit()
+    for day in range(16, 23):
+        repo.add(make_availability(user, 9, 12, date(2025, 6, day)))
+        repo.add(make_availability(other, 9, 12, date(2025, 6, day)))
+    week = AvailabilityFilter(date_from=date(2025, 6, 17), date_to=date(2025, 6, 19), user_id=user.id)
+    first = repo.get_page(2, filters=week)
+    second = repo.get_page(2, first.next_cursor, week)
+    assert [a.date.day for a in first.items + second.items] == [17, 18, 19]
+    assert all(a.user_id == user.id for a in first.items + second.items)
+    assert second.next_cursor is None
+    assert len(repo.get_page(100, filters=AvailabilityFilter(organization_id=user.organization_id)).items) == 14
+
+def test_get_rows_by_date_matches_get_by_date(repo, user, session):
+    other = User(full_name="other", email="other@example.com", role="worker", organization_id=user.organization_id)
+    session.add(other)
+    one_off = repo.add(make_availability(user, 14, 18))
+    repo.add_recurring(make_recurring(user, 2, 9, 13))
+    template = repo.add_recurring(make_recurring(other, 2, 9, 13))
+    session.commit()
+
+    rows = repo.get_rows_by_date(date(2025, 6, 18))
+    entities = repo.get_by_date(date(2025, 6, 18))
+    assert [AvailabilityFull.model_validate(row) for row in rows] == [
+        AvailabilityFull.model_validate(a, from_attributes=True) for a in entities
+    ]
+    # The one-off row replaces the template of its user, the other user's template is expanded
+    read = [AvailabilityFull.model_validate(row) for row in rows]
+    assert [(a.id, a.recurring_id, a.user.full_name if a.user else None) for a in read] == [
+        (one_off.id, None, "user"),
+        (None, template.id, None)
+    ]
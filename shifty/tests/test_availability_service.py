@@ -1,11 +1,12 @@
 import pytest
 from unittest.mock import MagicMock
 from uuid import uuid4
-from datetime import date, time, datetime
+from datetime import date, time, datetime, timedelta
 
 from shifty.application.use_cases.availability_service import AvailabilityService, InvalidDateRangeException, NotExistsException
-from shifty.application.dto.availability_dto import AvailabilityCreate
-from shifty.domain.entities import Availability
+from shifty.application.dto.availability_dto import AvailabilityCreate, RecurringAvailabilityCreate
+from shifty.domain.entities import Availability, RecurringAvailability
+from shifty.domain.exceptions import InvalidAvailabilityException
 
 @pytest.fixture
 def mock_repository():
@@ -134,18 +135,8 @@ def test_get_by_user_id_and_date_empty(service, mock_repository):
 
 def test_create_overlapping_availability_raises(service, mock_repository):
     dto = make_create_dto()
-    # Existing availability overlaps with new one
-    existing = Availability(
-        id=uuid4(),
-        user_id=dto.user_id,
-        organization_id=dto.organization_id,
-        date=dto.date,
-        start_time=time(8, 0),
-        end_time=time(12, 0),
-        note="existing",
-        created_at=datetime.now()
-    )
-    mock_repository.get_by_user_id_and_date.return_value = [existing]
+    # The repository rejects the insert through the exclusion constraint
+    mock_repository.add.side_effect = InvalidAvailabilityException("New availability overlaps with existing availabilities.")
     dto.start_time = time(11, 0)
     dto.end_time = time(13, 0)
     with pytest.raises(Exception) as excinfo:
@@ -187,3 +178,130 @@ def test_get_by_date_with_no_results(service, mock_repository):
     result = service.get_by_date(test_date)
     assert result == []
     mock_repository.get_by_date.assert_called_with(test_date)
+
+def test_create_repairs_draft(mock_repository):
+    draft_service = MagicMock()
+    service = AvailabilityService(mock_repository, draft_service)
+    saved = make_availability()
+    mock_repository.get_by_user_id_and_date.return_value = []
+    mock_repository.add.return_value = saved
+    service.create(make_create_dto())
+    draft_service.repair.assert_called_once_with(saved.organization_id, saved.date, [(saved.start_time, saved.end_time)])
+
+def test_delete_repairs_draft(mock_repository):
+    draft_service = MagicMock()
+    service = AvailabilityService(mock_repository, draft_service)
+    existing = make_availability()
+    mock_repository.get_by_id.return_value = existing
+    service.delete(existing.id)
+    mock_repository.delete.assert_called_once_with(existing.id)
+    draft_service.repair.assert_called_once_with(existing.organization_id, existing.date, [(existing.start_time, existing.end_time)])
+
+def test_update_does_not_repair_draft(mock_repository):
+    draft_service = MagicMock()
+    service = AvailabilityService(mock_repository, draft_service)
+    availability = make_availability()
+    mock_repository.update.return_value = availability
+    assert service.update(availability.id, availability) == availability
+    # Only the note changes: neither a read of the availability nor a repair
+    mock_repository.get_by_id.assert_not_called()
+    draft_service.repair.assert_not_called()
+
+def test_repair_failure_does_not_fail_create(mock_repository):
+    draft_service = MagicMock()
+    draft_service.repair.side_effect = RuntimeError("boom")
+    service = AvailabilityService(mock_repository, draft_service)
+    saved = make_availability()
+    mock_repository.get_by_user_id_and_date.return_value = []
+    mock_repository.add.return_value = saved
+    assert service.create(make_create_dto()) == saved
+
+def test_create_does_not_read_existing_availabilities(service, mock_repository):
+    mock_repository.add.return_value = make_availability()
+    service.create(make_create_dto())
+    mock_repository.get_by_user_id_and_date.assert_not_called()
+
+def make_recurring_dto(**kwargs):
+    values = dict(
+        user_id=uuid4(),
+        organization_id=uuid4(),
+        weekday=2,
+        start_time=time(9, 0),
+        end_time=time(13, 0),
+        valid_from=date(2025, 6, 1),
+        exceptions=[date(2025, 6, 18), date(2025, 6, 18)]
+    )
+    values.update(kwargs)
+    return RecurringAvailabilityCreate(**values)
+
+def test_create_recurring_success(service, mock_repository):
+    mock_repository.get_recurring_by_user_id.return_value = []
+    mock_repository.add_recurring.side_effect = lambda recurring: recurring
+    result = service.create_recurring(make_recurring_dto())
+    assert result.weekday == 2
+    assert result.exceptions == ["2025-06-18"]
+
+def test_create_recurring_invalid_period(service):
+    with pytest.raises(InvalidDateRangeException):
+        service.create_recurring(make_recurring_dto(valid_until=date(2025, 5, 1)))
+    with pytest.raises(InvalidDateRangeException):
+        service.create_recurring(make_recurring_dto(start_time=time(14, 0)))
+
+def test_create_recurring_overlapping_raises(service, mock_repository):
+    dto = make_recurring_dto(valid_until=date(2025, 6, 30))
+    existing = RecurringAvailability(
+        user_id=dto.user_id, organization_id=dto.organization_id, weekday=2,
+        start_time=time(12, 0), end_time=time(18, 0), valid_from=date(2025, 6, 15)
+    )
+    mock_repository.get_recurring_by_user_id.return_value = [existing]
+    with pytest.raises(InvalidAvailabilityException):
+        service.create_recurring(dto)
+    # Disjoint validity periods do not overlap
+    existing.valid_from = date(2025, 7, 1)
+    mock_repository.add_recurring.side_effect = lambda recurring: recurring
+    assert service.create_recurring(dto).start_time == time(9, 0)
+
+def test_delete_recurring_not_exists(service, mock_repository):
+    mock_repository.delete_recurring.side_effect = ValueError
+    with pytest.raises(NotExistsException):
+        service.delete_recurring(uuid4())
+
+def next_weekday(weekday, weeks=0):
+    today = date.today()
+    return today + timedelta(days=(weekday - today.weekday()) % 7, weeks=weeks)
+
+def test_create_recurring_repairs_drafts_of_its_dates(mock_repository):
+    draft_service = MagicMock()
+    service = AvailabilityService(mock_repository, draft_service)
+    mock_repository.get_recurring_by_user_id.return_value = []
+    mock_repository.add_recurring.side_effect = lambda recurring: recurring
+    first, second = next_weekday(2), next_weekday(2, weeks=1)
+    # Drafts on another weekday and on an exception date are left alone
+    draft_service.get_draft_dates.return_value = [first, first + timedelta(days=1), second]
+    saved = service.create_recurring(make_recurring_dto(valid_from=date.today(), exceptions=[second]))
+    draft_service.get_draft_dates.assert_called_once_with(saved.organization_id, date.today(), None)
+    draft_service.repair.assert_called_once_with(saved.organization_id, first, [(time(9, 0), time(13, 0))])
+
+def test_delete_recurring_repairs_drafts_of_its_dates(mock_repository):
+    draft_service = MagicMock()
+    service = AvailabilityService(mock_repository, draft_service)
+    deleted = RecurringAvailability(
+        user_id=uuid4(), organization_id=uuid4(), weekday=2,
+        start_time=time(9, 0), end_time=time(13, 0), valid_from=date(2025, 6, 1)
+    )
+    mock_repository.delete_recurring.return_value = deleted
+    draft_service.get_draft_dates.return_value = [next_weekday(2)]
+    service.delete_recurring(deleted.id)
+    # Only the drafts from today on
+    draft_service.get_draft_dates.assert_called_once_with(deleted.organization_id, date.today(), None)
+    draft_service.repair.assert_called_once_with(deleted.organization_id, next_weekday(2), [(time(9, 0), time(13, 0))])
+
+def test_expired_recurring_repairs_no_draft(mock_repository):
+    draft_service = MagicMock()
+    service = AvailabilityService(mock_repository, draft_service)
+    mock_repository.delete_recurring.return_value = RecurringAvailability(
+        user_id=uuid4(), organization_id=uuid4(), weekday=2, start_time=time(9, 0),
+        end_time=time(13, 0), valid_from=date(2025, 6, 1), valid_until=date(2025, 6, 30)
+    )
+    service.delete_recurring(uuid4())
+    draft_service.get_draft_dates.assert_not_called()
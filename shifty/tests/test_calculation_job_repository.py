@@ -0,0 +1,68 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlmodel import Session, create_engine, SQLModel
+from shifty.domain.entities import CalculationJob, CalculationJobStatus, Organization, User
+from shifty.infrastructure.repositories.calculation_job_sqlalchemy import CalculationJobRepository
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def repo(session):
+    return CalculationJobRepository(session)
+
+@pytest.fixture
+def user(session):
+    org = Organization(name="TestOrg", org_code="123456")
+    user = User(full_name="Manager", email="manager@example.com", role="manager", organization_id=org.id)
+    session.add(org)
+    session.add(user)
+    session.commit()
+    return user
+
+def make_job(user, created_at, **fields):
+    return CalculationJob(
+        organization_id=user.organization_id,
+        requested_by_id=user.id,
+        request={"start_date": "2025-06-16"},
+        created_at=created_at,
+        **fields
+    )
+
+def test_claim_next_takes_oldest_pending(repo, user):
+    now = datetime.now()
+    newer = repo.add(make_job(user, now))
+    older = repo.add(make_job(user, now - timedelta(minutes=1)))
+    claimed = repo.claim_next(now - timedelta(minutes=10))
+    assert claimed.id == older.id
+    assert claimed.status == CalculationJobStatus.RUNNING
+    assert claimed.started_at is not None
+    assert repo.claim_next(now - timedelta(minutes=10)).id == newer.id
+    assert repo.claim_next(now - timedelta(minutes=10)) is None
+
+def test_claim_next_reclaims_stale_jobs(repo, user):
+    now = datetime.now()
+    stale = repo.add(make_job(
+        user, now - timedelta(hours=1),
+        status=CalculationJobStatus.RUNNING, started_at=now - timedelta(hours=1)
+    ))
+    repo.add(make_job(
+        user, now - timedelta(hours=1),
+        status=CalculationJobStatus.RUNNING, started_at=now
+    ))
+    assert repo.claim_next(now - timedelta(minutes=10)).id == stale.id
+    assert repo.claim_next(now - timedelta(minutes=10)) is None
+
+def test_complete_and_fail(repo, user):
+    job = repo.add(make_job(user, datetime.now()))
+    done = repo.complete(job.id, [["2025-06-16", None, "u", "08:00:00", "12:00:00"]])
+    assert done.status == CalculationJobStatus.DONE
+    assert done.result == [["2025-06-16", None, "u", "08:00:00", "12:00:00"]]
+    assert done.finished_at is not None
+    failed = repo.fail(job.id, "boom")
+    assert failed.status == CalculationJobStatus.FAILED
+    assert failed.error == "boom"
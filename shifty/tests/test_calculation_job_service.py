@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import MagicMock
+from uuid import uuid4
+from datetime import date, time, datetime, timedelta
+
+from shifty.application.dto.shift_dto import ShiftCalculationResult, ShiftRangeCalculationRequest
+from shifty.application.use_cases.calculation_job_service import CalculationJobService, decode_result, encode_result
+from shifty.domain.entities import CalculationJob, CalculationJobStatus, ShiftSlot
+from shifty.domain.exceptions import InvalidDateRangeException, NotExistsException
+
+@pytest.fixture
+def mock_repository():
+    return MagicMock()
+
+@pytest.fixture
+def service(mock_repository):
+    return CalculationJobService(mock_repository)
+
+def make_request(days=7):
+    return ShiftRangeCalculationRequest(
+        start_date=date(2025, 6, 16),
+        end_date=date(2025, 6, 16) + timedelta(days=days - 1),
+        organization_id=uuid4()
+    )
+
+def make_job(request, **fields):
+    return CalculationJob(
+        id=uuid4(),
+        organization_id=request.organization_id,
+        requested_by_id=uuid4(),
+        request=request.model_dump(mode="json"),
+        created_at=datetime.now(),
+        **fields
+    )
+
+def make_result():
+    slot = ShiftSlot(id=uuid4(), organization_id=uuid4(), name="Morning", start_time=time(8, 0), end_time=time(12, 0))
+    return ShiftCalculationResult(
+        user_id=uuid4(),
+        organization_id=uuid4(),
+        date=date(2025, 6, 16),
+        start_time=time(9, 0),
+        end_time=time(12, 0),
+        created_at=datetime.now(),
+        shift_type=slot
+    )
+
+def test_submit(service, mock_repository):
+    request = make_request()
+    mock_repository.add.side_effect = lambda job: job
+    requester = uuid4()
+    job = service.submit(request, requester)
+    assert job.status == CalculationJobStatus.PENDING
+    assert job.requested_by_id == requester
+    assert ShiftRangeCalculationRequest.model_validate(job.request) == request
+    mock_repository.add.assert_called_once()
+
+def test_submit_invalid_range(service, mock_repository):
+    with pytest.raises(InvalidDateRangeException):
+        service.submit(make_request(days=60), uuid4())
+    mock_repository.add.assert_not_called()
+
+def test_get_by_id_not_found(service, mock_repository):
+    mock_repository.get_by_id.return_value = None
+    with pytest.raises(NotExistsException):
+        service.get_by_id(uuid4())
+
+def test_get_by_id_decodes_results(service, mock_repository):
+    result = make_result()
+    job = make_job(make_request(), status=CalculationJobStatus.DONE, result=[encode_result(result)])
+    mock_repository.get_by_id.return_value = job
+    read = service.get_by_id(job.id)
+    assert read.status == CalculationJobStatus.DONE
+    assert len(read.results) == 1
+    assert read.results[0].user_id == result.user_id
+    assert read.results[0].shift_slot_id == result.shift_type.id
+    assert read.results[0].start_time == time(9, 0)
+
+def test_encode_decode_roundtrip():
+    result = make_result()
+    decoded = decode_result(encode_result(result))
+    assert (decoded.date, decoded.user_id, decoded.start_time, decoded.end_time) == (
+        result.date, result.user_id, result.start_time, result.end_time
+    )
+
+def test_claim_next_uses_lease(service, mock_repository):
+    service.claim_next()
+    stale_before = mock_repository.claim_next.call_args[0][0]
+    assert stale_before < datetime.now() - timedelta(minutes=5)
+
+def test_run_stores_compact_results(service, mock_repository):
+    request = make_request()
+    job = make_job(request, status=CalculationJobStatus.RUNNING)
+    shift_service = MagicMock()
+    result = make_result()
+    shift_service.calculate_shifts_range.return_value = [result]
+    service.run(job, shift_service)
+    shift_service.calculate_shifts_range.assert_called_once_with(request)
+    mock_repository.complete.assert_called_once_with(job.id, [encode_result(result)])
+
+def test_run_failure(service, mock_repository):
+    job = make_job(make_request(), status=CalculationJobStatus.RUNNING)
+    shift_service = MagicMock()
+    shift_service.calculate_shifts_range.side_effect = RuntimeError("boom")
+    service.run(job, shift_service)
+    mock_repository.fail.assert_called_once_with(job.id, "boom")
+    mock_repository.complete.assert_not_called()
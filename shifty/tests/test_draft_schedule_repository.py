@@ -0,0 +1,66 @@
+import pytest
+from datetime import date, time
+from uuid import uuid4
+from sqlmodel import Session, create_engine, SQLModel
+from shifty.domain.entities import DraftAssignment, DraftSchedule, Organization
+from shifty.infrastructure.repositories.draft_schedule_sqlalchemy import DraftScheduleRepository
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def repo(session):
+    return DraftScheduleRepository(session)
+
+@pytest.fixture
+def organization(session):
+    org = Organization(name="TestOrg", org_code="123456")
+    session.add(org)
+    session.commit()
+    return org
+
+def make_assignment(slot_id):
+    return DraftAssignment(shift_slot_id=slot_id, user_id=uuid4(), start_time=time(8, 0), end_time=time(12, 0))
+
+def test_save_replaces_previous_draft(repo, organization):
+    day = date(2025, 6, 18)
+    first = repo.save(DraftSchedule(organization_id=organization.id, date=day), [make_assignment(uuid4())])
+    second_rows = [make_assignment(uuid4()), make_assignment(uuid4())]
+    second = repo.save(DraftSchedule(organization_id=organization.id, date=day, mode="optimal"), second_rows)
+    assert second.id == first.id
+    assert second.mode == "optimal"
+    assert {a.id for a in repo.get_assignments(second.id)} == {a.id for a in second_rows}
+
+def test_replace_assignments_only_touches_given_slots(repo, organization):
+    morning, evening = uuid4(), uuid4()
+    kept = make_assignment(evening)
+    draft = repo.save(
+        DraftSchedule(organization_id=organization.id, date=date(2025, 6, 18)),
+        [make_assignment(morning), kept]
+    )
+    replacement = make_assignment(morning)
+    repo.replace_assignments(draft.id, {morning}, [replacement])
+    assert {a.id for a in repo.get_assignments(draft.id)} == {kept.id, replacement.id}
+    assert repo.get_by_organization_and_date(organization.id, date(2025, 6, 18)).updated_at is not None
+
+def test_savepoint_undoes_only_its_block(repo, organization):
+    morning = uuid4()
+    original = make_assignment(morning)
+    draft = repo.save(DraftSchedule(organization_id=organization.id, date=date(2025, 6, 18)), [original])
+    with pytest.raises(RuntimeError):
+        with repo.savepoint():
+            repo.replace_assignments(draft.id, {morning}, [make_assignment(morning)])
+            raise RuntimeError("repair failed")
+    # The draft saved before the savepoint is still there, untouched
+    assert [a.id for a in repo.get_assignments(draft.id)] == [original.id]
+
+def test_get_dates(repo, organization):
+    for day in (18, 20, 25):
+        repo.save(DraftSchedule(organization_id=organization.id, date=date(2025, 6, day)), [])
+    assert repo.get_dates(organization.id, date(2025, 6, 19)) == [date(2025, 6, 20), date(2025, 6, 25)]
+    assert repo.get_dates(organization.id, date(2025, 6, 18), date(2025, 6, 20)) == [date(2025, 6, 18), date(2025, 6, 20)]
+    assert repo.get_dates(uuid4(), date(2025, 6, 1)) == []
@@ -0,0 +1,80 @@
+import random
+import pytest
+from datetime import time
+
+from shifty.domain.intervals import IntervalSet
+
+
+def naive_overlaps(intervals, start, end):
+    return any(s < end and e > start for s, e in intervals)
+
+
+def random_interval(rng, span=100):
+    start = rng.randint(0, span - 1)
+    return start, rng.randint(start + 1, span)
+
+
+def test_overlaps_matches_naive_check():
+    for seed in range(300):
+        rng = random.Random(seed)
+        intervals = [random_interval(rng) for _ in range(rng.randint(0, 15))]
+        interval_set = IntervalSet.from_intervals(intervals)
+        for _ in range(30):
+            start, end = random_interval(rng)
+            assert interval_set.overlaps(start, end) == naive_overlaps(intervals, start, end)
+
+
+def test_merge_keeps_intervals_disjoint_and_sorted():
+    for seed in range(300):
+        rng = random.Random(seed)
+        intervals = [random_interval(rng) for _ in range(rng.randint(0, 15))]
+        merged = list(IntervalSet.from_intervals(intervals))
+        assert merged == sorted(merged)
+        for (_, end), (next_start, _) in zip(merged, merged[1:]):
+            assert end < next_start
+        # Same coverage as the original intervals
+        covered = {p for s, e in intervals for p in range(s, e)}
+        assert {p for s, e in merged for p in range(s, e)} == covered
+
+
+def test_add_and_remove_match_naive_list():
+    for seed in range(300):
+        rng = random.Random(seed)
+        interval_set = IntervalSet()
+        members = []
+        for _ in range(40):
+            start, end = random_interval(rng)
+            if members and rng.random() < 0.3:
+                interval = rng.choice(members)
+                interval_set.remove(*interval)
+                members.remove(interval)
+            elif naive_overlaps(members, start, end):
+                with pytest.raises(ValueError):
+                    interval_set.add(start, end)
+            else:
+                interval_set.add(start, end)
+                members.append((start, end))
+            assert list(interval_set) == sorted(members)
+            probe = random_interval(rng)
+            assert interval_set.overlaps(*probe) == naive_overlaps(members, *probe)
+
+
+def test_touching_intervals_do_not_overlap():
+    interval_set = IntervalSet.from_intervals([(time(9, 0), time(12, 0))])
+    assert not interval_set.overlaps(time(12, 0), time(14, 0))
+    assert not interval_set.overlaps(time(7, 0), time(9, 0))
+    assert interval_set.overlaps(time(11, 59), time(14, 0))
+
+
+def test_merge_coalesces_touching_intervals():
+    interval_set = IntervalSet.from_intervals([(10, 12), (12, 13), (15, 16)])
+    assert list(interval_set) == [(10, 13), (15, 16)]
+    assert interval_set.merge(13, 15) == (10, 16)
+    assert list(interval_set) == [(10, 16)]
+
+
+def test_remove_missing_interval():
+    interval_set = IntervalSet.from_intervals([(10, 12)])
+    with pytest.raises(ValueError):
+        interval_set.remove(10, 11)
+    assert (10, 12) in interval_set
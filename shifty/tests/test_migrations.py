@@ -0,0 +1,265 @@
+import re
+import pytest
+from datetime import date, datetime, time, timedelta
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import MetaData, event, inspect, text
+from sqlmodel import Session, SQLModel, create_engine, select
+from shifty.application.dto.shift_dto import ShiftFilter
+from shifty.domain.entities import Availability, Organization, Override, Shift, ShiftStatus, User
+from shifty.infrastructure.db import BASELINE_REVISION, migration_config, run_migrations
+from shifty.infrastructure.repositories.availability_sqlalchemy import AvailabilityRepository
+from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
+from shifty.infrastructure.repositories.registration_sqlalchemy import RegistrationRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
+
+DAY = date(2025, 6, 2)
+DAYS = 30
+ORGANIZATIONS = 4
+USERS_PER_ORGANIZATION = 25
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def index_names(engine, table: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_migrations_create_the_schema_of_the_models(engine):
+    run_migrations(engine)
+    with engine.connect() as conn:
+        # Nothing left for autogenerate: the models and the migrations agree
+        assert compare_metadata(MigrationContext.configure(conn), SQLModel.metadata) == []
+
+
+def test_downgrade_to_base(engine):
+    run_migrations(engine)
+    with engine.begin() as conn:
+        command.downgrade(migration_config(conn), "base")
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+
+
+# What the models gained since create_all made the databases of the deployments
+# before the migrations
+SERIES_TABLES = [
+    "calculation_jobs", "draft_assignments", "draft_schedules",
+    "recurring_availabilities", "rotation_entries", "rotations"
+]
+SERIES_COLUMNS = [("shifts", "root_shift_id"), ("shifts", "lineage_path")]
+BASELINE_INDEXES = {"ix_auth_username", "ix_organizations_org_code"}
+
+
+def create_baseline_tables(engine) -> None:
+    """The tables of the models before the migrations, as create_all made them."""
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in SERIES_TABLES:
+            conn.execute(text(f"DROP TABLE {table}"))
+        for table in inspect(conn).get_table_names():
+            for index in index_names(conn, table) - BASELINE_INDEXES:
+                conn.execute(text(f"DROP INDEX {index}"))
+        for table, column in SERIES_COLUMNS:
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+
+
+def test_baseline_revision_is_the_schema_before_the_migrations(engine, tmp_path):
+    create_baseline_tables(engine)
+    migrated = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    run_migrations(migrated, BASELINE_REVISION)
+    baseline = MetaData()
+    baseline.reflect(engine)
+    with migrated.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), baseline) == []
+    migrated.dispose()
+
+
+def test_database_created_before_the_migrations_is_stamped(engine):
+    create_baseline_tables(engine)
+
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        head = ScriptDirectory.from_config(migration_config(conn)).get_current_head()
+        assert MigrationContext.configure(conn).get_current_revision() == head
+        # The revisions after the baseline added everything the models gained since
+        assert compare_metadata(MigrationContext.configure(conn), SQLModel.metadata) == []
+    assert {"ix_users_email", "ix_shifts_user_id_date", "ix_shifts_organization_id_date"} <= (
+        index_names(engine, "users") | index_names(engine, "shifts")
+    )
+
+
+def test_lineage_of_fragments_split_before_it_is_backfilled(engine):
+    run_migrations(engine, "0010")
+    # A shift split twice before the splitter maintained the lineage
+    with Session(engine) as session:
+        org = Organization(name="Org", org_code="lineage")
+        user = User(full_name="user", email="lineage@example.com", role="worker", organization_id=org.id)
+        shifts = {}
+        parent_id = None
+        splits = [("root", 8, ShiftStatus.CANCELED), ("child", 10, ShiftStatus.CANCELED), ("fragment", 11, ShiftStatus.TAKEN)]
+        for name, start, status in splits:
+            shifts[name] = Shift(
+                user_id=user.id,
+                origin_user_id=user.id,
+                organization_id=org.id,
+                date=DAY,
+                start_time=time(start, 0),
+                end_time=time(12, 0),
+                status=status,
+                parent_shift_id=parent_id,
+                created_at=datetime.now()
+            )
+            parent_id = shifts[name].id
+        session.add_all([org, user, *shifts.values()])
+        session.commit()
+        root, child, fragment = (shifts[name].id for name in ("root", "child", "fragment"))
+
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        repository = ShiftRepository(session)
+        shifts = {shift.id: shift for shift in session.exec(select(Shift)).all()}
+        assert (shifts[root].root_shift_id, shifts[root].lineage_path) == (None, None)
+        assert (shifts[child].root_shift_id, shifts[child].lineage_path) == (root, f"{root}/{child}/")
+        assert (shifts[fragment].root_shift_id, shifts[fragment].lineage_path) == (root, f"{root}/{child}/{fragment}/")
+        assert [shift.id for shift in repository.get_active_descendants(shifts[root])] == [fragment]
+        assert [shift.id for shift in repository.get_active_descendants(shifts[child])] == [fragment]
+
+
+@pytest.fixture(scope="module")
+def seeded_engine(tmp_path_factory):
+    """
+    A month of shifts, availabilities and overrides of 100 users in 4 organizations,
+    most overrides already taken, with the planner statistics collected.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('explain') / 'seeded.db'}")
+    run_migrations(engine)
+    now = datetime.now()
+    ids = {}
+    with Session(engine) as session:
+        for o in range(ORGANIZATIONS):
+            org = Organization(name=f"Org {o}", org_code=f"org{o:03d}")
+            session.add(org)
+            for u in range(USERS_PER_ORGANIZATION):
+                user = User(
+                    full_name=f"user {o}.{u}",
+                    email=f"user{o}.{u}@example.com",
+                    role="admin" if u == 0 else "worker",
+                    organization_id=org.id
+                )
+                session.add(user)
+                for d in range(DAYS):
+                    day = DAY + timedelta(days=d)
+                    shift = Shift(
+                        user_id=user.id,
+                        origin_user_id=user.id,
+                        organization_id=org.id,
+                        date=day,
+                        start_time=time(8, 0),
+                        end_time=time(16, 0),
+                        status=ShiftStatus.TAKEN,
+                        created_at=now
+                    )
+                    session.add(shift)
+                    session.add(Availability(
+                        user_id=user.id,
+                        organization_id=org.id,
+                        date=day,
+                        start_time=time(8, 0),
+                        end_time=time(16, 0),
+                        created_at=now
+                    ))
+                    session.add(Override(
+                        shift_id=shift.id,
+                        user_id=user.id,
+                        organization_id=org.id,
+                        date=day,
+                        start_time=time(10, 0),
+                        end_time=time(12, 0),
+                        is_taken=d % 10 != 0
+                    ))
+                    ids.setdefault("shift", shift.id)
+                ids.setdefault("user", user.id)
+            ids.setdefault("organization", org.id)
+        session.commit()
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    yield engine, ids
+    engine.dispose()
+
+
+# Each hot filter, the repository call running it, and the index that serves it
+HOT_FILTERS = [
+    (
+        "shifts(user_id, date)", "ix_shifts_user_id_date",
+        lambda s, ids: ShiftRepository(s).get_by_user_and_date(ids["user"], DAY)
+    ),
+    (
+        "shifts(organization_id, date)", "ix_shifts_organization_id_date",
+        lambda s, ids: ShiftRepository(s).get_page(
+            50, filters=ShiftFilter(organization_id=ids["organization"], date_from=DAY, date_to=DAY)
+        )
+    ),
+    (
+        "availabilities(user_id, date)", "ix_availabilities_user_id_date",
+        lambda s, ids: AvailabilityRepository(s).get_by_user_id_and_date(ids["user"], DAY)
+    ),
+    (
+        "availabilities(date)", "ix_availabilities_date_start_time_id",
+        lambda s, ids: AvailabilityRepository(s).get_rows_by_date(DAY)
+    ),
+    (
+        "overrides(shift_id)", "ix_overrides_shift_id_date",
+        lambda s, ids: OverrideRepository(s).get_by_shift_and_date(ids["shift"], DAY)
+    ),
+    (
+        "overrides WHERE is_taken = false", "ix_overrides_open",
+        lambda s, ids: OverrideRepository(s).get_open_rows()
+    ),
+    (
+        "users(email)", "ix_users_email",
+        lambda s, ids: RegistrationRepository(s).get_user_by_email("user1.3@example.com")
+    ),
+    (
+        "users(role)", "ix_users_role",
+        lambda s, ids: UserRepository(s).get_by_role("admin")
+    ),
+    (
+        "users ORDER BY full_name, id", "ix_users_full_name_id",
+        lambda s, ids: UserRepository(s).get_page(20)
+    ),
+]
+
+
+@pytest.mark.parametrize("hot_filter, index, call", HOT_FILTERS, ids=[f[0] for f in HOT_FILTERS])
+def test_hot_filter_uses_its_index(seeded_engine, hot_filter, index, call):
+    engine, ids = seeded_engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as session:
+            call(session, ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # The plans of the statements the repository actually ran
+    with engine.connect() as conn:
+        plans = [
+            " ".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            for statement, parameters in statements
+        ]
+    assert any(re.search(rf"USING (COVERING )?INDEX {index}\b", plan) for plan in plans), (
+        f"{hot_filter} is not served by {index}:\n" + "\n".join(plans)
+    )
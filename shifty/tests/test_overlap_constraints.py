@@ -0,0 +1,132 @@
+import pytest
+from unittest.mock import MagicMock
+from uuid import uuid4
+from datetime import date, time, datetime
+from sqlalchemy.exc import IntegrityError
+
+from shifty.domain.entities import Availability, Override, Shift
+from shifty.domain.exceptions import InvalidAvailabilityException, InvalidOverrideException, OverlappingShiftException
+from shifty.infrastructure.constraints import (
+    AVAILABILITIES_NO_OVERLAP,
+    EXCLUSION_VIOLATION,
+    OVERRIDES_NO_OVERLAP,
+    SHIFTS_NO_OVERLAP,
+    violated_exclusion_constraint
+)
+from shifty.infrastructure.repositories.availability_sqlalchemy import AvailabilityRepository
+from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+
+
+def integrity_error(pgcode, constraint_name=None):
+    # Mimics the psycopg2 error wrapped by SQLAlchemy
+    orig = MagicMock()
+    orig.pgcode = pgcode
+    orig.diag.constraint_name = constraint_name
+    return IntegrityError("INSERT ...", {}, orig)
+
+
+class AsyncpgIntegrityError(Exception):
+    # Mimics the error SQLAlchemy's asyncpg adapter raises: the SQLSTATE without diag
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = self.sqlstate = pgcode
+
+
+def asyncpg_integrity_error(pgcode, constraint_name=None):
+    # The asyncpg exception, with the constraint, is the cause of the translated one
+    cause = Exception("conflicting key value violates exclusion constraint")
+    cause.constraint_name = constraint_name
+    orig = AsyncpgIntegrityError(pgcode)
+    orig.__cause__ = cause
+    return IntegrityError("INSERT ...", {}, orig)
+
+
+def failing_session(error):
+    # Repositories flush; the unit of work commits
+    session = MagicMock()
+    session.flush.side_effect = error
+    return session
+
+
+def make_shift():
+    user_id = uuid4()
+    return Shift(
+        user_id=user_id,
+        origin_user_id=user_id,
+        organization_id=uuid4(),
+        date=date(2025, 6, 18),
+        start_time=time(9, 0),
+        end_time=time(17, 0),
+        created_at=datetime.now()
+    )
+
+
+def test_violated_exclusion_constraint():
+    assert violated_exclusion_constraint(integrity_error(EXCLUSION_VIOLATION, SHIFTS_NO_OVERLAP)) == SHIFTS_NO_OVERLAP
+    # Unique or foreign key violations are not exclusion violations
+    assert violated_exclusion_constraint(integrity_error("23505", "users_email_key")) is None
+    assert violated_exclusion_constraint(IntegrityError("INSERT ...", {}, Exception())) is None
+
+
+def test_violated_exclusion_constraint_on_asyncpg():
+    error = asyncpg_integrity_error(EXCLUSION_VIOLATION, OVERRIDES_NO_OVERLAP)
+    assert violated_exclusion_constraint(error) == OVERRIDES_NO_OVERLAP
+    assert violated_exclusion_constraint(asyncpg_integrity_error("23505", "users_email_key")) is None
+    # A translated error without its cause
+    assert violated_exclusion_constraint(IntegrityError("INSERT ...", {}, AsyncpgIntegrityError(EXCLUSION_VIOLATION))) is None
+
+
+def test_shift_repository_translates_overlap():
+    session = failing_session(integrity_error(EXCLUSION_VIOLATION, SHIFTS_NO_OVERLAP))
+    with pytest.raises(OverlappingShiftException):
+        ShiftRepository(session).add(make_shift())
+    # Only the savepoint of the write is rolled back, not the unit of work
+    session.begin_nested.assert_called_once()
+    session.rollback.assert_not_called()
+
+
+def test_shift_repository_reraises_other_integrity_errors():
+    error = integrity_error("23503", "shifts_user_id_fkey")
+    with pytest.raises(IntegrityError):
+        ShiftRepository(failing_session(error)).add(make_shift())
+
+
+def test_shift_repository_translates_overlap_on_asyncpg():
+    session = failing_session(asyncpg_integrity_error(EXCLUSION_VIOLATION, SHIFTS_NO_OVERLAP))
+    with pytest.raises(OverlappingShiftException):
+        ShiftRepository(session).add(make_shift())
+
+
+def test_availability_repository_translates_overlap():
+    session = failing_session(integrity_error(EXCLUSION_VIOLATION, AVAILABILITIES_NO_OVERLAP))
+    availability = Availability(
+        user_id=uuid4(),
+        organization_id=uuid4(),
+        date=date(2025, 6, 18),
+        start_time=time(9, 0),
+        end_time=time(17, 0),
+        created_at=datetime.now()
+    )
+    with pytest.raises(InvalidAvailabilityException):
+        AvailabilityRepository(session).add(availability)
+    # Only the savepoint of the write is rolled back, not the unit of work
+    session.begin_nested.assert_called_once()
+    session.rollback.assert_not_called()
+
+
+def test_override_repository_translates_overlap():
+    session = failing_session(integrity_error(EXCLUSION_VIOLATION, OVERRIDES_NO_OVERLAP))
+    override = Override(
+        shift_id=uuid4(),
+        user_id=uuid4(),
+        organization_id=uuid4(),
+        date=date(2025, 6, 18),
+        start_time=time(9, 0),
+        end_time=time(12, 0)
+    )
+    with pytest.raises(InvalidOverrideException):
+        OverrideRepository(session).add(override)
+    # Only the savepoint of the write is rolled back, not the unit of work
+    session.begin_nested.assert_called_once()
+    session.rollback.assert_not_called()
@@ -0,0 +1,155 @@
+import asyncio
+import socket
+import threading
+from collections import namedtuple
+from datetime import date, time, datetime
+from uuid import uuid4
+
+from shifty.api.routers.overrides import format_sse
+from shifty.application.dto.override_dto import OverrideEvent, OverrideEventType
+from shifty.domain.entities import Override
+from shifty.infrastructure import notifications
+from shifty.infrastructure.notifications import OverrideEventBroker
+
+Notify = namedtuple("Notify", "pid channel payload")
+
+
+class FakeListener:
+    """Stands in for the psycopg2 connection: payloads written to the socket become notifies."""
+
+    def __init__(self):
+        self.reader, self.writer = socket.socketpair()
+        self.notifies = []
+        self.closed = False
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def send(self, payload: str):
+        self.writer.send(payload.encode() + b"\n")
+
+    def poll(self):
+        for line in self.reader.recv(65536).decode().splitlines():
+            self.notifies.append(Notify(1, notifications.OVERRIDE_EVENTS_CHANNEL, line))
+
+    def close(self):
+        self.closed = True
+        self.reader.close()
+        self.writer.close()
+
+
+def make_event(organization_id, event=OverrideEventType.CREATED):
+    override = Override(
+        id=uuid4(),
+        shift_id=uuid4(),
+        user_id=uuid4(),
+        organization_id=organization_id,
+        date=date(2025, 6, 18),
+        start_time=time(10, 0),
+        end_time=time(12, 0),
+        created_at=datetime.now()
+    )
+    return OverrideEvent.from_override(event, override)
+
+
+def test_events_are_fanned_out_per_organization():
+    org_id, other_org_id = uuid4(), uuid4()
+    listener = FakeListener()
+    connections = []
+
+    def connect():
+        connections.append(listener)
+        return listener
+
+    async def scenario():
+        broker = OverrideEventBroker(connect)
+        first = broker.subscribe(org_id)
+        second = broker.subscribe(org_id)
+        other = broker.subscribe(other_org_id)
+        event = make_event(org_id)
+        listener.send(event.model_dump_json())
+        received = await asyncio.wait_for(first.get(), 1)
+        assert received == event
+        assert await asyncio.wait_for(second.get(), 1) == event
+        assert other.empty()
+        broker.unsubscribe(org_id, first)
+        broker.unsubscribe(org_id, second)
+        broker.unsubscribe(other_org_id, other)
+        assert broker.subscribers == {}
+        broker.close()
+
+    asyncio.run(scenario())
+    # One listener connection for all the clients
+    assert len(connections) == 1
+    assert listener.closed
+
+
+def test_listener_connects_off_the_event_loop():
+    org_id = uuid4()
+    listener = FakeListener()
+    connect_threads = []
+
+    def connect():
+        connect_threads.append(threading.get_ident())
+        return listener
+
+    async def scenario():
+        broker = OverrideEventBroker(connect)
+        queue = broker.subscribe(org_id)
+        event = make_event(org_id)
+        listener.send(event.model_dump_json())
+        assert await asyncio.wait_for(queue.get(), 1) == event
+        broker.close()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert len(connect_threads) == 1
+    assert connect_threads[0] != loop_thread
+
+
+def test_listener_reconnects_after_a_failed_connect(monkeypatch):
+    monkeypatch.setattr(notifications, "RECONNECT_DELAY_SECONDS", 0)
+    org_id = uuid4()
+    listener = FakeListener()
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("connection refused")
+        return listener
+
+    async def scenario():
+        broker = OverrideEventBroker(connect)
+        queue = broker.subscribe(org_id)
+        event = make_event(org_id)
+        listener.send(event.model_dump_json())
+        assert await asyncio.wait_for(queue.get(), 1) == event
+        broker.close()
+
+    asyncio.run(scenario())
+    assert len(attempts) == 2
+
+
+def test_slow_client_drops_events(monkeypatch):
+    monkeypatch.setattr(notifications, "SUBSCRIBER_QUEUE_SIZE", 1)
+    org_id = uuid4()
+
+    async def scenario():
+        broker = OverrideEventBroker(FakeListener)
+        queue = broker.subscribe(org_id)
+        broker.publish(make_event(org_id))
+        broker.publish(make_event(org_id, OverrideEventType.TAKEN))
+        assert queue.qsize() == 1
+        assert (await queue.get()).event == OverrideEventType.CREATED
+        broker.close()
+
+    asyncio.run(scenario())
+
+
+def test_format_sse():
+    event = make_event(uuid4(), OverrideEventType.TAKEN)
+    message = format_sse(event)
+    assert message.startswith("event: taken\ndata: {")
+    assert message.endswith("\n\n")
+    assert OverrideEvent.model_validate_json(message.split("data: ", 1)[1]) == event
@@ -0,0 +1,145 @@
+import pytest
+from uuid import uuid4
+from datetime import date, time, datetime
+from sqlmodel import Session, create_engine, SQLModel, select
+from shifty.application.dto.override_dto import OverrideRead
+from shifty.domain.entities import Organization, Override, Shift, ShiftStatus, User
+from shifty.domain.repositories import Loading
+from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def repo(session):
+    return OverrideRepository(session)
+
+@pytest.fixture
+def shift(session):
+    org = Organization(name="TestOrg", org_code="123456")
+    session.add(org)
+    session.commit()
+    user = User(full_name="user", email="user@example.com", role="worker", organization_id=org.id)
+    session.add(user)
+    session.commit()
+    shift = Shift(
+        user_id=user.id,
+        origin_user_id=user.id,
+        organization_id=org.id,
+        date=date(2025, 6, 18),
+        start_time=time(8, 0),
+        end_time=time(18, 0),
+        created_at=datetime.now()
+    )
+    session.add(shift)
+    session.commit()
+    return shift
+
+def make_override(shift, start_hour, end_hour):
+    return Override(
+        shift_id=shift.id,
+        user_id=shift.user_id,
+        organization_id=shift.organization_id,
+        date=shift.date,
+        start_time=time(start_hour, 0),
+        end_time=time(end_hour, 0)
+    )
+
+def test_get_by_shift_and_date(repo, shift):
+    override = repo.add(make_override(shift, 9, 12))
+    assert repo.get_by_shift_and_date(shift.id, shift.date) == [override]
+    assert repo.get_by_shift_and_date(shift.id, date(2025, 6, 19)) == []
+    assert repo.get_by_shift_and_date(uuid4(), shift.date) == []
+
+def test_exists_overlapping(repo, shift):
+    repo.add(make_override(shift, 9, 12))
+    assert repo.exists_overlapping(shift.id, time(11, 0), time(13, 0))
+    assert repo.exists_overlapping(shift.id, time(8, 0), time(18, 0))
+    # Touching ranges do not overlap
+    assert not repo.exists_overlapping(shift.id, time(12, 0), time(14, 0))
+    assert not repo.exists_overlapping(shift.id, time(8, 0), time(9, 0))
+    assert not repo.exists_overlapping(uuid4(), time(9, 0), time(12, 0))
+
+def make_segments(shift, taker_id):
+    return [
+        Shift(user_id=shift.user_id, origin_user_id=shift.user_id, organization_id=shift.organization_id,
+              date=shift.date, start_time=time(8, 0), end_time=time(10, 0), parent_shift_id=shift.id),
+        Shift(user_id=taker_id, origin_user_id=shift.user_id, organization_id=shift.organization_id,
+              date=shift.date, start_time=time(10, 0), end_time=time(12, 0), status=ShiftStatus.TAKEN,
+              parent_shift_id=shift.id),
+        Shift(user_id=shift.user_id, origin_user_id=shift.user_id, organization_id=shift.organization_id,
+              date=shift.date, start_time=time(12, 0), end_time=time(18, 0), parent_shift_id=shift.id),
+    ]
+
+def test_take(repo, session, shift):
+    override = repo.add(make_override(shift, 9, 13))
+    taker_id = uuid4()
+    taken = repo.take(override.id, taker_id, time(10, 0), time(12, 0), shift.id, make_segments(shift, taker_id))
+    assert taken.is_taken
+    assert taken.taken_by_id == taker_id
+    assert (taken.start_time, taken.end_time) == (time(10, 0), time(12, 0))
+    assert session.get(Shift, shift.id).status == ShiftStatus.CANCELED
+    segments = session.exec(select(Shift).where(Shift.parent_shift_id == shift.id)).all()
+    assert len(segments) == 3
+
+def test_take_already_taken_writes_nothing(repo, session, shift):
+    override = repo.add(make_override(shift, 9, 13))
+    repo.take(override.id, uuid4(), time(10, 0), time(12, 0), shift.id, [])
+    with pytest.raises(ValueError):
+        repo.take(override.id, uuid4(), time(9, 0), time(13, 0), shift.id, make_segments(shift, uuid4()))
+    assert session.exec(select(Shift).where(Shift.parent_shift_id == shift.id)).all() == []
+    assert session.get(Override, override.id).start_time == time(10, 0)
+
+def test_take_missing_override(repo, shift):
+    with pytest.raises(ValueError):
+        repo.take(uuid4(), uuid4(), time(10, 0), time(12, 0), shift.id, [])
+
+def test_taken_by_loading(session, shift, count_statements):
+    takers = [
+        User(full_name=f"taker {i}", email=f"taker{i}@example.com", role="worker", organization_id=shift.organization_id)
+        for i in range(3)
+    ]
+    session.add_all(takers)
+    for hour, taker in zip((8, 10, 12), takers):
+        override = make_override(shift, hour, hour + 1)
+        override.is_taken = True
+        override.taken_by_id = taker.id
+        session.add(override)
+    session.commit()
+
+    def taken_by_names(loading):
+        session.expunge_all()
+        with count_statements(session.get_bind()) as statements:
+            names = sorted(o.taken_by.full_name for o in OverrideRepository(session).get_all(loading=loading))
+        return names, len(statements)
+
+    # One SELECT per override when left lazy, a single extra one when loaded eagerly
+    assert taken_by_names(Loading.LAZY) == (["taker 0", "taker 1", "taker 2"], 4)
+    assert taken_by_names(Loading.SELECTIN) == (["taker 0", "taker 1", "taker 2"], 2)
+    assert taken_by_names(Loading.JOINED) == (["taker 0", "taker 1", "taker 2"], 1)
+
+def test_get_open_rows(repo, shift, session):
+    open_override = repo.add(make_override(shift, 9, 12))
+    taken = make_override(shift, 13, 15)
+    taken.is_taken = True
+    repo.add(taken)
+    session.commit()
+
+    rows = repo.get_open_rows()
+
+    assert [OverrideRead.model_validate(row) for row in rows] == [OverrideRead(
+        id=open_override.id,
+        shift_id=shift.id,
+        requester_id=shift.user_id,
+        date=shift.date,
+        start_time=time(9, 0),
+        end_time=time(12, 0),
+        taken_by_id=None,
+        taken_at=None,
+        created_at=open_override.created_at,
+        is_taken=False
+    )]
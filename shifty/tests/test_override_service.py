@@ -6,6 +6,7 @@ from datetime import date, time, datetime
 from shifty.application.use_cases.override_service import OverrideService
 from shifty.application.dto.override_dto import OverrideCreate, OverrideTake
 from shifty.domain.entities import Override, Shift, ShiftStatus
+from shifty.domain.exceptions import InvalidOverrideException
 
 @pytest.fixture
 def mock_shift_repository():
@@ -54,6 +55,10 @@ def make_shift():
         created_at=datetime.now()
     )
 
+def read_back_taken_segments(override_repository, shift_repository):
+    # The shift repository reads back the segments the override repository inserted
+    shift_repository.get_many.side_effect = lambda ids: list(reversed(override_repository.take.call_args.args[5]))
+
 def make_create_dto():
     return OverrideCreate(
         shift_id=uuid4(),
@@ -67,10 +72,13 @@ def test_create_success(service, mock_repository, mock_shift_repository):
     dto = make_create_dto()
     expected = make_override()
     mock_repository.add.return_value = expected
+    mock_repository.exists_overlapping.return_value = False
     mock_shift_repository.get_by_id.return_value = make_shift()  # Mock the shift retrieval
     result = service.create(dto)
     assert result == expected
     mock_repository.add.assert_called_once()
+    mock_repository.exists_overlapping.assert_called_once_with(dto.shift_id, dto.start_time, dto.end_time)
+    mock_repository.get_all.assert_not_called()
 
 def test_list_all(service, mock_repository):
     expected = [make_override()]
@@ -109,9 +117,10 @@ def test_take_success(service, mock_repository, mock_shift_repository):
     service.override_repository = mock_repository
     service.shift_repository = mock_shift_repository
     data = OverrideTake(taken_by_id=taker_id, start_time=time(10, 0), end_time=time(12, 0))
-    mock_repository.update.return_value = expected
+    mock_repository.take.return_value = expected
+    read_back_taken_segments(mock_repository, mock_shift_repository)
     result = service.take(override_id, data)
-    mock_repository.update.assert_called_once()
+    mock_repository.take.assert_called_once()
     assert result is not None
 
 def test_take_not_available(service, mock_repository, mock_shift_repository):
@@ -188,13 +197,7 @@ def test_create_overlapping_override_forbidden(service, mock_override_repository
     shift.end_time = time(17, 0)
     mock_shift_repository.get_by_id.return_value = shift
 
-    # Existing override overlaps with the new one
-    existing_override = make_override()
-    existing_override.shift_id = dto.shift_id
-    existing_override.date = dto.date
-    existing_override.start_time = time(10, 0)
-    existing_override.end_time = time(12, 0)
-    mock_override_repository.get_all.return_value = [existing_override]
+    mock_override_repository.exists_overlapping.return_value = True
 
     service.override_repository = mock_override_repository
     service.shift_repository = mock_shift_repository
@@ -221,9 +224,91 @@ def test_partial_take_splits_shift(service, mock_override_repository, mock_shift
     service.override_repository = mock_override_repository
     service.shift_repository = mock_shift_repository
 
+    read_back_taken_segments(mock_override_repository, mock_shift_repository)
     segments = service.take(override.id, data)
     assert len(segments) == 3
     assert segments[1].user_id == taker_id
     assert segments[1].start_time == time(10, 0)
     assert segments[1].end_time == time(12, 0)
-    assert segments[1].status == ShiftStatus.TAKEN
\ No newline at end of file
+    assert segments[1].status == ShiftStatus.TAKEN
+
+def test_take_runs_in_one_repository_call(service, mock_override_repository, mock_shift_repository):
+    shift = make_shift()
+    override = make_override()
+    override.shift_id = shift.id
+    mock_override_repository.get_by_id.return_value = override
+    mock_shift_repository.get_by_id.return_value = shift
+    service.override_repository = mock_override_repository
+    service.shift_repository = mock_shift_repository
+    data = OverrideTake(taken_by_id=uuid4(), start_time=time(10, 0), end_time=time(12, 0))
+    read_back_taken_segments(mock_override_repository, mock_shift_repository)
+    segments = service.take(override.id, data)
+    mock_override_repository.take.assert_called_once_with(
+        override.id, data.taken_by_id, data.start_time, data.end_time, shift.id, segments
+    )
+    mock_override_repository.update.assert_not_called()
+    mock_shift_repository.add.assert_not_called()
+    mock_shift_repository.update.assert_not_called()
+
+def test_take_lost_race_raises(service, mock_override_repository, mock_shift_repository):
+    shift = make_shift()
+    override = make_override()
+    override.shift_id = shift.id
+    mock_override_repository.get_by_id.return_value = override
+    mock_shift_repository.get_by_id.return_value = shift
+    # Another user took the override between the read and the conditional update
+    mock_override_repository.take.side_effect = ValueError("Override not available")
+    service.override_repository = mock_override_repository
+    service.shift_repository = mock_shift_repository
+    data = OverrideTake(taken_by_id=uuid4(), start_time=time(10, 0), end_time=time(12, 0))
+    with pytest.raises(InvalidOverrideException) as excinfo:
+        service.take(override.id, data)
+    assert "already taken" in str(excinfo.value)
+
+def test_take_ranges_splits_shift_once(service, mock_override_repository, mock_shift_repository):
+    shift = make_shift()
+    override = make_override()
+    override.shift_id = shift.id
+    mock_override_repository.get_by_id.return_value = override
+    mock_shift_repository.get_by_id.return_value = shift
+    service.override_repository = mock_override_repository
+    service.shift_repository = mock_shift_repository
+    a, b = uuid4(), uuid4()
+    claims = [
+        OverrideTake(taken_by_id=b, start_time=time(13, 0), end_time=time(15, 0)),
+        OverrideTake(taken_by_id=a, start_time=time(10, 0), end_time=time(12, 0)),
+    ]
+    read_back_taken_segments(mock_override_repository, mock_shift_repository)
+    segments = service.take_ranges(override.id, claims)
+    assert [(s.start_time, s.user_id) for s in segments] == [
+        (time(9, 0), shift.user_id), (time(10, 0), a), (time(12, 0), shift.user_id),
+        (time(13, 0), b), (time(15, 0), shift.user_id)
+    ]
+    # Several takers: the override keeps the claimed span but no single taker
+    mock_override_repository.take.assert_called_once_with(
+        override.id, None, time(10, 0), time(15, 0), shift.id, segments
+    )
+
+def test_take_ranges_invalid_claims(service, mock_override_repository, mock_shift_repository):
+    shift = make_shift()
+    override = make_override()
+    override.shift_id = shift.id
+    mock_override_repository.get_by_id.return_value = override
+    mock_shift_repository.get_by_id.return_value = shift
+    service.override_repository = mock_override_repository
+    service.shift_repository = mock_shift_repository
+    with pytest.raises(InvalidOverrideException):
+        service.take_ranges(override.id, [])
+    overlapping = [
+        OverrideTake(taken_by_id=uuid4(), start_time=time(10, 0), end_time=time(12, 0)),
+        OverrideTake(taken_by_id=uuid4(), start_time=time(11, 0), end_time=time(13, 0)),
+    ]
+    with pytest.raises(InvalidOverrideException):
+        service.take_ranges(override.id, overlapping)
+    by_owner = [
+        OverrideTake(taken_by_id=uuid4(), start_time=time(10, 0), end_time=time(12, 0)),
+        OverrideTake(taken_by_id=shift.user_id, start_time=time(13, 0), end_time=time(14, 0)),
+    ]
+    with pytest.raises(InvalidOverrideException):
+        service.take_ranges(override.id, by_owner)
+    mock_override_repository.take.assert_not_called()
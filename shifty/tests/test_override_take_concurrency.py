@@ -0,0 +1,101 @@
+import threading
+import pytest
+from datetime import date, time, datetime
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from shifty.application.dto.override_dto import OverrideTake
+from shifty.application.use_cases.override_service import OverrideService
+from shifty.domain.entities import Organization, Override, Shift, ShiftStatus, User
+from shifty.domain.exceptions import InvalidOverrideException
+from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+from shifty.infrastructure.unit_of_work import UnitOfWork
+
+TAKERS = 16
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file database, so that every taker has its own connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'take.db'}", connect_args={"timeout": 30})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def override(engine):
+    with Session(engine) as session:
+        org = Organization(name="TestOrg", org_code="123456")
+        session.add(org)
+        session.commit()
+        owner = User(full_name="owner", email="owner@example.com", role="worker", organization_id=org.id)
+        session.add(owner)
+        session.commit()
+        shift = Shift(
+            user_id=owner.id,
+            origin_user_id=owner.id,
+            organization_id=org.id,
+            date=date(2025, 6, 18),
+            start_time=time(8, 0),
+            end_time=time(18, 0),
+            created_at=datetime.now()
+        )
+        session.add(shift)
+        session.commit()
+        override = Override(
+            shift_id=shift.id,
+            user_id=owner.id,
+            organization_id=org.id,
+            date=shift.date,
+            start_time=time(10, 0),
+            end_time=time(12, 0)
+        )
+        session.add(override)
+        session.commit()
+        session.refresh(override)
+        return override
+
+def test_concurrent_takers_exactly_one_wins(engine, override):
+    with Session(engine) as session:
+        org_id = override.organization_id
+        takers = [
+            User(full_name=f"taker {i}", email=f"taker{i}@example.com", role="worker", organization_id=org_id)
+            for i in range(TAKERS)
+        ]
+        session.add_all(takers)
+        session.commit()
+        taker_ids = [taker.id for taker in takers]
+
+    barrier = threading.Barrier(TAKERS)
+    winners, losers, errors = [], [], []
+
+    def take(taker_id):
+        with Session(engine) as session, UnitOfWork(session):
+            service = OverrideService(OverrideRepository(session), ShiftRepository(session))
+            data = OverrideTake(taken_by_id=taker_id, start_time=time(10, 0), end_time=time(12, 0))
+            barrier.wait()
+            try:
+                service.take(override.id, data)
+                winners.append(taker_id)
+            except InvalidOverrideException:
+                losers.append(taker_id)
+            except Exception as ex:
+                errors.append(ex)
+
+    threads = [threading.Thread(target=take, args=(taker_id,)) for taker_id in taker_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(winners) == 1
+    assert len(losers) == TAKERS - 1
+    with Session(engine) as session:
+        taken = session.get(Override, override.id)
+        assert taken.is_taken
+        assert taken.taken_by_id == winners[0]
+        assert session.get(Shift, override.shift_id).status == ShiftStatus.CANCELED
+        segments = session.exec(select(Shift).where(Shift.parent_shift_id == override.shift_id)).all()
+        # Only the winner's split was written
+        assert len(segments) == 3
+        assert [s.user_id for s in segments if s.status == ShiftStatus.TAKEN] == winners
@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import MagicMock
+from uuid import uuid4
+from datetime import date, time, datetime
+
+from shifty.application.use_cases.schedule_draft_service import ScheduleDraftService
+from shifty.application.use_cases.solvers import Assignment, CalculationMode
+from shifty.domain.entities import Availability, DraftAssignment, DraftSchedule, ShiftSlot
+from shifty.domain.exceptions import NotExistsException
+
+@pytest.fixture
+def mock_draft_repository():
+    return MagicMock()
+
+@pytest.fixture
+def mock_shift_repository():
+    return MagicMock()
+
+@pytest.fixture
+def mock_availability_repository():
+    return MagicMock()
+
+@pytest.fixture
+def mock_user_repository():
+    return MagicMock()
+
+@pytest.fixture
+def service(mock_draft_repository, mock_shift_repository, mock_availability_repository, mock_user_repository):
+    return ScheduleDraftService(
+        mock_draft_repository,
+        mock_shift_repository,
+        mock_availability_repository,
+        mock_user_repository
+    )
+
+def make_slot(name, start, end):
+    return ShiftSlot(id=uuid4(), organization_id=uuid4(), name=name, start_time=start, end_time=end, expected_workers=1)
+
+def make_availability(user_id, start, end):
+    return Availability(
+        id=uuid4(),
+        user_id=user_id,
+        organization_id=uuid4(),
+        date=date(2025, 6, 18),
+        start_time=start,
+        end_time=end,
+        created_at=datetime.now()
+    )
+
+def make_draft(mode=CalculationMode.OPTIMAL):
+    return DraftSchedule(id=uuid4(), organization_id=uuid4(), date=date(2025, 6, 18), mode=mode.value)
+
+def test_save(service, mock_draft_repository):
+    slot = make_slot("Morning", time(8, 0), time(12, 0))
+    user_id = uuid4()
+    service.save(uuid4(), date(2025, 6, 18), CalculationMode.GREEDY, [Assignment(slot, user_id, time(8, 0), time(12, 0))])
+    draft, assignments = mock_draft_repository.save.call_args[0]
+    assert draft.mode == "greedy"
+    assert [(a.shift_slot_id, a.user_id) for a in assignments] == [(slot.id, user_id)]
+
+def test_get_not_found(service, mock_draft_repository):
+    mock_draft_repository.get_by_organization_and_date.return_value = None
+    with pytest.raises(NotExistsException):
+        service.get(uuid4(), date(2025, 6, 18))
+
+def test_repair_without_draft_is_noop(service, mock_draft_repository, mock_shift_repository):
+    mock_draft_repository.get_by_organization_and_date.return_value = None
+    assert service.repair(uuid4(), date(2025, 6, 18), [(time(8, 0), time(12, 0))]) == []
+    mock_shift_repository.get_shift_slots.assert_not_called()
+
+def test_repair_only_resolves_affected_slots(
+    service, mock_draft_repository, mock_shift_repository, mock_availability_repository, mock_user_repository
+):
+    morning = make_slot("Morning", time(8, 0), time(12, 0))
+    evening = make_slot("Evening", time(16, 0), time(20, 0))
+    kept_user, new_user = uuid4(), uuid4()
+    draft = make_draft()
+    mock_draft_repository.get_by_organization_and_date.return_value = draft
+    mock_draft_repository.get_assignments.return_value = [
+        DraftAssignment(draft_schedule_id=draft.id, shift_slot_id=evening.id, user_id=kept_user,
+                        start_time=time(16, 0), end_time=time(20, 0)),
+    ]
+    mock_shift_repository.get_shift_slots.return_value = [morning, evening]
+    mock_availability_repository.get_by_date.return_value = [
+        make_availability(kept_user, time(8, 0), time(20, 0)),
+        make_availability(new_user, time(8, 0), time(12, 0)),
+    ]
+    mock_user_repository.get_by_role.return_value = []
+
+    repaired = service.repair(draft.organization_id, draft.date, [(time(8, 0), time(12, 0))])
+
+    # The evening slot does not overlap the change: its assignment and user are left alone
+    assert [(a.shift_slot_id, a.user_id) for a in repaired] == [(morning.id, new_user)]
+    draft_id, slot_ids, assignments = mock_draft_repository.replace_assignments.call_args[0]
+    assert draft_id == draft.id
+    assert slot_ids == {morning.id}
+    assert assignments == repaired
+
+def test_repair_ignores_unrelated_changes(service, mock_draft_repository, mock_shift_repository):
+    mock_draft_repository.get_by_organization_and_date.return_value = make_draft()
+    mock_shift_repository.get_shift_slots.return_value = [make_slot("Morning", time(8, 0), time(12, 0))]
+    assert service.repair(uuid4(), date(2025, 6, 18), [(time(13, 0), time(15, 0))]) == []
+    mock_draft_repository.replace_assignments.assert_not_called()
+
+def test_repair_runs_in_a_savepoint(
+    service, mock_draft_repository, mock_shift_repository, mock_availability_repository
+):
+    mock_draft_repository.get_by_organization_and_date.return_value = make_draft()
+    mock_draft_repository.get_assignments.return_value = []
+    mock_shift_repository.get_shift_slots.return_value = [make_slot("Morning", time(8, 0), time(12, 0))]
+    mock_availability_repository.get_by_date.side_effect = RuntimeError("aborted")
+
+    with pytest.raises(RuntimeError):
+        service.repair(uuid4(), date(2025, 6, 18), [(time(8, 0), time(12, 0))])
+
+    # The failed read leaves the savepoint with its error, which rolls the savepoint back
+    savepoint = mock_draft_repository.savepoint.return_value
+    savepoint.__enter__.assert_called_once()
+    assert savepoint.__exit__.call_args[0][0] is RuntimeError
@@ -0,0 +1,227 @@
+import pytest
+from uuid import uuid4
+from datetime import date, time, datetime
+from sqlmodel import Session, create_engine, SQLModel
+from sqlalchemy.dialects import postgresql
+from shifty.application.dto.shift_dto import ShiftFilter
+from shifty.application.use_cases.shift_splitter import ClaimedRange, split_shift_for_claims
+from shifty.domain.exceptions import InvalidCursorException
+from shifty.domain.entities import Organization, Override, Rotation, RotationEntry, Shift, ShiftRead, ShiftSlot, ShiftStatus, User
+from shifty.infrastructure.repositories import shift_sqlalchemy
+from shifty.infrastructure.repositories.pagination import encode_cursor
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def repo(session):
+    return ShiftRepository(session)
+
+@pytest.fixture
+def users(session):
+    org = Organization(name="TestOrg", org_code="123456")
+    session.add(org)
+    session.commit()
+    users = [
+        User(full_name=f"user{i}", email=f"user{i}@example.com", role="worker", organization_id=org.id)
+        for i in range(2)
+    ]
+    session.add_all(users)
+    session.commit()
+    return users
+
+def make_shift(user, day, start_hour, end_hour):
+    return Shift(
+        id=uuid4(),
+        user_id=user.id,
+        origin_user_id=user.id,
+        organization_id=user.organization_id,
+        date=day,
+        start_time=time(start_hour, 0),
+        end_time=time(end_hour, 0),
+        status=ShiftStatus.TAKEN,
+        created_at=datetime.now()
+    )
+
+def test_add_many_inserts_in_chunks(repo, users, monkeypatch):
+    monkeypatch.setattr(shift_sqlalchemy, "INSERT_CHUNK_SIZE", 2)
+    shifts = [make_shift(users[i % 2], date(2025, 6, 18), i, i + 1) for i in range(5)]
+    assert repo.add_many(shifts) == shifts
+    saved = {s.id: s for s in repo.get_all()}
+    assert set(saved) == {s.id for s in shifts}
+    assert saved[shifts[3].id].start_time == time(3, 0)
+    assert saved[shifts[3].id].status == ShiftStatus.TAKEN
+
+def test_add_many_empty(repo):
+    assert repo.add_many([]) == []
+
+def test_get_by_user_date_pairs(repo, users):
+    day1, day2 = date(2025, 6, 18), date(2025, 6, 19)
+    repo.add_many([
+        make_shift(users[0], day1, 8, 12),
+        make_shift(users[0], day2, 8, 12),
+        make_shift(users[1], day1, 8, 12),
+        make_shift(users[1], day2, 8, 12),
+    ])
+    found = repo.get_by_user_date_pairs([(users[0].id, day1), (users[1].id, day2), (users[1].id, day2)])
+    assert {(s.user_id, s.date) for s in found} == {(users[0].id, day1), (users[1].id, day2)}
+    assert repo.get_by_user_date_pairs([]) == []
+
+def test_add_rotation_with_entries(repo, users, session):
+    slot = repo.add_shift_slot(ShiftSlot(organization_id=users[0].organization_id, name="Morning", start_time=time(8, 0), end_time=time(12, 0)))
+    rotation = Rotation(organization_id=users[0].organization_id, name="Weekly", cycle_weeks=2, starts_on=date(2025, 6, 16))
+    entries = [
+        RotationEntry(rotation_id=rotation.id, user_id=users[0].id, shift_slot_id=slot.id, week=0, weekday=0),
+        RotationEntry(rotation_id=rotation.id, user_id=users[1].id, shift_slot_id=slot.id, week=1, weekday=0),
+    ]
+    saved = repo.add_rotation(rotation, entries)
+    assert repo.get_rotation_by_id(saved.id).cycle_weeks == 2
+    assert {e.user_id for e in repo.get_rotation_entries(saved.id)} == {users[0].id, users[1].id}
+    assert repo.get_rotation_entries(uuid4()) == []
+
+def test_materialize_rotation_statement_binds():
+    statement = shift_sqlalchemy.materialize_rotation_statement
+    assert set(statement.compile(dialect=postgresql.dialect()).params) == {"rotation_id", "start_date", "end_date"}
+
+def split(repo, shift, start_hour, end_hour, taker):
+    override = Override(
+        shift_id=shift.id, user_id=shift.user_id, organization_id=shift.organization_id,
+        date=shift.date, start_time=shift.start_time, end_time=shift.end_time
+    )
+    segments = split_shift_for_claims(shift, override, [ClaimedRange(time(start_hour, 0), time(end_hour, 0), taker.id)])
+    repo.update(shift.id, {"status": ShiftStatus.CANCELED})
+    return repo.add_many(segments)
+
+def test_lineage_tree(repo, users):
+    root = repo.add(make_shift(users[0], date(2025, 6, 18), 8, 18))
+    before, taken, after = split(repo, root, 10, 14, users[1])
+    # The taken fragment is split again
+    first, second = split(repo, taken, 12, 14, users[0])
+    assert second.root_shift_id == root.id
+    assert second.lineage_path == f"{root.id}/{taken.id}/{second.id}/"
+
+    expected = [(root.id, 0), (before.id, 1), (taken.id, 1), (after.id, 1), (first.id, 2), (second.id, 2)]
+    for shift in (root, taken, second):
+        assert [(s.id, depth) for s, depth in repo.get_lineage(shift.id)] == expected
+    assert repo.get_lineage(uuid4()) == []
+
+def test_get_active_descendants(repo, users):
+    root = repo.add(make_shift(users[0], date(2025, 6, 18), 8, 18))
+    before, taken, after = split(repo, root, 10, 14, users[1])
+    first, second = split(repo, taken, 12, 14, users[0])
+    # The canceled intermediate fragment is left out
+    assert [s.id for s in repo.get_active_descendants(root)] == [before.id, first.id, second.id, after.id]
+    assert [s.id for s in repo.get_active_descendants(repo.get_by_id(taken.id))] == [first.id, second.id]
+    assert repo.get_active_descendants(repo.get_by_id(second.id)) == []
+
+def split_and_reassign(repo, users):
+    # The taken fragment is reassigned to the owner: the three fragments are contiguous
+    root = repo.add(make_shift(users[0], date(2025, 6, 18), 8, 18))
+    before, taken, after = split(repo, root, 10, 14, users[1])
+    repo.update(taken.id, {"user_id": users[0].id})
+    return root, before, taken, after
+
+def test_compact_fragments(repo, users, session):
+    root, before, taken, after = split_and_reassign(repo, users)
+    override = Override(
+        shift_id=after.id, user_id=users[0].id, organization_id=after.organization_id,
+        date=after.date, start_time=time(15, 0), end_time=time(16, 0)
+    )
+    session.add(override)
+    session.commit()
+
+    result = repo.compact_fragments(organization_id=root.organization_id)
+    assert (result.merged, result.reclaimed) == (1, 2)
+    assert repo.get_by_id(taken.id) is None and repo.get_by_id(after.id) is None
+    merged = repo.get_by_id(before.id)
+    assert (merged.start_time, merged.end_time) == (time(8, 0), time(18, 0))
+    # Lineage and overrides are kept
+    assert merged.parent_shift_id == root.id
+    assert session.get(Override, override.id).shift_id == merged.id
+    assert [s.id for s in repo.get_active_descendants(root)] == [merged.id]
+
+    assert repo.compact_fragments().reclaimed == 0
+
+def test_compact_fragments_keeps_fragments_of_different_parents(repo, users):
+    root = repo.add(make_shift(users[0], date(2025, 6, 18), 8, 18))
+    before, taken, after = split(repo, root, 10, 14, users[1])
+    # users[0] takes back 12-14: 12-14 (child of taken) and 14-18 (child of root) are contiguous
+    given_back, taken_back = split(repo, taken, 12, 14, users[0])
+    assert repo.compact_fragments().reclaimed == 0
+    # Each fragment still reaches its own parent
+    assert [(s.id, depth) for s, depth in repo.get_lineage(taken_back.id)] == [
+        (root.id, 0), (before.id, 1), (taken.id, 1), (after.id, 1), (given_back.id, 2), (taken_back.id, 2)
+    ]
+
+def test_compact_fragments_scope(repo, users):
+    split_and_reassign(repo, users)
+    assert repo.compact_fragments(date=date(2025, 6, 19)).reclaimed == 0
+    assert repo.compact_fragments(organization_id=uuid4()).reclaimed == 0
+    assert repo.compact_fragments(date=date(2025, 6, 18)).reclaimed == 2
+
+def test_get_compactable_dates(repo, users):
+    root, *_ = split_and_reassign(repo, users)
+    # Fragments of different owners only, and a shift never split
+    split(repo, repo.add(make_shift(users[0], date(2025, 6, 19), 8, 12)), 8, 10, users[1])
+    repo.add(make_shift(users[1], date(2025, 6, 20), 8, 12))
+    assert repo.get_compactable_dates() == [(root.organization_id, date(2025, 6, 18))]
+
+def test_get_page_walks_all_shifts_in_order(repo, users):
+    # Same date and start time for several shifts: the id breaks the tie
+    shifts = repo.add_many(
+        [make_shift(users[i % 2], date(2025, 6, 18 + i % 3), 8 + i % 2, 10) for i in range(7)]
+    )
+    expected = sorted(shifts, key=lambda s: (s.date, s.start_time, str(s.id)))
+    seen, cursor = [], None
+    while True:
+        page = repo.get_page(3, cursor)
+        assert len(page.items) <= 3
+        seen.extend(s.id for s in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == [s.id for s in expected]
+
+def test_get_page_invalid_cursor(repo, users):
+    with pytest.raises(InvalidCursorException):
+        repo.get_page(10, "not-a-cursor")
+    with pytest.raises(InvalidCursorException):
+        # A shift cursor has one value too many for the shift slots
+        repo.get_shift_slots_page(10, encode_cursor(make_shift(users[0], date(2025, 6, 18), 8, 10), shift_sqlalchemy.DATED_PAGE_KEYS))
+
+def test_get_page_with_filters(repo, users):
+    shifts = [make_shift(users[i % 2], date(2025, 6, 16 + i // 2), 8, 10) for i in range(14)]
+    shifts[0].status = ShiftStatus.CANCELED
+    repo.add_many(shifts)
+    week = ShiftFilter(date_from=date(2025, 6, 16), date_to=date(2025, 6, 18), user_id=users[0].id)
+    assert [s.date.day for s in repo.get_page(10, filters=week).items] == [16, 17, 18]
+    taken = week.model_copy(update={"status": ShiftStatus.TAKEN})
+    assert [s.date.day for s in repo.get_page(10, filters=taken).items] == [17, 18]
+    everything = repo.get_page(100, filters=ShiftFilter(organization_id=users[0].organization_id))
+    assert len(everything.items) == 14
+    assert repo.get_page(100, filters=ShiftFilter(organization_id=uuid4())).items == []
+
+def test_get_rows_by_date(repo, users, session):
+    shifts = repo.add_many([
+        make_shift(users[0], date(2025, 6, 18), 8, 12),
+        make_shift(users[1], date(2025, 6, 18), 12, 16)
+    ])
+    repo.add(make_shift(users[0], date(2025, 6, 19), 8, 12))
+    session.commit()
+    session.expunge_all()
+
+    rows = repo.get_rows_by_date(date(2025, 6, 18))
+
+    # Plain rows, nothing is loaded into the session
+    assert all(type(row) is dict for row in rows)
+    assert list(session.identity_map.values()) == []
+    read = sorted((ShiftRead.model_validate(row) for row in rows), key=lambda s: s.start_time)
+    assert [(s.id, s.status, s.user.email) for s in read] == [
+        (shifts[0].id, ShiftStatus.TAKEN, "user0@example.com"),
+        (shifts[1].id, ShiftStatus.TAKEN, "user1@example.com")
+    ]
@@ -4,9 +4,10 @@ from uuid import uuid4
 from datetime import date, time, datetime
 
 from shifty.application.use_cases.shift_service import ShiftService
-from shifty.application.dto.shift_dto import ShiftCreate, ShiftCalculationRequest
-from shifty.domain.entities import Availability, Shift, ShiftSlot
-from shifty.domain.exceptions import NotExistsException
+from shifty.application.dto.shift_dto import RotationCreate, RotationEntryCreate, RotationMaterializeRequest, RotationMaterializeResult, ShiftCompactionResult, ShiftCreate, ShiftFilter, ShiftCalculationRequest, ShiftRangeCalculationRequest
+from shifty.domain.entities import Availability, Shift, ShiftSlot, ShiftStatus, User
+from shifty.domain.exceptions import InvalidDateRangeException, InvalidShiftException, NotAllowedException, NotExistsException, OverlappingShiftException
+from shifty.domain.repositories import Loading
 
 @pytest.fixture
 def mock_repository():
@@ -91,6 +92,12 @@ def test_create_success(service, mock_repository):
     assert result == expected
     mock_repository.add.assert_called_once()
 
+def test_create_overlapping_shift_raises(service, mock_repository):
+    mock_repository.add.side_effect = OverlappingShiftException("Cannot create overlapping shift for the same owner.")
+    with pytest.raises(OverlappingShiftException):
+        service.create(make_create_dto())
+    mock_repository.get_by_user_and_date.assert_not_called()
+
 def test_list_all(service, mock_repository):
     expected = [make_shift()]
     mock_repository.get_all.return_value = expected
@@ -236,13 +243,13 @@ def test_calculate_shifts(service, mock_availability_repository, mock_user_repos
         type('U', (), {"id": user6})(),
     ]
 
-    # Mocking the user repository to return user details by ID
-    mock_user_repository.get_by_id.side_effect = lambda user_id: type('U', (), {
+    # Mocking the user repository to return user details in bulk
+    mock_user_repository.get_many.side_effect = lambda user_ids: [type('U', (), {
         "id": user_id,
         "full_name": f"User {user_id}",
         "email" : "test@test.com",
         "role": "worker",
-        "organization_id": org_id})()
+        "organization_id": org_id})() for user_id in user_ids]
 
     req = ShiftCalculationRequest(
         date=date.today(),
@@ -262,3 +269,252 @@ def test_calculate_shifts(service, mock_availability_repository, mock_user_repos
         st = next(st for st in mock_repository.get_shift_slots.return_value if st.name == r.shift_type.name)
         assert r.start_time == st.start_time
         assert r.end_time == st.end_time
+    # Users are resolved in a single round trip
+    mock_user_repository.get_many.assert_called_once()
+    mock_user_repository.get_by_id.assert_not_called()
+    assert all(r.user is not None and r.user.id == r.user_id for r in result)
+
+def test_calculate_shifts_range(service, mock_availability_repository, mock_user_repository, mock_repository):
+    from datetime import timedelta
+    org_id = uuid4()
+    user1 = uuid4()
+    user2 = uuid4()
+    start = date.today()
+    availabilities = [
+        make_availability(user1, org_id, start, time(8, 0), time(16, 0), "Day 1"),
+        make_availability(user2, org_id, start + timedelta(days=2), time(8, 0), time(16, 0), "Day 3"),
+    ]
+    slot = make_shift_slot()
+    mock_repository.get_shift_slots.return_value = [slot]
+    mock_availability_repository.get_by_date_range.return_value = availabilities
+    mock_user_repository.get_by_role.return_value = []
+    mock_user_repository.get_many.side_effect = lambda user_ids: []
+
+    req = ShiftRangeCalculationRequest(start_date=start, end_date=start + timedelta(days=2), organization_id=org_id)
+    result = service.calculate_shifts_range(req)
+
+    # Everything is loaded once for the whole window
+    mock_availability_repository.get_by_date_range.assert_called_once_with(
+        req.start_date, req.end_date, loading=Loading.LAZY
+    )
+    mock_availability_repository.get_by_date.assert_not_called()
+    mock_repository.get_shift_slots.assert_called_once()
+    mock_user_repository.get_by_role.assert_called_once()
+    mock_user_repository.get_many.assert_called_once()
+    assert [(r.date, r.user_id) for r in result] == [
+        (start, user1),
+        (start + timedelta(days=2), user2),
+    ]
+
+def test_calculate_shifts_range_invalid(service):
+    from datetime import timedelta
+    req = ShiftRangeCalculationRequest(start_date=date.today(), end_date=date.today() - timedelta(days=1), organization_id=uuid4())
+    with pytest.raises(InvalidDateRangeException):
+        service.calculate_shifts_range(req)
+    req = ShiftRangeCalculationRequest(start_date=date.today(), end_date=date.today() + timedelta(days=60), organization_id=uuid4())
+    with pytest.raises(InvalidDateRangeException):
+        service.calculate_shifts_range(req)
+
+def test_calculate_shifts_range_parallel_requires_greedy_mode():
+    from pydantic import ValidationError
+    from shifty.application.use_cases.solvers import CalculationMode
+    with pytest.raises(ValidationError, match="parallel is only supported by the greedy mode"):
+        ShiftRangeCalculationRequest(
+            start_date=date.today(), end_date=date.today(), organization_id=uuid4(),
+            mode=CalculationMode.OPTIMAL, parallel=True
+        )
+
+def test_calculate_shifts_optimal_mode(service, mock_availability_repository, mock_user_repository, mock_repository):
+    from shifty.application.use_cases.solvers import CalculationMode
+    org_id = uuid4()
+    user1 = uuid4()
+    slot = make_shift_slot()
+    mock_repository.get_shift_slots.return_value = [slot]
+    mock_availability_repository.get_by_date.return_value = [
+        make_availability(user1, org_id, date.today(), time(10, 0), time(18, 0), "Late"),
+    ]
+    mock_user_repository.get_by_role.return_value = [type('U', (), {"id": uuid4()})()]
+    mock_user_repository.get_many.side_effect = lambda user_ids: []
+
+    req = ShiftCalculationRequest(date=date.today(), organization_id=org_id, mode=CalculationMode.OPTIMAL)
+    result = service.calculate_shifts(req)
+
+    # Only the available user is assigned, for the part of the slot they cover
+    assert [(r.user_id, r.start_time, r.end_time) for r in result] == [(user1, time(10, 0), time(16, 0))]
+
+def test_calculate_shifts_saves_draft(mock_repository, mock_availability_repository, mock_user_repository):
+    draft_service = MagicMock()
+    service = ShiftService(mock_repository, mock_availability_repository, mock_user_repository, draft_service)
+    org_id = uuid4()
+    user1 = uuid4()
+    mock_repository.get_shift_slots.return_value = [make_shift_slot()]
+    mock_availability_repository.get_by_date.return_value = [
+        make_availability(user1, org_id, date.today(), time(8, 0), time(16, 0), "Day"),
+    ]
+    mock_user_repository.get_by_role.return_value = []
+    mock_user_repository.get_many.side_effect = lambda user_ids: []
+
+    req = ShiftCalculationRequest(date=date.today(), organization_id=org_id)
+    service.calculate_shifts(req)
+
+    organization_id, day, mode, assignments = draft_service.save.call_args[0]
+    assert (organization_id, day, mode) == (org_id, req.date, req.mode)
+    assert [a.user_id for a in assignments] == [user1]
+
+def test_create_bulk_reports_overlaps_in_one_pass(service, mock_repository):
+    first = make_create_dto()
+    existing = make_shift()
+    existing.user_id = first.user_id
+    existing.start_time, existing.end_time = time(6, 0), time(10, 0)
+    mock_repository.get_by_user_date_pairs.return_value = [existing]
+    second = make_create_dto()
+    # Overlaps `second`, which comes first in the batch
+    third = second.model_copy(update={"start_time": time(16, 0), "end_time": time(18, 0)})
+    fourth = second.model_copy(update={"start_time": time(17, 0), "end_time": time(19, 0)})
+
+    result = service.create_bulk([first, second, third, fourth])
+
+    assert (result.created, result.failed) == (2, 2)
+    assert [item.index for item in result.items] == [0, 1, 2, 3]
+    assert [item.error is None for item in result.items] == [False, True, False, True]
+    mock_repository.get_by_user_date_pairs.assert_called_once()
+    mock_repository.get_by_user_and_date.assert_not_called()
+    mock_repository.add.assert_not_called()
+    saved = mock_repository.add_many.call_args[0][0]
+    assert [s.start_time for s in saved] == [second.start_time, fourth.start_time]
+    assert result.items[1].shift is saved[0]
+
+def test_create_bulk_ignores_canceled_shifts(service, mock_repository):
+    dto = make_create_dto()
+    canceled = make_shift()
+    canceled.user_id = dto.user_id
+    canceled.status = ShiftStatus.CANCELED
+    mock_repository.get_by_user_date_pairs.return_value = [canceled]
+    result = service.create_bulk([dto])
+    assert result.created == 1
+
+def test_create_bulk_concurrent_overlap_fails_every_item(service, mock_repository):
+    mock_repository.get_by_user_date_pairs.return_value = []
+    mock_repository.add_many.side_effect = OverlappingShiftException("Cannot create overlapping shift for the same owner.")
+    result = service.create_bulk([make_create_dto(), make_create_dto()])
+    assert (result.created, result.failed) == (0, 2)
+    assert all(item.shift is None and item.error for item in result.items)
+
+def make_rotation_dto(slot, **kwargs):
+    values = dict(
+        organization_id=slot.organization_id,
+        name="Weekly",
+        cycle_weeks=2,
+        starts_on=date(2025, 6, 16),
+        entries=[RotationEntryCreate(user_id=uuid4(), shift_slot_id=slot.id, week=1, weekday=0)]
+    )
+    values.update(kwargs)
+    return RotationCreate(**values)
+
+def test_create_rotation_success(service, mock_repository):
+    slot = make_shift_slot()
+    mock_repository.get_shift_slots_by_organization.return_value = [slot]
+    mock_repository.add_rotation.side_effect = lambda rotation, entries: rotation
+    rotation = service.create_rotation(make_rotation_dto(slot))
+    assert rotation.cycle_weeks == 2
+    _, entries = mock_repository.add_rotation.call_args[0]
+    assert [(e.rotation_id, e.week, e.weekday) for e in entries] == [(rotation.id, 1, 0)]
+
+def test_create_rotation_rejects_invalid_entries(service, mock_repository):
+    slot = make_shift_slot()
+    mock_repository.get_shift_slots_by_organization.return_value = [slot]
+    user_id = uuid4()
+    invalid = [
+        [RotationEntryCreate(user_id=user_id, shift_slot_id=slot.id, week=2, weekday=0)],
+        [RotationEntryCreate(user_id=user_id, shift_slot_id=uuid4(), week=0, weekday=0)],
+        [RotationEntryCreate(user_id=user_id, shift_slot_id=slot.id, week=0, weekday=0)] * 2,
+    ]
+    for entries in invalid:
+        with pytest.raises(InvalidShiftException):
+            service.create_rotation(make_rotation_dto(slot, entries=entries))
+    mock_repository.add_rotation.assert_not_called()
+
+def test_materialize_rotation(service, mock_repository, mock_user_repository):
+    manager = User(full_name="manager", email="manager@example.com", role="manager", organization_id=uuid4())
+    mock_user_repository.get_by_id.return_value = manager
+    rotation_id = uuid4()
+    expected = RotationMaterializeResult(created=3, skipped=0, conflicts=[])
+    mock_repository.get_rotation_by_id.return_value.id = rotation_id
+    mock_repository.get_rotation_by_id.return_value.organization_id = manager.organization_id
+    mock_repository.materialize_rotation.return_value = expected
+    request = RotationMaterializeRequest(start_date=date(2025, 6, 16), end_date=date(2025, 6, 29))
+    assert service.materialize_rotation(manager.id, rotation_id, request) == expected
+    mock_repository.materialize_rotation.assert_called_once_with(rotation_id, request.start_date, request.end_date)
+
+def test_materialize_rotation_invalid(service, mock_repository):
+    with pytest.raises(InvalidDateRangeException):
+        service.materialize_rotation(uuid4(), uuid4(), RotationMaterializeRequest(start_date=date(2025, 6, 16), end_date=date(2025, 6, 1)))
+    with pytest.raises(InvalidDateRangeException):
+        service.materialize_rotation(uuid4(), uuid4(), RotationMaterializeRequest(start_date=date(2025, 1, 1), end_date=date(2026, 6, 1)))
+    mock_repository.get_rotation_by_id.return_value = None
+    with pytest.raises(NotExistsException):
+        service.materialize_rotation(uuid4(), uuid4(), RotationMaterializeRequest(start_date=date(2025, 6, 16), end_date=date(2025, 6, 17)))
+
+def test_materialize_rotation_not_allowed(service, mock_repository, mock_user_repository):
+    worker = User(full_name="worker", email="worker@example.com", role="worker", organization_id=uuid4())
+    manager = User(full_name="manager", email="manager@example.com", role="manager", organization_id=uuid4())
+    mock_repository.get_rotation_by_id.return_value.organization_id = worker.organization_id
+    request = RotationMaterializeRequest(start_date=date(2025, 6, 16), end_date=date(2025, 6, 17))
+    mock_user_repository.get_by_id.return_value = worker
+    with pytest.raises(NotAllowedException):
+        service.materialize_rotation(worker.id, uuid4(), request)
+    # Only the rotations of the manager's own organization
+    mock_user_repository.get_by_id.return_value = manager
+    with pytest.raises(NotAllowedException):
+        service.materialize_rotation(manager.id, uuid4(), request)
+    mock_repository.materialize_rotation.assert_not_called()
+
+def test_get_lineage(service, mock_repository):
+    root = make_shift()
+    fragment = make_shift()
+    fragment.parent_shift_id = root.id
+    mock_repository.get_lineage.return_value = [(root, 0), (fragment, 1)]
+    nodes = service.get_lineage(fragment.id)
+    assert [(n.id, n.parent_shift_id, n.depth) for n in nodes] == [(root.id, None, 0), (fragment.id, root.id, 1)]
+
+def test_get_lineage_not_found(service, mock_repository):
+    mock_repository.get_lineage.return_value = []
+    with pytest.raises(NotExistsException):
+        service.get_lineage(uuid4())
+
+def test_get_active_fragments(service, mock_repository):
+    shift = make_shift()
+    mock_repository.get_by_id.return_value = shift
+    mock_repository.get_active_descendants.return_value = []
+    assert service.get_active_fragments(shift.id) == []
+    mock_repository.get_active_descendants.assert_called_once_with(shift)
+
+def test_compact_fragments(service, mock_repository, mock_user_repository):
+    manager = User(full_name="manager", email="manager@example.com", role="manager", organization_id=uuid4())
+    mock_user_repository.get_by_id.return_value = manager
+    mock_repository.compact_fragments.return_value = ShiftCompactionResult(merged=2, reclaimed=3)
+    assert service.compact_fragments(manager.id).reclaimed == 3
+    mock_repository.compact_fragments.assert_called_once_with(manager.organization_id, None)
+    assert service.compact_fragments(manager.id, manager.organization_id, date(2025, 6, 18)).reclaimed == 3
+    mock_repository.compact_fragments.assert_called_with(manager.organization_id, date(2025, 6, 18))
+
+def test_compact_fragments_not_allowed(service, mock_repository, mock_user_repository):
+    worker = User(full_name="worker", email="worker@example.com", role="worker", organization_id=uuid4())
+    manager = User(full_name="manager", email="manager@example.com", role="manager", organization_id=uuid4())
+    mock_user_repository.get_by_id.return_value = worker
+    with pytest.raises(NotAllowedException):
+        service.compact_fragments(worker.id)
+    # Only the shifts of the manager's own organization
+    mock_user_repository.get_by_id.return_value = manager
+    with pytest.raises(NotAllowedException):
+        service.compact_fragments(manager.id, worker.organization_id)
+    mock_user_repository.get_by_id.return_value = None
+    with pytest.raises(NotAllowedException):
+        service.compact_fragments(uuid4())
+    mock_repository.compact_fragments.assert_not_called()
+
+def test_list_page_invalid_range(service, mock_repository):
+    filters = ShiftFilter(date_from=date(2025, 6, 20), date_to=date(2025, 6, 16))
+    with pytest.raises(InvalidDateRangeException):
+        service.list_page(10, None, filters)
+    mock_repository.get_page.assert_not_called()
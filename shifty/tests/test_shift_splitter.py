@@ -1,7 +1,8 @@
+import pytest
 from datetime import date, time, datetime
 from uuid import uuid4
 from shifty.domain.entities import Shift, Override, ShiftStatus
-from shifty.application.use_cases.shift_splitter import split_shift_for_partial_override
+from shifty.application.use_cases.shift_splitter import ClaimedRange, split_shift_for_claims, split_shift_for_partial_override
 
 def test_split_shift_for_partial_override():
     shift = Shift(
@@ -43,4 +44,69 @@ def test_split_shift_for_partial_override():
     assert segments[1].status == ShiftStatus.TAKEN
     assert segments[2].start_time == time(12, 0)
     assert segments[2].end_time == time(13, 0)
-    assert segments[2].user_id == shift.user_id
\ No newline at end of file
+    assert segments[2].user_id == shift.user_id
+
+def make_shift_and_override():
+    shift = Shift(
+        id=uuid4(),
+        user_id=uuid4(),
+        origin_user_id=uuid4(),
+        organization_id=uuid4(),
+        date=date(2025, 6, 18),
+        start_time=time(8, 0),
+        end_time=time(18, 0),
+        status=ShiftStatus.PENDING,
+        created_at=datetime.now()
+    )
+    override = Override(
+        id=uuid4(),
+        shift_id=shift.id,
+        organization_id=shift.organization_id,
+        user_id=shift.user_id,
+        date=shift.date,
+        start_time=shift.start_time,
+        end_time=shift.end_time
+    )
+    return shift, override
+
+def bounds(segments):
+    return [(s.start_time, s.end_time, s.user_id) for s in segments]
+
+def test_split_shift_for_claims_fills_gaps_in_one_pass():
+    shift, override = make_shift_and_override()
+    a, b = uuid4(), uuid4()
+    # Claims are given out of order
+    segments = split_shift_for_claims(shift, override, [
+        ClaimedRange(time(14, 0), time(16, 0), b),
+        ClaimedRange(time(9, 0), time(11, 0), a),
+    ])
+    assert bounds(segments) == [
+        (time(8, 0), time(9, 0), shift.user_id),
+        (time(9, 0), time(11, 0), a),
+        (time(11, 0), time(14, 0), shift.user_id),
+        (time(14, 0), time(16, 0), b),
+        (time(16, 0), time(18, 0), shift.user_id),
+    ]
+    assert all(s.parent_shift_id == shift.id for s in segments)
+    assert [s.status for s in segments if s.user_id in (a, b)] == [ShiftStatus.TAKEN] * 2
+
+def test_split_shift_for_claims_joins_adjacent_claims_of_same_taker():
+    shift, override = make_shift_and_override()
+    a, b = uuid4(), uuid4()
+    segments = split_shift_for_claims(shift, override, [
+        ClaimedRange(time(8, 0), time(10, 0), a),
+        ClaimedRange(time(10, 0), time(12, 0), a),
+        ClaimedRange(time(12, 0), time(18, 0), b),
+    ])
+    assert bounds(segments) == [
+        (time(8, 0), time(12, 0), a),
+        (time(12, 0), time(18, 0), b),
+    ]
+
+def test_split_shift_for_claims_overlapping_claims_raise():
+    shift, override = make_shift_and_override()
+    with pytest.raises(ValueError):
+        split_shift_for_claims(shift, override, [
+            ClaimedRange(time(9, 0), time(12, 0), uuid4()),
+            ClaimedRange(time(11, 0), time(13, 0), uuid4()),
+        ])
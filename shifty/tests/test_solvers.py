@@ -0,0 +1,107 @@
+import random
+from uuid import uuid4
+from datetime import date, time, datetime, timedelta
+
+from shifty.application.use_cases.solvers import CalculationMode, GreedySolver, MatchingSolver, get_solver
+from shifty.domain.entities import Availability, ShiftSlot
+
+
+def make_slot(name, start, end, expected_workers=1):
+    return ShiftSlot(
+        id=uuid4(),
+        organization_id=uuid4(),
+        name=name,
+        start_time=start,
+        end_time=end,
+        expected_workers=expected_workers,
+        created_at=datetime.now()
+    )
+
+
+def make_availability(user_id, start, end, day=date(2025, 6, 18)):
+    return Availability(
+        id=uuid4(),
+        user_id=user_id,
+        organization_id=uuid4(),
+        date=day,
+        start_time=start,
+        end_time=end,
+        created_at=datetime.now()
+    )
+
+
+def test_get_solver():
+    assert isinstance(get_solver(CalculationMode.GREEDY), GreedySolver)
+    assert isinstance(get_solver(CalculationMode.OPTIMAL), MatchingSolver)
+
+
+def test_matching_finds_full_assignment_missed_by_greedy():
+    u1, u2 = uuid4(), uuid4()
+    morning = make_slot("Morning", time(8, 0), time(12, 0))
+    day = make_slot("Day", time(8, 0), time(16, 0))
+    availabilities = [
+        make_availability(u1, time(8, 0), time(16, 0)),
+        make_availability(u2, time(8, 0), time(12, 0)),
+    ]
+
+    greedy = GreedySolver(random.Random(0)).solve([morning, day], availabilities, [])
+    assert [(a.shift_slot.name, a.user_id) for a in greedy] == [("Morning", u1)]
+
+    result = MatchingSolver().solve([morning, day], availabilities, [])
+    assert [(a.shift_slot.name, a.user_id) for a in result] == [("Morning", u2), ("Day", u1)]
+
+
+def test_matching_never_assigns_unavailable_users():
+    u1 = uuid4()
+    night = make_slot("Night", time(20, 0), time(23, 0), expected_workers=2)
+    result = MatchingSolver().solve([night], [make_availability(u1, time(8, 0), time(12, 0))], [u1, uuid4()])
+    assert result == []
+
+
+def test_matching_prefers_full_coverage_and_reports_partial_window():
+    u1, u2 = uuid4(), uuid4()
+    slot = make_slot("Morning", time(8, 0), time(12, 0), expected_workers=2)
+    availabilities = [
+        make_availability(u1, time(10, 0), time(14, 0)),
+        make_availability(u2, time(7, 0), time(13, 0)),
+    ]
+    result = MatchingSolver().solve([slot], availabilities, [])
+    assert {(a.user_id, a.start_time, a.end_time) for a in result} == {
+        (u2, time(8, 0), time(12, 0)),
+        (u1, time(10, 0), time(12, 0)),
+    }
+
+    strict = MatchingSolver(allow_partial=False).solve([slot], availabilities, [])
+    assert [a.user_id for a in strict] == [u2]
+
+
+def test_matching_range_spreads_shifts_fairly():
+    u1, u2 = uuid4(), uuid4()
+    slot = make_slot("Morning", time(8, 0), time(12, 0))
+    days = [date(2025, 6, 18) + timedelta(days=i) for i in range(4)]
+    availabilities = [
+        make_availability(user_id, time(8, 0), time(12, 0), day)
+        for day in days for user_id in (u1, u2)
+    ]
+    result = MatchingSolver().solve_range([slot], availabilities, days, [])
+    users = [result[day][0].user_id for day in days]
+    assert users.count(u1) == 2 and users.count(u2) == 2
+
+
+def test_matching_respects_time_budget():
+    slot = make_slot("Morning", time(8, 0), time(12, 0))
+    availabilities = [make_availability(uuid4(), time(8, 0), time(12, 0))]
+    assert MatchingSolver(time_budget=0).solve([slot], availabilities, []) == []
+
+
+def test_matching_scales_to_large_organizations():
+    rng = random.Random(1)
+    users = [uuid4() for _ in range(10_000)]
+    availabilities = []
+    for user_id in users:
+        start = rng.randint(0, 16)
+        availabilities.append(make_availability(user_id, time(start, 0), time(start + rng.randint(4, 7), 0)))
+    slots = [make_slot(f"Slot {h}", time(h, 0), time(h + 4, 0), expected_workers=300) for h in range(0, 20, 2)]
+    result = MatchingSolver(time_budget=30).solve(slots, availabilities, users)
+    assert len(result) == 3000
+    assert len({a.user_id for a in result}) == 3000
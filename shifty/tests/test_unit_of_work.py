@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from datetime import date, time, datetime
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from shifty.application.use_cases.shift_splitter import split_shift_for_partial_override
+from shifty.domain.entities import Organization, Override, Shift, User
+from shifty.infrastructure.repositories.override_sqlalchemy import OverrideRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
+from shifty.infrastructure.unit_of_work import UnitOfWork
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def organization(engine):
+    with Session(engine, expire_on_commit=False) as session, UnitOfWork(session):
+        org = Organization(name="TestOrg", org_code="123456")
+        session.add(org)
+    return org
+
+
+def count_commits(engine) -> list:
+    commits = []
+    event.listen(engine, "commit", lambda connection: commits.append(connection))
+    return commits
+
+
+def make_user(org, name):
+    return User(full_name=name, email=f"{name}@example.com", role="worker", organization_id=org.id)
+
+
+def test_commits_once(engine, organization):
+    commits = count_commits(engine)
+    with Session(engine) as session, UnitOfWork(session):
+        repo = UserRepository(session)
+        first = repo.add(make_user(organization, "alice"))
+        repo.add(make_user(organization, "bob"))
+        # Flushed: visible to the queries of the same unit of work
+        assert repo.get_by_id(first.id) is first
+    assert len(commits) == 1
+    with Session(engine) as session:
+        assert len(session.exec(select(User)).all()) == 2
+
+
+def test_rolls_back_on_error(engine, organization):
+    with pytest.raises(RuntimeError):
+        with Session(engine) as session, UnitOfWork(session):
+            UserRepository(session).add(make_user(organization, "alice"))
+            raise RuntimeError("boom")
+    with Session(engine) as session:
+        assert session.exec(select(User)).all() == []
+
+
+def test_take_needs_no_refresh(engine, organization):
+    with Session(engine, expire_on_commit=False) as session, UnitOfWork(session):
+        owner = UserRepository(session).add(make_user(organization, "owner"))
+        shift = Shift(
+            user_id=owner.id,
+            origin_user_id=owner.id,
+            organization_id=organization.id,
+            date=date(2025, 6, 18),
+            start_time=time(8, 0),
+            end_time=time(18, 0),
+            created_at=datetime.now()
+        )
+        session.add(shift)
+        override = OverrideRepository(session).add(Override(
+            shift_id=shift.id,
+            user_id=owner.id,
+            organization_id=organization.id,
+            date=shift.date,
+            start_time=time(10, 0),
+            end_time=time(12, 0)
+        ))
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    commits = count_commits(engine)
+    with Session(engine) as session, UnitOfWork(session):
+        segments = split_shift_for_partial_override(shift, override, time(10, 0), time(12, 0), owner.id)
+        taken = OverrideRepository(session).take(override.id, owner.id, time(10, 0), time(12, 0), shift.id, segments)
+        # Claimed with UPDATE ... RETURNING, no SELECT to reload it
+        assert taken.is_taken
+    assert [statement.split()[0] for statement in statements] == ["SAVEPOINT", "UPDATE", "UPDATE", "INSERT", "RELEASE"]
+    assert len(commits) == 1
+
+
+def test_failed_write_keeps_the_unit_of_work(engine, organization):
+    with Session(engine, expire_on_commit=False) as session, UnitOfWork(session):
+        owner = UserRepository(session).add(make_user(organization, "owner"))
+        repo = ShiftRepository(session)
+        shift = repo.add(Shift(
+            user_id=owner.id,
+            origin_user_id=owner.id,
+            organization_id=organization.id,
+            date=date(2025, 6, 18),
+            start_time=time(8, 0),
+            end_time=time(12, 0),
+            created_at=datetime.now()
+        ))
+        with pytest.raises(IntegrityError):
+            # Same primary key: the write fails, the caller carries on
+            repo.add_many([shift.model_copy()])
+        repo.add(Shift(
+            user_id=owner.id,
+            origin_user_id=owner.id,
+            organization_id=organization.id,
+            date=date(2025, 6, 18),
+            start_time=time(13, 0),
+            end_time=time(17, 0),
+            created_at=datetime.now()
+        ))
+    # The writes before and after the failed one are committed
+    with Session(engine) as session:
+        assert len(session.exec(select(Shift).where(Shift.user_id == owner.id)).all()) == 2
+
+
+def test_async_unit_of_work(tmp_path, organization):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'uow.db'}")
+
+    async def scenario(fail: bool):
+        async with AsyncSession(engine) as session, UnitOfWork(session):
+            await session.run_sync(lambda session: UserRepository(session).add(make_user(organization, "carol")))
+            if fail:
+                raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario(fail=True))
+    asyncio.run(scenario(fail=False))
+    asyncio.run(engine.dispose())
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    with Session(sync_engine) as session:
+        assert [user.full_name for user in session.exec(select(User)).all()] == ["carol"]
+    sync_engine.dispose()
@@ -0,0 +1,43 @@
+import pytest
+from uuid import uuid4
+from sqlmodel import Session, create_engine, SQLModel
+from shifty.domain.entities import Organization, User
+from shifty.infrastructure.repositories.user_sqlalchemy import UserRepository
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def repo(session):
+    return UserRepository(session)
+
+@pytest.fixture
+def organization(session):
+    org = Organization(name="TestOrg", org_code="123456")
+    session.add(org)
+    session.commit()
+    return org
+
+def make_user(org, name):
+    return User(full_name=name, email=f"{name}@example.com", role="worker", organization_id=org.id)
+
+def test_get_many(repo, organization):
+    users = [repo.add(make_user(organization, f"user{i}")) for i in range(3)]
+    found = repo.get_many([users[0].id, users[2].id, users[0].id, uuid4()])
+    assert {u.id for u in found} == {users[0].id, users[2].id}
+
+def test_get_many_empty(repo):
+    assert repo.get_many([]) == []
+
+def test_get_page(repo, organization):
+    for name in ("carol", "alice", "bob"):
+        repo.add(make_user(organization, name))
+    first = repo.get_page(2)
+    assert [u.full_name for u in first.items] == ["alice", "bob"]
+    second = repo.get_page(2, first.next_cursor)
+    assert [u.full_name for u in second.items] == ["carol"]
+    assert second.next_cursor is None
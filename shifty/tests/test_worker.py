@@ -0,0 +1,81 @@
+import pytest
+from contextlib import contextmanager
+from datetime import date, datetime
+from unittest.mock import MagicMock
+from sqlmodel import Session, SQLModel, create_engine, select
+from shifty import worker
+from shifty.domain.entities import CalculationJob, CalculationJobStatus, DraftSchedule, Organization, User
+from shifty.infrastructure.unit_of_work import UnitOfWork
+
+def file_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = file_engine(tmp_path / "admin.db")
+    monkeypatch.setattr(worker, "admin_engine", engine)
+    return engine
+
+@pytest.fixture
+def user_engine(tmp_path, monkeypatch):
+    # SQLite allows one writing transaction per database, so the user session, which
+    # writes while the admin one is open, gets its own
+    user_engine = file_engine(tmp_path / "user.db")
+
+    @contextmanager
+    def user_session(user_id):
+        with Session(user_engine, expire_on_commit=False) as db, UnitOfWork(db):
+            yield db
+
+    monkeypatch.setattr(worker, "user_session", user_session)
+    return user_engine
+
+@pytest.fixture
+def job(engine):
+    with Session(engine, expire_on_commit=False) as session:
+        org = Organization(name="TestOrg", org_code="123456")
+        user = User(full_name="Manager", email="manager@example.com", role="manager", organization_id=org.id)
+        job = CalculationJob(
+            organization_id=org.id,
+            requested_by_id=user.id,
+            request={"start_date": "2025-06-16", "end_date": "2025-06-17", "organization_id": str(org.id)},
+            created_at=datetime.now()
+        )
+        session.add_all([org, user, job])
+        session.commit()
+        return job
+
+def calculation_service(session, error=None):
+    # Saves the draft of the first day, then fails if an error is given
+    def calculate_shifts_range(request):
+        session.add(DraftSchedule(organization_id=request.organization_id, date=date(2025, 6, 16)))
+        session.flush()
+        if error:
+            raise error
+        return []
+    service = MagicMock()
+    service.calculate_shifts_range.side_effect = calculate_shifts_range
+    return service
+
+def stored(engine, user_engine, job):
+    with Session(engine) as session, Session(user_engine) as user_session:
+        return session.get(CalculationJob, job.id).status, user_session.exec(select(DraftSchedule)).all()
+
+def test_run_next_job_commits_drafts_with_the_job(engine, user_engine, job, monkeypatch):
+    monkeypatch.setattr(worker, "build_shift_service", calculation_service)
+    assert worker.run_next_job()
+    status, drafts = stored(engine, user_engine, job)
+    assert status == CalculationJobStatus.DONE
+    assert len(drafts) == 1
+
+def test_run_next_job_drops_drafts_of_failed_job(engine, user_engine, job, monkeypatch):
+    monkeypatch.setattr(worker, "build_shift_service", lambda session: calculation_service(session, RuntimeError("boom")))
+    assert worker.run_next_job()
+    status, drafts = stored(engine, user_engine, job)
+    assert status == CalculationJobStatus.FAILED
+    assert drafts == []
+
+def test_run_next_job_empty_queue(engine, user_engine):
+    assert not worker.run_next_job()
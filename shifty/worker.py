@@ -0,0 +1,95 @@
+import logging
+import time
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+from shifty.application.use_cases.calculation_job_service import CalculationJobService
+from shifty.dependencies import build_shift_service
+from shifty.domain.entities import CalculationJobStatus
+from shifty.infrastructure.db import admin_engine, user_session
+from shifty.infrastructure.repositories.calculation_job_sqlalchemy import CalculationJobRepository
+from shifty.infrastructure.repositories.shift_sqlalchemy import ShiftRepository
+from shifty.infrastructure.unit_of_work import UnitOfWork
+from sqlmodel import Session
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 2
+# How often the fragments left by partial overrides are compacted
+COMPACTION_INTERVAL_SECONDS = 3600
+
+
+def run_next_job() -> bool:
+    """
+    Claim and run one calculation job.
+    :return: True if a job was processed, False if the queue was empty.
+    """
+    # The queue is shared by every organization, so it is polled with the admin role
+    with Session(admin_engine) as admin_session:
+        job_service = CalculationJobService(CalculationJobRepository(admin_session))
+        # The claim is committed on its own, so that the other workers skip the job
+        with UnitOfWork(admin_session):
+            job = job_service.claim_next()
+        if not job:
+            return False
+        logger.info(f"Running calculation job {job.id}")
+        # The calculation itself runs with the requester's row level security. Its drafts
+        # are committed just before the job status, and dropped when the job failed
+        with UnitOfWork(admin_session), user_session(str(job.requested_by_id)) as session:
+            job = job_service.run(job, build_shift_service(session))
+            if job.status == CalculationJobStatus.FAILED:
+                session.rollback()
+        logger.info(f"Calculation job {job.id} finished with status {job.status.value}")
+        return True
+
+
+def run_compaction_sweep() -> int:
+    """
+    Merge the contiguous shift fragments of every organization, one organization and
+    date at a time: each is compacted in its own unit of work, so that its row locks
+    only hold up the override takes of that organization and date, and not for long.
+    :return: Number of shift rows reclaimed.
+    """
+    merged = reclaimed = 0
+    with Session(admin_engine) as admin_session:
+        repository = ShiftRepository(admin_session)
+        with UnitOfWork(admin_session):
+            scopes = repository.get_compactable_dates()
+        for organization_id, day in scopes:
+            try:
+                with UnitOfWork(admin_session):
+                    result = repository.compact_fragments(organization_id, day)
+            except Exception as e:
+                # Retried by the next sweep; the other dates are compacted meanwhile
+                logger.error(f"Compaction of organization {organization_id} on {day} failed: {e}")
+                continue
+            merged += result.merged
+            reclaimed += result.reclaimed
+    if reclaimed:
+        logger.info(f"Compacted {merged} shift fragments, {reclaimed} rows reclaimed")
+    return reclaimed
+
+
+def main():
+    logger.info("Calculation worker started")
+    next_compaction = time.monotonic()
+    while True:
+        try:
+            if time.monotonic() >= next_compaction:
+                next_compaction = time.monotonic() + COMPACTION_INTERVAL_SECONDS
+                run_compaction_sweep()
+            if run_next_job():
+                continue
+        except Exception as e:
+            logger.error(f"Calculation worker error: {e}")
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()